@@ -1,23 +1,28 @@
 from __future__ import annotations
 import logging
 import asyncio
+import hashlib
+import json
 import os
 import discord
 
 from typing import Optional
-from discord import AutoShardedClient as DiscordClient, Intents, app_commands, Interaction, AuditLogAction, abc
+from discord import AutoShardedClient as DiscordClient, Intents, app_commands, Interaction, abc
 
 from HmWz.client.overviews.registration import RegistrationOverview
 
 from . import overviews
 from . import commands
+from .roles import RoleCoalescer
+from .jobs import RoleJobEngine
+from .cache import MemberRetention, lean_member_cache_flags
 from .. import services
 from ..i18n import CommandTranslator, t
-from ..configuration import Monitoring
+from ..configuration import Monitoring, Chunking, Reconcile, CommandSync
 from ..emojis import Emojis
 from ..types import Guild, TextChannel, Message, Member, Role
 from ..exception import HTTPException, Forbidden, NotFound, InteractionResponded
-from ..event import RawMessageDeleteEvent
+from ..event import RawMessageDeleteEvent, RawBulkMessageDeleteEvent
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +35,7 @@ except ImportError:
 
 class Client(DiscordClient):
     registered_commands : int = 0 
-    def __init__(self, *, intents: Intents = Intents.default(), global_command_sync: Optional[bool]=True, **options):
+    def __init__(self, *, intents: Intents = Intents.default(), global_command_sync: Optional[bool]=True, force_command_sync: Optional[bool]=False, selective_chunking: Optional[bool]=False, lean_member_cache: Optional[bool]=False, measure_member_cache: Optional[bool]=False, **options):
         """
         Initialisiert den Client mit den erforderlichen Intents und Optionen.
 
@@ -38,31 +43,101 @@ class Client(DiscordClient):
         :type intents: discord.Intents
         :param global_command_sync: Ob die Befehle global synchronisiert werden sollen (Standard: True)
         :type global_command_sync: bool
+        :param force_command_sync: Ob die Befehle beim Start auch dann synchronisiert werden sollen, wenn sich ihr Fingerabdruck nicht geändert hat (Standard: False)
+        :type force_command_sync: bool
+        :param selective_chunking: Ob beim Start nur die Mitglieder der Gilden mit konfigurierter Registrierung geladen werden sollen (Standard: False)
+        :type selective_chunking: bool
+        :param lean_member_cache: Ob nur Mitglieder mit Registrierungsrolle oder Registrierung im Cache behalten werden sollen (Standard: False)
+        :type lean_member_cache: bool
+        :param measure_member_cache: Ob der Speicherverbrauch und die Anzahl gecachter Mitglieder vor und nach dem Bereinigen protokolliert werden sollen (Standard: False)
+        :type measure_member_cache: bool
         :param options: Zusätzliche Optionen für den Client
         :type options: dict
         """
+        if selective_chunking:
+            options["chunk_guilds_at_startup"] = False
+        if lean_member_cache:
+            options.setdefault("member_cache_flags", lean_member_cache_flags(intents))
         super().__init__(intents=intents, **options, logger=logger)
         self.services = services.Services()
         self.tree = app_commands.CommandTree(self)
         self.overview_manager = overviews.Manager(self)
+        self.role_updates = RoleCoalescer()
+        self.role_jobs = RoleJobEngine(self)
         self.global_command_sync = global_command_sync
+        self.force_command_sync = force_command_sync
+        self.selective_chunking = selective_chunking
+        self.chunk_semaphore = asyncio.Semaphore(Chunking.CONCURRENCY.value)
+        self.lean_member_cache = lean_member_cache
+        self.member_retention = MemberRetention(self, measure=measure_member_cache)
 
-    async def update_loop(self, interval: int = 3600):
+    def is_chunked(self, guild: Guild) -> bool:
+        """
+        Überprüft, ob die Mitgliederliste einer Gilde geladen wurde, auch wenn sie im schlanken Modus bereits bereinigt wurde.
+
+        :param guild: Die Gilde
+        :type guild: discord.Guild
+        :return: True, wenn die Mitgliederliste geladen wurde, sonst False
+        :rtype: bool
+        """
+        return self.member_retention.is_chunked(guild)
+
+    async def chunk_guild(self, guild: Guild) -> bool:
+        """
+        Lädt die Mitgliederliste einer Gilde, falls sie noch nicht geladen wurde.
+        Es werden höchstens `Chunking.CONCURRENCY` Gilden gleichzeitig geladen.
+
+        :param guild: Die Gilde, deren Mitglieder geladen werden sollen
+        :type guild: discord.Guild
+        :return: True, wenn die Mitgliederliste geladen ist, sonst False
+        :rtype: bool
+        """
+        if self.is_chunked(guild):
+            return True
+        async with self.chunk_semaphore:
+            if self.is_chunked(guild):
+                return True
+            try:
+                start = asyncio.get_running_loop().time()
+                await asyncio.wait_for(guild.chunk(cache=True), timeout=Chunking.TIMEOUT.value)
+                logger.info(f"{guild.name} (ID: {guild.id}) - Chunked {guild.member_count} members in {asyncio.get_running_loop().time() - start:.1f}s.")
+                if self.lean_member_cache:
+                    await self.member_retention.prune(guild)
+                return True
+            except (asyncio.TimeoutError, HTTPException) as e:
+                logger.warning(f"{guild.name} (ID: {guild.id}) - Failed to chunk members: {e}")
+                return False
+
+    async def chunk_configured_guilds(self):
+        """
+        Lädt die Mitgliederlisten aller Gilden mit konfigurierter Registrierung, sortiert nach Anzahl der Registrierungen.
+        """
+        guilds = [guild for guild in map(self.get_guild, await self.services.wz.registration.guilds()) if guild is not None]
+        if not guilds:
+            return
+        start = asyncio.get_running_loop().time()
+        tasks = [asyncio.create_task(self.chunk_guild(guild)) for guild in guilds]
+        results = await asyncio.gather(*tasks)
+        logger.info(f"Chunked {sum(results)}/{len(guilds)} configured guilds ({len(self.guilds)} total) in {asyncio.get_running_loop().time() - start:.1f}s.")
+
+    async def update_loop(self, interval: float = Reconcile.TICK.value):
         """
         Periodische Aktualisierungsschleife für die Übersichten.
+        Statt alle Gilden vollständig zu synchronisieren, prüft der Reconciler die fälligen Gilden anhand günstiger Fingerabdrücke
+        und synchronisiert nur Gilden mit Abweichungen.
         
-        :param interval: Zeitintervall in Sekunden zwischen den Aktualisierungen (Standard: 900 Sekunden = 15 Minuten)
-        :type interval: int
+        :param interval: Zeitintervall in Sekunden zwischen zwei Prüfungen der fälligen Gilden (Standard: 60 Sekunden)
+        :type interval: float
         """
         await self.wait_until_ready()
+        if self.lean_member_cache:
+            self.overview_manager.reconciler.prepare = self.member_retention.prune
         while not self.is_closed():
-            for guild in self.guilds:            
-                try:
-                    logger.info(f"{guild.name} (ID: {guild.id}) - Starting overview update.")
-                    await self.overview_manager.sync(guild=guild, sync_data=True, sync_discord=True)
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    logger.exception(f"{guild.name} (ID: {guild.id}) - Error updating overviews: {e}")
+            self.role_updates.prune_ledger()
+            try:
+                await self.overview_manager.reconciler.tick()
+            except Exception as e:
+                logger.exception(f"Error reconciling overviews: {e}")
             await asyncio.sleep(interval)
     
     async def resource_monitor_loop(self, interval: int = Monitoring.Interval.value):
@@ -178,27 +253,81 @@ class Client(DiscordClient):
 
         logger.info(f"Total commands registered: {self.registered_commands}")
 
-    async def sync_commands_global(self):
-        """Synchronisiert die globalen Befehle, wenn global_command_sync aktiviert ist."""
+    async def command_fingerprint(self, guild: Optional[Guild] = None) -> str:
+        """
+        Berechnet den Fingerabdruck der Befehle eines Bereichs aus derselben Nutzlast, die `tree.sync()` an Discord senden würde.
+        Die Übersetzungen des `CommandTranslator` sind darin enthalten, geänderte Übersetzungen führen daher ebenfalls zu einer Synchronisierung.
+
+        :param guild: Die Gilde oder None für die globalen Befehle.
+        :type guild: Optional[discord.Guild]
+        :return: Der Fingerabdruck als Hex-String.
+        :rtype: str
+        """
+        commands = self.tree.get_commands(guild=guild)
+        translator = self.tree.translator
+        if translator:
+            payload = [await command.get_translated_payload(self.tree, translator) for command in commands]
+        else:
+            payload = [command.to_dict(self.tree) for command in commands]
+        serialized = json.dumps({"application": self.application_id, "commands": payload}, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    async def sync_scope(self, guild: Optional[Guild] = None, force: bool = False) -> Optional[bool]:
+        """
+        Synchronisiert die Befehle eines Bereichs nur, wenn sich ihr Fingerabdruck seit der letzten Synchronisierung geändert hat.
+
+        :param guild: Die Gilde oder None für die globalen Befehle.
+        :type guild: Optional[discord.Guild]
+        :param force: Ob auch bei unverändertem Fingerabdruck synchronisiert werden soll.
+        :type force: bool
+        :return: True, wenn synchronisiert wurde, False, wenn der Bereich unverändert war, oder None bei einem Fehler.
+        :rtype: Optional[bool]
+        """
+        scope = guild.id if guild else self.services.commands.GLOBAL
+        label = f"{guild.name} (ID: {guild.id})" if guild else "Global"
+        try:
+            fingerprint = await self.command_fingerprint(guild)
+            if not force and await self.services.commands.get(scope=scope) == fingerprint:
+                logger.debug(f"{label} - Commands unchanged, skipping sync.")
+                return False
+            await self.tree.sync(guild=guild)
+            await self.services.commands.set(scope=scope, hash=fingerprint)
+            logger.info(f"{label} - Commands synced successfully.")
+            return True
+        except Exception as e:
+            logger.exception(f"{label} - Failed to sync commands: {e}")
+            return None
+
+    async def sync_commands_global(self, force: Optional[bool] = None):
+        """
+        Synchronisiert die globalen Befehle, wenn global_command_sync aktiviert ist und sich die Befehle geändert haben.
+
+        :param force: Ob auch unveränderte Befehle synchronisiert werden sollen (Standard: force_command_sync des Clients).
+        :type force: Optional[bool]
+        """
         if self.global_command_sync == True:
-            try:
-                await self.tree.sync()
-                logger.info("Global commands synced successfully.")
-            except Exception as e:
-                logger.exception(f"Failed to sync global commands: {e}")
+            await self.sync_scope(None, force=self.force_command_sync if force is None else force)
 
-    async def sync_commands_guilds(self):
+    async def sync_commands_guilds(self, force: Optional[bool] = None):
         """
         Synchronisiert die Befehle für alle Gilden, wenn global_command_sync deaktiviert ist.
+        Gilden mit unverändertem Fingerabdruck werden übersprungen, die übrigen werden mit begrenzter Parallelität synchronisiert.
+
+        :param force: Ob auch unveränderte Befehle synchronisiert werden sollen (Standard: force_command_sync des Clients).
+        :type force: Optional[bool]
         """
         if self.global_command_sync == False:
-            for guild in self.guilds:
-                try:
+            force = self.force_command_sync if force is None else force
+            semaphore = asyncio.Semaphore(CommandSync.CONCURRENCY.value)
+
+            async def sync_guild(guild: Guild) -> Optional[bool]:
+                async with semaphore:
                     self.tree.copy_global_to(guild=guild)
-                    await self.tree.sync(guild=guild)
-                    logger.info(f"{guild.name} (ID: {guild.id}) - Commands synced successfully.")
-                except Exception as e:
-                    logger.exception(f"{guild.name} (ID: {guild.id}) - Failed to sync commands: {e}")
+                    return await self.sync_scope(guild, force=force)
+
+            start = asyncio.get_running_loop().time()
+            results = await asyncio.gather(*(sync_guild(guild) for guild in self.guilds))
+            logger.info(f"Command sync: {results.count(True)} synced, {results.count(False)} unchanged, {results.count(None)} failed of {len(results)} guilds in {asyncio.get_running_loop().time() - start:.1f}s.")
 
     async def clear_commands(self):
         """
@@ -227,15 +356,34 @@ class Client(DiscordClient):
         await self.services.setup()
 
         await self.tree.set_translator(CommandTranslator())
-        
-        await self.clear_commands()
+
+        # Der Baum ist hier noch leer: Im Gilden-Modus werden veraltete globale Befehle nur entfernt, wenn sie noch nicht entfernt wurden
+        if self.global_command_sync == False:
+            await self.sync_scope(None, force=self.force_command_sync)
 
         await self.register_commands()
 
+        # Persistente Buttons der Registrierungsmeldungen funktionieren nach einem Neustart ohne erneutes Bearbeiten der Nachrichten
+        self.add_dynamic_items(overviews.registration.RegistrationButton)
+
         asyncio.create_task(self.resource_monitor_loop())
+        asyncio.create_task(self.overview_manager.sweep_loop())
+        asyncio.create_task(self.overview_manager.repairs.run())
+        asyncio.create_task(self.update_loop())
 
         return await super().setup_hook()
 
+    async def close(self):
+        """
+        Beendet den Client geordnet. Vorher wird der Zustand der Übersichten für einen warmen Neustart gespeichert.
+        """
+        if self.is_ready() and not self.is_closed():
+            try:
+                self.overview_manager.save_snapshot()
+            except Exception as e:
+                logger.exception(f"Failed to save overview snapshot: {e}")
+        await super().close()
+
     async def on_ready(self):
         """
         Wird aufgerufen, wenn der Bot bereit ist. Protokolliert die Anmeldeinformationen und fügt alle Gilden zur Datenbank hinzu.
@@ -246,12 +394,24 @@ class Client(DiscordClient):
         for guild in self.guilds: 
             await self.services.servers.add(guild=guild)
 
+        if self.selective_chunking:
+            await self.chunk_configured_guilds()
+        elif self.lean_member_cache:
+            for guild in self.guilds:
+                await self.member_retention.prune(guild)
+
+        # Die Übersichten starten parallel zur Synchronisierung der Befehle, damit Klicks nicht auf die Befehle warten
+        startup = asyncio.create_task(self.overview_manager.startup())
         await self.sync_commands_guilds()
         await self.sync_commands_global()
 
-        await self.overview_manager.startup()
+        await startup
         logger.debug("Overview manager startup complete.")
 
+        resumed = await self.role_jobs.resume()
+        if resumed:
+            logger.info(f"Resumed {resumed} interrupted role job(s).")
+
     async def on_guild_join(self, guild: Guild):
         """
         Wird aufgerufen, wenn der Bot einer neuen Gilde beitritt. Fügt die Gilde zur Datenbank hinzu.
@@ -271,6 +431,8 @@ class Client(DiscordClient):
         :param guild: Die Gilde, die der Bot verlassen hat
         :type guild: discord.Guild
         """
+        self.member_retention.forget(guild)
+        self.overview_manager.evict(guild)
         if await self.services.remove_guild_data(guild=guild):
             logger.info(f"{guild.name} (ID: {guild.id}) - Removed guild from database on leave.")
         else:
@@ -324,13 +486,9 @@ class Client(DiscordClient):
             reg_roles = await self.services.wz.roles.get(guild=guild)
             if not reg_roles or before.id not in [r.role.id for r in reg_roles]:
                 return
-            views : overviews.Instances = await self.overview_manager.get_instances(guild=guild)
-
-            if views:
-                for overview in views:
-                    if isinstance(overview, RegistrationOverview):
-                        await overview.sync(sync_config=True)
-                    await overview.ensure()
+            # Die Rollen im Cache werden von discord.py aktualisiert, nur ein geänderter Name ist in den Übersichten sichtbar
+            if before.name != after.name:
+                await self.overview_manager.mark(guild, overviews.State.SyncEvent.CHANGED_DISPLAY)
 
         except Exception as e:
             logger.exception(f"{guild.name} (ID: {guild.id}) - Failed to handle role update for '{before.name}': {e}")
@@ -357,11 +515,10 @@ class Client(DiscordClient):
         
             await asyncio.gather(*tasks)
 
-            views : overviews.Instances = await self.overview_manager.get_instances(guild=guild)
-            if views:
-                for overview in views:
-                    await overview.sync(sync_config=True)
-                    await overview.ensure()
+            instance : overviews.registration.RegistrationOverview = await self.overview_manager.get_instance(guild=guild, instance_type=overviews.registration.RegistrationOverview)
+            if instance:
+                instance.forget_role(role.id)
+            self.overview_manager.schedule(guild)
         except Exception as e:
             logger.exception(f"{guild.name} (ID: {guild.id}) - Failed to remove deleted role '{role.name}' from WZ registration: {e}")
 
@@ -377,55 +534,44 @@ class Client(DiscordClient):
             registration : services.wz.RegistrationsRecord = await self.services.wz.registrations.get(guild=guild, member=member.id)
             if registration:
                 await self.services.wz.registrations.remove(guild=guild, member=member.id)
-                views : overviews.Instances = await self.overview_manager.get_instances(guild=guild)
-                if views:
-                    for overview in views:
-                        await overview.sync(sync_data=True)
-                        await overview.ensure()
+                await self.overview_manager.mark(guild, overviews.State.SyncEvent.CHANGED_REGISTRATIONS)
         except Exception as e:
             logger.exception(f"{guild.name} (ID: {guild.id}) - Failed to remove registration for departed member '{member}': {e}")
 
     async def on_member_update(self, before: Member, after: Member):
         """
         Wird aufgerufen, wenn ein Mitglied in einer Gilde aktualisiert wird. Aktualisiert die Registrierung des Mitglieds und synchronisiert die Übersichten, wenn eine Registrierung vorhanden ist.
+        Änderungen, die weder eine Registrierungsrolle noch den Anzeigenamen eines registrierten Mitglieds betreffen, werden ohne API-Aufruf verworfen.
 
         :param before: Das Mitglied vor der Aktualisierung
         :type before: discord.Member
         :param after: Das Mitglied nach der Aktualisierung
         :type after: discord.Member
         """
-        await asyncio.sleep(1) 
-        if after.roles != before.roles:
-            try:
-                async for entry in after.guild.audit_logs(limit=5, action=AuditLogAction.member_role_update):
-                    if entry.user.id == self.user.id and entry.target.id == after.id:
-                        return
-            except Forbidden:
-                # Bot doesn't have permission to view audit logs, continue anyway
-                pass
-        guild = before.guild
-        try:
-            instance : overviews.registration.RegistrationOverview = await self.overview_manager.get_instance(guild=guild, instance_type=overviews.registration.RegistrationOverview)
-            configuration : overviews.registration.Configuration = instance.configuration if instance else None
-            data : overviews.registration.Data = instance.data if instance else None
-
-            if not instance or not configuration or not data:
-                return
-            if configuration.is_valid == False:
-                return
-            
-            config_role_ids = {r.role.id for r in configuration.roles}
-
-            has_before = config_role_ids & {r.id for r in before.roles} 
-            has_after = config_role_ids & {r.id for r in after.roles}
+        instance : Optional[overviews.registration.RegistrationOverview] = self.overview_manager.cached_instance(after.guild.id, overviews.registration.RegistrationOverview)
+        if instance is None or not instance.configuration.is_valid:
+            return
+        # Nur die konfigurierten Rollen und der Anzeigename sind für die Übersicht relevant
+        role_ids = instance.configuration.role_ids
+        has_before = role_ids.intersection(before._roles)
+        has_after = role_ids.intersection(after._roles)
+        if has_before == has_after:
+            if before.display_name != after.display_name and instance.is_registered(after.id):
+                instance.mark(overviews.State.SyncEvent.CHANGED_DISPLAY)
+                self.overview_manager.schedule(after.guild)
+            return
+        # Eigene Rollenänderungen wurden bereits beim Auslöser berücksichtigt, der Reconciler übernimmt nur ihre Mitgliederzahlen
+        if self.role_updates.is_own(after):
+            instance.acknowledge_roles(has_before, has_after)
+            return
 
+        guild = after.guild
+        try:
             if len(has_after) > 1:
                 await self.services.wz.registrations.remove(guild=guild, member=before.id)
-                await after.remove_roles(*[r.role for r in configuration.roles if r.role.id in has_before], reason="Wz-Registrierung - Rolle entfernt")
-
-            if after in [m.member for m in data.members] or has_after or has_before:
-                await instance.sync(sync_data=True, sync_discord=True)
-                await instance.ensure()
+                await self.role_updates.update(after, remove=[r.role for r in instance.configuration.roles if r.role.id in has_before], reason="Wz-Registrierung - Rolle entfernt")
+            instance.mark(overviews.State.SyncEvent.CHANGED_DISCORD)
+            self.overview_manager.schedule(guild)
         except Exception as e:
             logger.exception(f"{guild.name} (ID: {guild.id}) - Failed to update registration for member '{before}': {e}")
 
@@ -436,11 +582,31 @@ class Client(DiscordClient):
         :param payload: Das Ereignis-Payload der gelöschten Nachricht
         :type payload: discord.RawMessageDeleteEvent
         """
-        guild = self.get_guild(payload.guild_id)
-        if not guild:
+        if payload.guild_id is None:
             return
         await self.overview_manager.on_message_delete(payload)
 
+    async def on_raw_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent):
+        """
+        Wird aufgerufen, wenn mehrere Nachrichten gesammelt gelöscht werden. Leitet das Ereignis einmalig an den Overview-Manager weiter.
+
+        :param payload: Das Ereignis-Payload der gelöschten Nachrichten
+        :type payload: discord.RawBulkMessageDeleteEvent
+        """
+        if payload.guild_id is None:
+            return
+        await self.overview_manager.on_bulk_message_delete(payload)
+
+    async def on_interaction(self, interaction: Interaction):
+        """
+        Wird bei jeder Interaktion aufgerufen. Im schlanken Cache-Modus bleibt das interagierende Mitglied beim nächsten Bereinigen im Cache.
+
+        :param interaction: Die Interaktion
+        :type interaction: discord.Interaction
+        """
+        if self.lean_member_cache:
+            self.member_retention.touch(interaction.guild, interaction.user.id)
+
     async def on_application_command_error(self, interaction: Interaction, error: app_commands.AppCommandError):
         """
         Globaler Fehlerhandler für Befehlsfehler. Sendet eine Fehlermeldung an den Benutzer und protokolliert den Fehler.
@@ -0,0 +1,152 @@
+"""
+Dieses Modul enthält die Aufbewahrungsstrategie für den schlanken Mitglieder-Cache.
+Im schlanken Modus behält der Client pro Gilde nur Mitglieder im Cache, die eine konfigurierte Registrierungsrolle besitzen,
+in `WzRegistrations` registriert sind oder gerade mit dem Bot interagieren. Alle anderen Mitglieder werden bei Bedarf
+über :func:`HmWz.utils.fetch_members` nachgeladen.
+"""
+from __future__ import annotations
+import gc
+import logging
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from discord import Client, Intents, MemberCacheFlags
+
+from ..types import Guild, Id
+
+__all__ = ["MemberRetention", "lean_member_cache_flags"]
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+def lean_member_cache_flags(intents: Intents) -> MemberCacheFlags:
+    """
+    Gibt die Cache-Flags für den schlanken Modus zurück. Mitglieder werden weiterhin über Join und Chunking gecacht,
+    damit die Aufbewahrungsstrategie sie filtern kann, Voice-Zustände werden nicht gecacht.
+
+    :param intents: Die Intents des Clients.
+    :type intents: discord.Intents
+    :return: Die Cache-Flags.
+    :rtype: discord.MemberCacheFlags
+    """
+    flags = MemberCacheFlags.from_intents(intents)
+    flags.voice = False
+    return flags
+
+class MemberRetention:
+    """
+    Entfernt nicht benötigte Mitglieder aus dem Cache einer Gilde.
+
+    :param client: Der Discord-Client.
+    :type client: discord.Client
+    :param measure: Ob der Speicherverbrauch und die Anzahl gecachter Mitglieder vor und nach dem Bereinigen protokolliert werden sollen.
+    :type measure: bool
+    """
+    def __init__(self, client: Client, measure: bool = False):
+        self.client : Client = client
+        self.measure : bool = measure and PSUTIL_AVAILABLE
+        self.pruned : Set[Id] = set()
+        self.active : Dict[Id, Set[Id]] = {}
+        if measure and not PSUTIL_AVAILABLE:
+            logger.info("Member cache measurement disabled (psutil not installed)")
+
+    def is_chunked(self, guild: Guild) -> bool:
+        """
+        Überprüft, ob die Mitgliederliste einer Gilde vollständig geladen wurde.
+        Nach dem Bereinigen meldet `guild.chunked` False, obwohl alle benötigten Mitglieder im Cache sind.
+
+        :param guild: Die Gilde.
+        :type guild: discord.Guild
+        :return: True, wenn die Gilde geladen oder geladen und bereinigt wurde, sonst False.
+        :rtype: bool
+        """
+        return guild.chunked or guild.id in self.pruned
+
+    def touch(self, guild: Optional[Guild], member: Id) -> None:
+        """
+        Merkt sich ein Mitglied, das gerade mit dem Bot interagiert, damit es beim nächsten Bereinigen im Cache bleibt.
+
+        :param guild: Die Gilde der Interaktion.
+        :type guild: Optional[discord.Guild]
+        :param member: Die ID des Mitglieds.
+        :type member: int
+        """
+        if guild is not None:
+            self.active.setdefault(guild.id, set()).add(member)
+
+    async def retained(self, guild: Guild) -> Set[Id]:
+        """
+        Gibt die IDs der Mitglieder zurück, die im Cache bleiben sollen.
+
+        :param guild: Die Gilde.
+        :type guild: discord.Guild
+        :return: Die IDs der Mitglieder.
+        :rtype: Set[int]
+        """
+        services = self.client.services
+        ids : Set[Id] = {self.client.user.id} if self.client.user else set()
+        ids |= self.active.pop(guild.id, set())
+        registrations = await services.wz.registrations.get(guild=guild) or ()
+        ids.update(record.member for record in registrations)
+        roles = await services.wz.roles.get(guild=guild) or ()
+        for record in roles:
+            role = guild.get_role(record.role)
+            if role is not None:
+                ids.update(member.id for member in role.members)
+        return ids
+
+    async def prune(self, guild: Guild) -> int:
+        """
+        Entfernt alle Mitglieder aus dem Cache der Gilde, die nicht behalten werden sollen.
+
+        :param guild: Die Gilde.
+        :type guild: discord.Guild
+        :return: Die Anzahl der entfernten Mitglieder.
+        :rtype: int
+        """
+        if not self.is_chunked(guild):
+            return 0
+        before = self.memory() if self.measure else None
+        keep = await self.retained(guild)
+        removed = [member for member in guild.members if member.id not in keep]
+        # discord.py bietet keine öffentliche API zum Entfernen einzelner Mitglieder aus dem Cache.
+        # `_remove_member` ist dieselbe Methode, die discord.py bei GUILD_MEMBER_REMOVE verwendet, und muss bei Updates von discord.py geprüft werden
+        for member in removed:
+            guild._remove_member(member)
+        self.pruned.add(guild.id)
+        if removed:
+            logger.info(f"{guild.name} (ID: {guild.id}) - Pruned {len(removed)} members from cache, {len(guild.members)} retained.")
+        if before is not None:
+            # Ohne Garbage Collection bleiben die entfernten Mitglieder in Referenzzyklen erhalten und der Speicher sinkt nicht
+            gc.collect()
+            after = self.memory()
+            logger.info(f"{guild.name} (ID: {guild.id}) - Member cache: {before[0]:.1f} MB RSS with {before[1]} cached members before, {after[0]:.1f} MB RSS with {after[1]} cached members after pruning.")
+        return len(removed)
+
+    def forget(self, guild: Guild) -> None:
+        """
+        Entfernt den Zustand einer Gilde, z.B. wenn der Bot die Gilde verlässt.
+
+        :param guild: Die Gilde.
+        :type guild: discord.Guild
+        """
+        self.pruned.discard(guild.id)
+        self.active.pop(guild.id, None)
+
+    def memory(self) -> Tuple[float, int]:
+        """
+        Gibt den residenten Speicher des Prozesses und die Anzahl gecachter Mitglieder über alle Gilden zurück.
+        Die Werte werden absolut gemeldet, da der residente Speicher nach dem Bereinigen nicht sofort sinkt, die Anzahl der Mitglieder aber schon.
+
+        :return: Der Speicher in MB und die Anzahl gecachter Mitglieder, 0 MB wenn psutil nicht verfügbar ist.
+        :rtype: Tuple[float, int]
+        """
+        members = sum(len(guild.members) for guild in self.client.guilds)
+        if not PSUTIL_AVAILABLE:
+            return 0.0, members
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 / 1024, members
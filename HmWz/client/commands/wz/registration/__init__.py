@@ -1,5 +1,5 @@
 from discord.app_commands import Group, checks, locale_str
-from . import reset, csv
+from . import reset, csv, plan
 from .....i18n import CommandLocalizations
 
 
@@ -16,4 +16,5 @@ class RegistrationGroup(Group):
         )
         
         self.add_command(reset.reset)
-        self.add_command(csv.csv)
\ No newline at end of file
+        self.add_command(csv.csv)
+        self.add_command(plan.plan)
\ No newline at end of file
@@ -38,10 +38,10 @@ async def csv(interaction: Interaction, ephemeral: bool = True):
         overview_instance: RegistrationOverview = await overview_manager.get_instance(interaction.guild, RegistrationOverview) if overview_manager else None
         configuration: Configuration = overview_instance.configuration if overview_instance else None
         data: Data = overview_instance.data if overview_instance else None
-        if not services or not overview_manager or not overview_instance or not configuration or not data:
+        if not services or not overview_manager:
             raise TypeError(LOGS["NO_SERVICES_OR_OVERVIEW"])
         
-        if configuration.is_valid == False:
+        if configuration is None or configuration.is_valid == False:
             await interaction.followup.send(t(interaction, "wz.registration.error.not_configured"), ephemeral=True)
             return
         
@@ -50,15 +50,9 @@ async def csv(interaction: Interaction, ephemeral: bool = True):
             logger.warning(LOGS["NO_REGISTRATIONS"])
             return
         
-        csv_content = "NR; Discord_Name; Guild_Name; Role; Timestamp; Score; Comment\n"
-        for idx, member in enumerate(data.members, start=1):
-            user_name = member.member.name if member.member and member.member.name else "null"
-            member_name = member.member.display_name if member.member and member.member.display_name else "null"
-            role_name = member.role.role.name if member.role else "Unknown Role"
-            score = member.score if member.score is not None else 0
-            comment = ""
-            timestamp = member.timestamp if member.timestamp else "Unknown Timestamp"
-            csv_content += f"{idx}; {user_name}; {member_name}; {role_name}; {timestamp}; {score}; {comment}\n"
+        # Nicht während einer Synchronisation exportieren, damit der Export einen konsistenten Stand enthält
+        async with overview_instance.operations.read():
+            csv_content = overview_instance.export_csv()
         try:
             bio = io.BytesIO(csv_content.encode('utf-8-sig'))
             bio.seek(0)
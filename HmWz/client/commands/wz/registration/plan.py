@@ -0,0 +1,63 @@
+import logging
+from discord import app_commands, Interaction
+from ....overviews import Manager
+from ....overviews.registration import RegistrationOverview
+from .....i18n import CommandLocalizations, t
+
+logger = logging.getLogger(__name__)
+
+@app_commands.checks.has_permissions(moderate_members=True, manage_messages=True)
+@app_commands.command(
+    name="plan",
+    description=app_commands.locale_str(
+        CommandLocalizations.get("en", {}).get("wz.registration.plan.description", "-"),
+        key="wz.registration.plan.description",
+    ),
+)
+@app_commands.describe(
+    apply=app_commands.locale_str(
+        CommandLocalizations.get("en", {}).get("wz.registration.plan.apply.description", "-"),
+        key="wz.registration.plan.apply.description",
+    ),
+    ephemeral=app_commands.locale_str(
+        CommandLocalizations.get("en", {}).get("ephemeral.description", "-"),
+        key="ephemeral.description",
+    )
+)
+@app_commands.checks.cooldown(1, 60, key=lambda i: (i.guild_id))
+async def plan(interaction: Interaction, apply: bool = False, ephemeral: bool = True):
+    LOG_CONTEXT = f"{interaction.guild.name}({interaction.guild.id}) - {interaction.user} - WZ Registration Plan : "
+    LOGS = {
+        "EXCEPTION": f"{LOG_CONTEXT}",
+        "NO_OVERVIEW": f"{LOG_CONTEXT} Overview manager not found on client.",
+        "PLAN": f"{LOG_CONTEXT} Planned",
+        "APPLY_FAILED": f"{LOG_CONTEXT} Failed to apply plan.",
+    }
+    try:
+        await interaction.response.defer(ephemeral=ephemeral)
+        overview_manager: Manager = getattr(interaction.client, "overview_manager", None)
+        if not overview_manager:
+            raise TypeError(LOGS["NO_OVERVIEW"])
+        overview_instance: RegistrationOverview = await overview_manager.get_instance(interaction.guild, RegistrationOverview)
+
+        if overview_instance is None or not overview_instance.configuration.is_valid:
+            await interaction.followup.send(t(interaction, "wz.registration.error.not_configured"), ephemeral=True)
+            return
+
+        # Ohne `apply` wird der Plan nur angezeigt (Dry-Run)
+        result = await overview_instance.plan()
+        logger.info(f"{LOGS['PLAN']} {result.summary()}")
+        if result.is_empty:
+            await interaction.followup.send(t(interaction, "wz.registration.plan.no_changes"), ephemeral=ephemeral)
+            return
+        if not apply:
+            await interaction.followup.send(t(interaction, "wz.registration.plan.dry_run", summary=result.summary(), steps="\n".join(result.lines())), ephemeral=ephemeral)
+            return
+        if not await overview_instance.apply(result):
+            logger.warning(LOGS["APPLY_FAILED"])
+            await interaction.followup.send(t(interaction, "wz.registration.plan.error"), ephemeral=True)
+            return
+        await interaction.followup.send(t(interaction, "wz.registration.plan.applied", summary=result.summary()), ephemeral=ephemeral)
+    except Exception as e:
+        await interaction.followup.send(t(interaction, "wz.registration.plan.error"), ephemeral=True)
+        logger.exception(f"{LOGS['EXCEPTION']} {e}")
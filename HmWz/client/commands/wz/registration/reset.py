@@ -1,14 +1,47 @@
-import asyncio
 import logging
 from discord import app_commands, Interaction, HTTPException, Forbidden, NotFound, InteractionResponded
-from .....emojis import Emojis
 from .....services import Services
+from .....services.jobs import RoleJobs
+from .....types import Guild
+from ....jobs import RoleJobEngine, finalizer, reporter
 from ....overviews import Manager
 from ....overviews.registration import RegistrationOverview, Configuration, Data
 from .....i18n import CommandLocalizations, t
 
 logger = logging.getLogger(__name__)
 
+RESET = "wz.registration.reset"
+"""Aktion des Rollen-Jobs für das Zurücksetzen der Registrierungen."""
+
+@finalizer(RESET)
+async def finalize_reset(client, guild: Guild, job: RoleJobs.Data) -> bool:
+    """
+    Entfernt nach dem Entfernen der Rollen die nicht permanenten Registrierungen und aktualisiert die Übersicht.
+    Wird auch ausgeführt, wenn ein Reset nach einem Neustart fortgesetzt wurde.
+    """
+    services: Services = client.services
+    roles = await services.wz.roles.get(guild=guild, permanent=False)
+    roles_ids = tuple(role.role for role in roles) if roles else tuple()
+    if not roles_ids:
+        return True
+    if not await services.wz.registrations.remove(guild=guild, roles=roles_ids):
+        return False
+    overview_instance: RegistrationOverview = await client.overview_manager.get_instance(guild, RegistrationOverview)
+    if overview_instance:
+        await overview_instance.clean()
+        await overview_instance.sync(sync_config=True, sync_data=True)
+        await overview_instance.ensure()
+    return True
+
+@reporter(RESET)
+def report_reset(guild: Guild, job: RoleJobs.Data, result: bool, failed: int) -> str:
+    """
+    Erstellt die Rückmeldung eines Resets für den Kanal, in dem der Reset ausgelöst wurde.
+    """
+    if failed:
+        return t(guild, "wz.registration.reset.failed", failed=failed)
+    return t(guild, "wz.registration.reset.success" if result else "wz.registration.reset.error")
+
 @app_commands.checks.has_permissions(moderate_members=True, manage_messages=True)
 @app_commands.command(
     name="reset",
@@ -39,10 +72,10 @@ async def reset(interaction: Interaction, ephemeral: bool = True):
         overview_instance: RegistrationOverview = await overview_manager.get_instance(interaction.guild, RegistrationOverview) if overview_manager else None
         configuration: Configuration = overview_instance.configuration if overview_instance else None
         data: Data = overview_instance.data if overview_instance else None
-        if not services or not overview_manager or not overview_instance or not configuration or not data:
+        if not services or not overview_manager:
             raise TypeError(LOGS["NO_SERVICES_OR_OVERVIEW"])
         
-        if not configuration.is_valid:
+        if configuration is None or not configuration.is_valid:
             await interaction.followup.send(t(interaction, "wz.registration.error.not_configured"), ephemeral=True)
             raise ValueError(LOGS["NOT_CONFIGURED"])
 
@@ -51,20 +84,21 @@ async def reset(interaction: Interaction, ephemeral: bool = True):
             logger.warning(LOGS["NO_REGISTRATIONS"])
             return
         
-        for member in data.members:
-            try: 
-                if member.member and member.role and not member.role.permanent:
-                    await member.member.remove_roles(member.role.role, reason="WZ Registration Reset")
-                    await asyncio.sleep(0.05)
-            except (HTTPException, Forbidden, NotFound) as e:
-                logger.warning(f"{LOG_CONTEXT} Failed to remove role {member.role.role.id} from member {member.member.id} during WZ reset: {e}")
-        
-        success = await services.wz.registrations.remove(guild=interaction.guild, roles=configuration.non_permanent_roles_ids)
-        if success:
-            await overview_instance.clean()
-            await overview_instance.sync(sync_config=True, sync_data=True)
-            await overview_instance.ensure()
-            await interaction.followup.send(t(interaction, "wz.registration.reset.success"), ephemeral=ephemeral)
+        role_jobs: RoleJobEngine = getattr(interaction.client, "role_jobs")
+        entries = [
+            (member.id, configured.role.id)
+            for configured in configuration.non_permanent_roles
+            for member in configured.role.members
+            if not member.bot
+        ]
+
+        async def progress(done: int, total: int) -> None:
+            await interaction.edit_original_response(content=t(interaction, "wz.registration.reset.progress", done=done, total=total))
+
+        # Nicht auf den Job warten: Das Token der Interaktion läuft nach 15 Minuten ab, das Ergebnis meldet der Job im Kanal
+        task = await role_jobs.submit(interaction.guild, action=RESET, entries=entries, reason="WZ Registration Reset", progress=progress, channel=interaction.channel_id)
+        if task is not None:
+            await interaction.followup.send(t(interaction, "wz.registration.reset.started"), ephemeral=ephemeral)
         else:
             await interaction.followup.send(t(interaction, "wz.registration.reset.error"), ephemeral=ephemeral)
     except (ValueError, HTTPException, Forbidden, NotFound, InteractionResponded, Exception) as e:
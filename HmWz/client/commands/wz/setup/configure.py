@@ -3,6 +3,7 @@ from typing import Optional
 from discord import app_commands, Interaction, TextChannel, Role, HTTPException, Forbidden, NotFound
 from discord.app_commands import checks
 from .....services import Services
+from .....retry import policy
 from ....overviews import Manager
 from .....i18n import CommandLocalizations, t
 
@@ -58,7 +59,8 @@ async def configure(interaction: Interaction, channel: TextChannel, role: Option
             success_role = await services.wz.roles.add(guild=interaction.guild, role=role.id, permanent=False, score=1)
 
         if success_channel or success_role:
-           
+            policy.breaker.reset(interaction.guild.id)
+            await interaction.client.chunk_guild(interaction.guild)
             await overview_manager.sync(guild=interaction.guild, sync_config=True, sync_discord=True)
             await overview_manager.ensure(guild=interaction.guild)
             await interaction.followup.send(t(interaction, "wz.setup.configure.success", channel_name=channel.name), ephemeral=True)
@@ -6,12 +6,42 @@ from ...... import utils
 from .....overviews import Manager
 from .....overviews.registration import RegistrationOverview, Configuration, Data
 from discord.app_commands import checks
+from ......services.jobs import RoleJobs
+from ......types import Guild
+from .....jobs import RoleJobEngine, finalizer, reporter
 
 from ......i18n import CommandLocalizations, t
 from ...... import configuration
 
 logger = logging.getLogger(__name__)
 
+ROLE_REMOVE = "wz.setup.roles.remove"
+"""Aktion des Rollen-Jobs für das Entfernen einer Registrierungsrolle."""
+
+@finalizer(ROLE_REMOVE)
+async def finalize_remove(client, guild: Guild, job: RoleJobs.Data) -> bool:
+    """
+    Entfernt die Registrierungsrolle aus der Konfiguration und aktualisiert die Übersicht, nachdem sie allen Mitgliedern abgenommen wurde.
+    """
+    services: Services = client.services
+    if job.target is not None and not await services.wz.roles.remove(guild=guild, role=job.target):
+        return False
+    manager: Manager = client.overview_manager
+    await manager.sync(guild=guild, sync_config=True, sync_data=True)
+    await manager.ensure(guild=guild)
+    return True
+
+@reporter(ROLE_REMOVE)
+def report_remove(guild: Guild, job: RoleJobs.Data, result: bool, failed: int) -> str:
+    """
+    Erstellt die Rückmeldung für den Kanal, in dem das Entfernen der Registrierungsrolle ausgelöst wurde.
+    """
+    role = guild.get_role(job.target) if job.target is not None else None
+    role_name = role.name if role else str(job.target)
+    if failed:
+        return t(guild, "wz.setup.roles.remove.failed", role_name=role_name, failed=failed)
+    return t(guild, "wz.setup.roles.remove.success", role_name=role_name) if result else t(guild, "wz.setup.roles.remove.error")
+
 async def remove_autocomplete(interaction: Interaction, current: str) -> tuple[app_commands.Choice[str]]:
     manager: Manager = getattr(interaction.client, "overview_manager", None)
     instance: RegistrationOverview = await manager.get_instance(interaction.guild, RegistrationOverview) if manager else None
@@ -76,19 +106,17 @@ async def remove(interaction: Interaction, role: str):
             logger.warning(LOGS["MIN_ROLES"])
             return
         
-        for member in interaction.guild.members:
-            if member.bot:
-                continue
-            if role_to_remove in member.roles:
-                try:
-                    await member.remove_roles(role_to_remove, reason="WZ Registration Role Removal")
-                except (HTTPException, Forbidden) as e:
-                    logger.exception(f"{log_context} Failed to remove role {role_to_remove.name} from member {member}: {e}")
-        
-        if await services.wz.roles.remove(guild=interaction.guild, role=role_to_remove.id):
-            await interaction.followup.send(t(interaction, "wz.setup.roles.remove.success", role_name=role_to_remove.name), ephemeral=True)
-            await manager.sync(guild=interaction.guild, sync_config=True, sync_data=True)
-            await manager.ensure(guild=interaction.guild)
+        role_jobs: RoleJobEngine = getattr(interaction.client, "role_jobs")
+        entries = [(member.id, role_to_remove.id) for member in role_to_remove.members if not member.bot]
+
+        async def progress(done: int, total: int) -> None:
+            await interaction.edit_original_response(content=t(interaction, "wz.setup.roles.remove.progress", role_name=role_to_remove.name, done=done, total=total))
+
+        # Die Rolle wird erst im Abschluss-Handler aus der Konfiguration entfernt, wenn sie allen Mitgliedern abgenommen wurde.
+        # Das Ergebnis meldet der Job im Kanal, da das Token der Interaktion nach 15 Minuten abläuft
+        task = await role_jobs.submit(interaction.guild, action=ROLE_REMOVE, entries=entries, reason="WZ Registration Role Removal", progress=progress, channel=interaction.channel_id, target=role_to_remove.id)
+        if task is not None:
+            await interaction.followup.send(t(interaction, "wz.setup.roles.remove.started", role_name=role_to_remove.name), ephemeral=True)
             logger.debug(LOGS["ROLE_REMOVED"].format(role_name=role_to_remove.name))
         else:
             await interaction.followup.send(t(interaction, "wz.setup.roles.remove.error"), ephemeral=True)
@@ -0,0 +1,398 @@
+"""
+Dieses Modul enthält die Engine für Rollen-Jobs.
+Ein Rollen-Job entfernt eine Rolle bei vielen Mitgliedern. Die Mitgliederliste wird in SQLite gespeichert und mit begrenzter,
+an das Rate-Limit angepasster Parallelität abgearbeitet. Der Fortschritt wird regelmäßig gesichert, sodass ein Job nach einem Neustart fortgesetzt wird.
+
+:mod:`FINALIZERS` enthält die Abschluss-Handler pro Aktion, die mit dem Dekorator :func:`finalizer` registriert werden.
+Sie werden nur ausgeführt, wenn alle Mitglieder eines Jobs erfolgreich bearbeitet wurden, auch wenn der Job nach einem Neustart fortgesetzt wurde.
+Fehlgeschlagene Schritte bleiben offen und werden mit wachsendem Abstand erneut versucht, auch über einen Neustart hinweg, oder durch einen neuen Job
+derselben Aktion ersetzt. Nach `Jobs.MAX_ATTEMPTS` Durchläufen mit fehlgeschlagenen Schritten wird der Job als fehlgeschlagen geschlossen.
+
+:mod:`REPORTERS` enthält die Rückmeldungen pro Aktion, die mit dem Dekorator :func:`reporter` registriert werden.
+Das Ergebnis wird einmalig im Kanal des Jobs gemeldet, sobald der Job abgeschlossen oder endgültig fehlgeschlagen ist, da das Token der auslösenden Interaktion bei großen Gilden abläuft, bevor der Job fertig ist.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from discord import Client
+
+from ..configuration import Jobs
+from ..exception import Forbidden, NotFound, HTTPException
+from ..retry import policy
+from ..services.jobs import RoleJobs, RoleJobMembers
+from ..types import Guild, Id, Member
+
+__all__ = ["RoleJobEngine", "AdaptiveLimiter", "FINALIZERS", "finalizer", "REPORTERS", "reporter"]
+
+logger = logging.getLogger(__name__)
+
+type Progress = Callable[[int, int], Awaitable[None]]
+"""Typalias für einen Fortschritts-Callback, der mit der Anzahl der bearbeiteten und aller Mitglieder aufgerufen wird."""
+
+type Finalizer = Callable[[Client, Guild, RoleJobs.Data], Awaitable[bool]]
+"""Typalias für einen Abschluss-Handler eines Rollen-Jobs."""
+
+type Reporter = Callable[[Guild, RoleJobs.Data, bool, int], Optional[str]]
+"""Typalias für die Rückmeldung eines Rollen-Jobs, die aus Gilde, Job, Ergebnis und Anzahl fehlgeschlagener Schritte die Nachricht erstellt."""
+
+FINALIZERS: Dict[str, Finalizer] = {}
+"""Registry für die Abschluss-Handler der Rollen-Jobs, Schlüssel ist die Aktion des Jobs."""
+
+REPORTERS: Dict[str, Reporter] = {}
+"""Registry für die Rückmeldungen der Rollen-Jobs, Schlüssel ist die Aktion des Jobs."""
+
+def finalizer(action: str) -> Callable[[Finalizer], Finalizer]:
+    """
+    Dekorator zum Registrieren eines Abschluss-Handlers für eine Aktion.
+
+    :param action: Die Aktion, für die der Handler registriert wird.
+    :type action: str
+    :return: Der Dekorator.
+    :rtype: Callable[[Finalizer], Finalizer]
+    """
+    def decorator(func: Finalizer) -> Finalizer:
+        FINALIZERS[action] = func
+        return func
+    return decorator
+
+def reporter(action: str) -> Callable[[Reporter], Reporter]:
+    """
+    Dekorator zum Registrieren einer Rückmeldung für eine Aktion.
+
+    :param action: Die Aktion, für die die Rückmeldung registriert wird.
+    :type action: str
+    :return: Der Dekorator.
+    :rtype: Callable[[Reporter], Reporter]
+    """
+    def decorator(func: Reporter) -> Reporter:
+        REPORTERS[action] = func
+        return func
+    return decorator
+
+class AdaptiveLimiter:
+    """
+    Begrenzt die Anzahl gleichzeitiger Discord-Aufrufe und passt das Limit an die Rückmeldung des Rate-Limits an (AIMD).
+    Nach `limit` schnellen, erfolgreichen Aufrufen wird das Limit um eins erhöht. Ein langsamer oder fehlgeschlagener Aufruf,
+    z.B. weil discord.py auf ein Rate-Limit-Bucket warten musste, halbiert das Limit.
+
+    :param limit: Das anfängliche Limit.
+    :type limit: int
+    :param minimum: Das minimale Limit.
+    :type minimum: int
+    :param maximum: Das maximale Limit.
+    :type maximum: int
+    """
+    def __init__(self, limit: int = Jobs.CONCURRENCY.value, minimum: int = Jobs.MIN_CONCURRENCY.value, maximum: int = Jobs.MAX_CONCURRENCY.value):
+        self.limit : int = limit
+        self.minimum : int = minimum
+        self.maximum : int = maximum
+        self.active : int = 0
+        self.successes : int = 0
+        self.condition : asyncio.Condition = asyncio.Condition()
+
+    async def __aenter__(self) -> AdaptiveLimiter:
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def feedback(self, fast: bool) -> None:
+        """
+        Passt das Limit anhand eines abgeschlossenen Aufrufs an.
+
+        :param fast: True, wenn der Aufruf schnell und erfolgreich war, sonst False.
+        :type fast: bool
+        """
+        if fast:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.maximum:
+                self.limit += 1
+                self.successes = 0
+        else:
+            self.successes = 0
+            self.limit = max(self.minimum, self.limit // 2)
+
+class RoleJobEngine:
+    """
+    Führt Rollen-Jobs aus, sichert deren Fortschritt und setzt unterbrochene Jobs nach einem Neustart fort.
+
+    :param client: Der Discord-Client.
+    :type client: discord.Client
+    """
+    def __init__(self, client: Client):
+        self.client : Client = client
+        self.tasks : Dict[Id, asyncio.Task] = {}
+        self.waiting : Set[Id] = set()
+
+    @property
+    def services(self):
+        """Gibt die Services des Clients zurück."""
+        return self.client.services
+
+    async def submit(self, guild: Guild, *, action: str, entries: Iterable[Tuple[Id, Id]], reason: Optional[str] = None, progress: Optional[Progress] = None, channel: Optional[Id] = None, target: Optional[Id] = None) -> Optional[asyncio.Task]:
+        """
+        Legt einen neuen Rollen-Job an und startet ihn. Ein offener, nicht laufender Job derselben Aktion und desselben Ziels,
+        z.B. einer, der nach fehlgeschlagenen Schritten auf den nächsten Versuch wartet, wird dabei verworfen,
+        da der neue Job die Mitglieder aus dem aktuellen Stand ermittelt.
+
+        :param guild: Die Gilde, in der der Job ausgeführt wird.
+        :type guild: discord.Guild
+        :param action: Die Aktion des Jobs, anhand derer der Abschluss-Handler gewählt wird.
+        :type action: str
+        :param entries: Die zu entfernenden Rollen als Tupel aus Mitglieder-ID und Rollen-ID.
+        :type entries: Iterable[Tuple[int, int]]
+        :param reason: Der Grund für das Audit-Log.
+        :type reason: Optional[str]
+        :param progress: Optionaler Callback, der regelmäßig mit dem Fortschritt aufgerufen wird.
+        :type progress: Optional[Progress]
+        :param channel: Die ID des Kanals, in dem das Ergebnis gemeldet wird.
+        :type channel: Optional[int]
+        :param target: Die ID des Objekts, auf das sich der Job bezieht, z.B. die entfernte Registrierungsrolle.
+        :type target: Optional[int]
+        :return: Der Task des Jobs, dessen Ergebnis angibt, ob der Job erfolgreich war, oder None, wenn der Job nicht angelegt werden konnte.
+        :rtype: Optional[asyncio.Task]
+        """
+        for stale in await self.services.jobs.roles.get(running=True) or ():
+            if stale.guild == guild.id and stale.action == action and stale.target == target and (stale.job not in self.tasks or stale.job in self.waiting):
+                if stale.job in self.waiting:
+                    self.tasks[stale.job].cancel()
+                logger.info(f"{guild.name} ({guild.id}) - Role job {stale.job} ({action}) superseded by a new job at {stale.done}/{stale.total}.")
+                await self.close(stale)
+        entries = tuple(dict.fromkeys(entries))
+        job = await self.services.jobs.roles.add(guild=guild, action=action, reason=reason, total=len(entries), channel=channel, target=target)
+        if job is None:
+            return None
+        if not await self.services.jobs.members.add(job=job, entries=entries):
+            await self.services.jobs.roles.finish(job=job)
+            return None
+        records = await self.services.jobs.roles.get(job=job)
+        if not records:
+            return None
+        return self._start(records[0], progress)
+
+    async def resume(self) -> int:
+        """
+        Setzt alle laufenden Jobs aus der Datenbank fort, die nicht bereits ausgeführt werden.
+        Jobs, deren letzter Durchlauf fehlgeschlagene Schritte hatte, werden erst nach der Wartezeit ihres Versuchs fortgesetzt.
+
+        :return: Die Anzahl der fortgesetzten Jobs.
+        :rtype: int
+        """
+        records = await self.services.jobs.roles.get(running=True) or ()
+        resumed = 0
+        for record in records:
+            if record.job in self.tasks:
+                continue
+            delay = self.delay(record.attempts)
+            logger.info(f"Resuming role job {record.job} ({record.action}) for guild {record.guild} at {record.done}/{record.total} in {delay:.0f}s (attempt {record.attempts + 1}).")
+            self._start(record, None, delay)
+            resumed += 1
+        return resumed
+
+    @staticmethod
+    def delay(attempts: int) -> float:
+        """
+        Gibt die Wartezeit vor dem nächsten Durchlauf eines Jobs zurück, die sich mit jedem fehlgeschlagenen Durchlauf verdoppelt.
+
+        :param attempts: Die Anzahl der bisherigen Durchläufe mit fehlgeschlagenen Schritten.
+        :type attempts: int
+        :return: Die Wartezeit in Sekunden.
+        :rtype: float
+        """
+        if attempts <= 0:
+            return 0.0
+        return min(Jobs.RETRY_DELAY.value * 2 ** (attempts - 1), Jobs.MAX_RETRY_DELAY.value)
+
+    def _start(self, job: RoleJobs.Data, progress: Optional[Progress], delay: float = 0.0) -> asyncio.Task:
+        task = asyncio.create_task(self._delayed(job, progress, delay) if delay > 0 else self.run(job, progress))
+        self.tasks[job.job] = task
+        task.add_done_callback(lambda done: self.tasks.pop(job.job) if self.tasks.get(job.job) is done else None)
+        return task
+
+    async def _delayed(self, job: RoleJobs.Data, progress: Optional[Progress], delay: float) -> bool:
+        """
+        Wartet die Wartezeit eines Versuchs ab und führt den Job dann mit seinem aktuellen Stand aus der Datenbank aus.
+        Während der Wartezeit kann der Job durch einen neuen Job derselben Aktion ersetzt werden.
+        """
+        self.waiting.add(job.job)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.waiting.discard(job.job)
+        records = await self.services.jobs.roles.get(job=job.job)
+        if not records or not records[0].is_running:
+            return False
+        return await self.run(records[0], progress)
+
+    async def run(self, job: RoleJobs.Data, progress: Optional[Progress] = None) -> bool:
+        """
+        Arbeitet alle offenen Schritte eines Jobs ab und führt anschließend den Abschluss-Handler aus.
+        Schlägt ein Schritt fehl, bleibt er offen und der Job wird nach einer Wartezeit erneut versucht, der Abschluss-Handler wird dann nicht ausgeführt.
+        Nach `Jobs.MAX_ATTEMPTS` solchen Durchläufen wird der Job als fehlgeschlagen geschlossen und das Ergebnis gemeldet.
+
+        :param job: Der auszuführende Job.
+        :type job: RoleJobs.Data
+        :param progress: Optionaler Callback, der regelmäßig mit dem Fortschritt aufgerufen wird.
+        :type progress: Optional[Progress]
+        :return: True, wenn der Job und sein Abschluss-Handler erfolgreich waren, sonst False.
+        :rtype: bool
+        """
+        guild = self.client.get_guild(job.guild)
+        if guild is None:
+            logger.warning(f"Role job {job.job}: guild {job.guild} not available, discarding job.")
+            await self.close(job)
+            return False
+
+        steps = await self.services.jobs.members.get(job=job.job, done=False) or ()
+        total = job.total
+        done = total - len(steps)
+        queue : asyncio.Queue[RoleJobMembers.Data] = asyncio.Queue()
+        for step in steps:
+            queue.put_nowait(step)
+
+        limiter = AdaptiveLimiter()
+        checkpoint_lock = asyncio.Lock()
+        completed : List[Tuple[Id, Id]] = []
+        last_report = 0.0
+        failed = 0
+
+        async def checkpoint(force: bool = False) -> None:
+            nonlocal completed, done, last_report
+            async with checkpoint_lock:
+                if completed and (force or len(completed) >= Jobs.CHECKPOINT.value):
+                    batch, completed = tuple(completed), []
+                    await self.services.jobs.members.complete(job=job.job, entries=batch)
+                    done += len(batch)
+                    await self.services.jobs.roles.progress(job=job.job, done=done)
+                now = time.monotonic()
+                if progress and (force or now - last_report >= Jobs.PROGRESS_INTERVAL.value):
+                    last_report = now
+                    try:
+                        await progress(done, total)
+                    except Exception as e:
+                        logger.debug(f"Role job {job.job}: failed to report progress: {e}")
+
+        async def worker() -> None:
+            nonlocal failed
+            while True:
+                try:
+                    step = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                async with limiter:
+                    started = time.monotonic()
+                    success = await self.apply(guild, job, step)
+                    limiter.feedback(success and time.monotonic() - started < Jobs.SLOW_CALL.value)
+                if not success:
+                    failed += 1
+                    continue
+                completed.append((step.member, step.role))
+                await checkpoint()
+
+        started = time.monotonic()
+        await asyncio.gather(*(worker() for _ in range(min(Jobs.MAX_CONCURRENCY.value, max(1, len(steps))))))
+        await checkpoint(force=True)
+        logger.info(f"{guild.name} ({guild.id}) - Role job {job.job} ({job.action}) processed {total} members in {time.monotonic() - started:.1f}s, {failed} failed, final concurrency {limiter.limit}.")
+
+        if failed:
+            attempts = await self.services.jobs.roles.attempt(job=job.job)
+            attempts = job.attempts + 1 if attempts is None else attempts
+            if attempts >= Jobs.MAX_ATTEMPTS.value:
+                logger.error(f"{guild.name} ({guild.id}) - Role job {job.job} ({job.action}) still has {failed} failed steps after {attempts} attempts, giving up.")
+                await self.close(job, failed=True)
+                await self.report(guild, job, False, failed)
+                return False
+            # Offene Schritte bleiben gespeichert, der Job wird nach der Wartezeit erneut versucht oder durch einen neuen Job ersetzt
+            delay = self.delay(attempts)
+            logger.warning(f"{guild.name} ({guild.id}) - Role job {job.job} ({job.action}) left {failed} failed steps open, retrying in {delay:.0f}s (attempt {attempts}/{Jobs.MAX_ATTEMPTS.value}).")
+            self._start(job, progress, delay)
+            return False
+
+        result = True
+        handler = FINALIZERS.get(job.action)
+        if handler is not None:
+            try:
+                result = await handler(self.client, guild, job)
+            except Exception as e:
+                logger.exception(f"{guild.name} ({guild.id}) - Role job {job.job}: finalizer for {job.action} failed: {e}")
+                result = False
+        await self.close(job)
+        await self.report(guild, job, result, 0)
+        return result
+
+    async def apply(self, guild: Guild, job: RoleJobs.Data, step: RoleJobMembers.Data) -> bool:
+        """
+        Entfernt die Rolle eines Schritts beim Mitglied. Mitglieder, die die Gilde verlassen haben oder die Rolle nicht mehr besitzen, gelten als erledigt.
+        Kann das Mitglied aus einem anderen Grund nicht geholt werden, z.B. wegen fehlender Berechtigungen oder eines Serverfehlers, bleibt der Schritt offen.
+
+        :param guild: Die Gilde des Jobs.
+        :type guild: discord.Guild
+        :param job: Der Job.
+        :type job: RoleJobs.Data
+        :param step: Der Schritt.
+        :type step: RoleJobMembers.Data
+        :return: True, wenn der Schritt erfolgreich war, sonst False.
+        :rtype: bool
+        """
+        role = guild.get_role(step.role)
+        if role is None:
+            return True
+        member = guild.get_member(step.member)
+        if member is None:
+            try:
+                member = await policy.run(lambda: guild.fetch_member(step.member))
+            except NotFound:
+                return True
+            except (Forbidden, HTTPException) as e:
+                logger.warning(f"{guild.name} ({guild.id}) - Role job {job.job}: failed to fetch member {step.member}: {e}")
+                return False
+        if not isinstance(member, Member) or role not in member.roles:
+            return True
+        return await self.client.role_updates.update(member, remove=[role], reason=job.reason)
+
+    async def report(self, guild: Guild, job: RoleJobs.Data, result: bool, failed: int) -> None:
+        """
+        Meldet das Ergebnis eines Jobs im Kanal des Jobs, wenn für seine Aktion eine Rückmeldung registriert ist.
+
+        :param guild: Die Gilde des Jobs.
+        :type guild: discord.Guild
+        :param job: Der Job.
+        :type job: RoleJobs.Data
+        :param result: Ob der Job und sein Abschluss-Handler erfolgreich waren.
+        :type result: bool
+        :param failed: Die Anzahl der fehlgeschlagenen Schritte.
+        :type failed: int
+        """
+        handler = REPORTERS.get(job.action)
+        channel = guild.get_channel_or_thread(job.channel) if job.channel else None
+        if handler is None or channel is None:
+            return
+        try:
+            content = handler(guild, job, result, failed)
+            if content:
+                await policy.run(lambda: channel.send(content))
+        except Exception as e:
+            logger.warning(f"{guild.name} ({guild.id}) - Role job {job.job}: failed to report result in channel {job.channel}: {e}")
+
+    async def close(self, job: RoleJobs.Data, failed: bool = False) -> None:
+        """
+        Markiert einen Job als abgeschlossen oder fehlgeschlagen und entfernt seine Mitgliederliste.
+
+        :param job: Der Job.
+        :type job: RoleJobs.Data
+        :param failed: True, wenn der Job endgültig fehlgeschlagen ist.
+        :type failed: bool
+        """
+        if failed:
+            await self.services.jobs.roles.fail(job=job.job)
+        else:
+            await self.services.jobs.roles.finish(job=job.job)
+        await self.services.jobs.members.remove(job=job.job)
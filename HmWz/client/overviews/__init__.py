@@ -4,13 +4,24 @@ Dieses Modul enthält die Definition des Managers für Übersichten, der für di
 from __future__ import annotations
 import asyncio
 import logging
-from discord import RawMessageDeleteEvent, Guild, Client
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+from discord import RawMessageDeleteEvent, RawBulkMessageDeleteEvent, Guild, Client
 from .registry import REGISTRY
 from .instance import Instance, Instances, InstanceType
+from .scheduler import RefreshScheduler
+from .startup import StartupScheduler
+from .reconciler import Reconciler
+from .repairs import RepairQueue
+from .snapshot import SnapshotStore, GuildSnapshot
+from .state import State
+from ...configuration import Overviews
+from ...retry import policy
 
 from . import registration
 
-__all__ = ["Manager", "Instance", "Instances", "registration"]
+__all__ = ["Manager", "Instance", "Instances", "RefreshScheduler", "StartupScheduler", "Reconciler", "RepairQueue", "SnapshotStore", "State", "registration"]
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +34,29 @@ class Manager:
         """Initialisiert den Manager mit dem Discord-Client."""
         self.client = client
         """Cache für Übersicht-Instanzen pro Gilde. Schlüssel ist die Guild-ID, Wert ist eine Liste von Übersicht-Instanzen."""
-        self.instances_cache = {}
-        """Cache für Übersicht-Instanzen pro Gilde."""
+        self.instances_cache : OrderedDict[int, Instances] = OrderedDict()
+        """Cache für Übersicht-Instanzen pro Gilde, sortiert von der am längsten unbenutzten zur zuletzt benutzten Gilde."""
+        self.last_used : Dict[int, float] = {}
+        """Zeitpunkt der letzten Verwendung der Instanzen pro Gilde."""
+        self.unconfigured : Set[int] = set()
+        """IDs der Gilden, für die keine Übersicht eingerichtet ist."""
+        self.scheduler = RefreshScheduler(self)
+        """Scheduler für entprellte, zusammengeführte Aktualisierungen pro Gilde."""
+        self.startup_scheduler = StartupScheduler(self)
+        """Scheduler für die priorisierte Initialisierung der Gilden mit begrenzter Parallelität."""
+        self.reconciler = Reconciler(self)
+        """Abgleich im Hintergrund, der nur Gilden mit abweichendem Fingerabdruck synchronisiert."""
+        self.repairs = RepairQueue(self)
+        """Persistente Warteschlange für fehlgeschlagene Zustellungen mit Backoff pro Gilde."""
+        self.snapshots = SnapshotStore()
+        """Snapshot der Übersichten für einen warmen Neustart."""
+        self.warm : Dict[int, GuildSnapshot] = {}
+        """Noch nicht übernommene Snapshots pro Gilden-ID."""
+        self.restored : Set[int] = set()
+        """IDs der Gilden, deren Übersichten aus dem Snapshot übernommen und noch nicht geprüft wurden."""
+        self.verify_task : Optional[asyncio.Task] = None
 
-    async def get_instance(self, guild: Guild, instance_type: InstanceType) -> InstanceType:
+    async def get_instance(self, guild: Guild, instance_type: InstanceType) -> Optional[InstanceType]:
         """
         Gibt die Übersicht-Instanz für die angegebene Gilde und den angegebenen Instanztyp zurück.
 
@@ -34,16 +64,31 @@ class Manager:
         :type guild: discord.Guild
         :param instance_type: Der Typ der Übersicht-Instanz, die zurückgegeben werden soll.
         :type instance_type: InstanceType
-        :return: Die Übersicht-Instanz.
-        :rtype: InstanceType
-        :raise: Exception: Wenn keine Übersicht-Instanz des angegebenen Typs gefunden wird.
+        :return: Die Übersicht-Instanz oder None, wenn die Übersicht für die Gilde nicht eingerichtet ist.
+        :rtype: Optional[InstanceType]
         """
         instances = await self.get_instances(guild)
         for instance in instances:
             if isinstance(instance, instance_type):
                 return instance
-        raise Exception(f"Instance of type {instance_type} not found for guild {guild.id}.")
+        return None
  
+    def cached_instance(self, guild_id: int, instance_type: InstanceType) -> Optional[InstanceType]:
+        """
+        Gibt eine bereits erstellte Übersicht-Instanz zurück, ohne sie bei Bedarf zu erstellen.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param instance_type: Der Typ der Übersicht-Instanz.
+        :type instance_type: InstanceType
+        :return: Die Übersicht-Instanz oder None, wenn für die Gilde noch keine Instanz erstellt wurde.
+        :rtype: Optional[InstanceType]
+        """
+        for instance in self.instances_cache.get(guild_id, ()):
+            if isinstance(instance, instance_type):
+                return instance
+        return None
+
     async def get_instances(self, guild: Guild) -> Instances:
         """
         Gibt die Übersicht-Instanzen für die angegebene Gilde zurück. Wenn die Instanzen noch nicht im Cache sind, werden sie erstellt und im Cache gespeichert.
@@ -53,38 +98,218 @@ class Manager:
         :return: Die Übersicht-Instanzen.
         :rtype: Instances
         """
-        if guild.id not in self.instances_cache:
+        instances = self.instances_cache.get(guild.id)
+        if instances is None:
+            if guild.id in self.unconfigured:
+                return []
             instances = []
             for factory in REGISTRY:
                 try:
-                    instance = await factory.create(guild, self.client)
-                    instances.append(instance)
+                    # Für nicht eingerichtete Übersichten werden keine Instanzen erstellt
+                    if await factory.configured(guild, self.client):
+                        instances.append(await factory.create(guild, self.client))
                 except Exception as e:
                     logger.exception(f"Failed to create overview instance for guild {guild.id}: {e}")
+            if not instances:
+                self.unconfigured.add(guild.id)
+                return []
             self.instances_cache[guild.id] = instances
-        return self.instances_cache[guild.id]
+        else:
+            self.instances_cache.move_to_end(guild.id)
+            for instance in instances:
+                if instance.is_compact:
+                    await instance.rehydrate()
+        self.last_used[guild.id] = time.monotonic()
+        return instances
+
+    def evict(self, guild: Guild) -> None:
+        """
+        Entfernt alle Übersicht-Instanzen und geplanten Aktualisierungen einer Gilde, z.B. wenn der Bot die Gilde verlässt.
+
+        :param guild: Die Discord-Gilde.
+        :type guild: discord.Guild
+        """
+        self.scheduler.cancel(guild)
+        self.reconciler.forget(guild.id)
+        self.repairs.forget(guild.id)
+        self.restored.discard(guild.id)
+        self.unconfigured.discard(guild.id)
+        self.last_used.pop(guild.id, None)
+        for instance in self.instances_cache.pop(guild.id, ()):
+            instance.close()
+        logger.debug(f"Evicted overview instances for guild {guild.id}.")
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Verkleinert die Instanzen von Gilden, die länger als `Overviews.IDLE_TTL` nicht benutzt wurden.
+        Sind mehr als `Overviews.MAX_ACTIVE` Gilden vollständig geladen, werden zusätzlich die am längsten unbenutzten verkleinert.
+
+        :param now: Der aktuelle Zeitpunkt, Standard ist `time.monotonic()`.
+        :type now: Optional[float]
+        :return: Die Anzahl der verkleinerten Gilden.
+        :rtype: int
+        """
+        now = time.monotonic() if now is None else now
+        active = [guild_id for guild_id, instances in self.instances_cache.items() if any(not instance.is_compact for instance in instances)]
+        excess = len(active) - Overviews.MAX_ACTIVE.value
+        compacted = 0
+        # Die Reihenfolge des Caches entspricht der letzten Verwendung, die ältesten Gilden zuerst
+        for guild_id in active:
+            idle = now - self.last_used.get(guild_id, now)
+            if idle < Overviews.IDLE_TTL.value and excess <= 0:
+                break
+            if any([instance.compact() for instance in self.instances_cache[guild_id]]):
+                compacted += 1
+                excess -= 1
+        if compacted:
+            logger.info(f"Compacted overview instances of {compacted} idle guild(s), {len(active) - compacted} remain fully loaded.")
+        return compacted
+
+    async def sweep_loop(self, interval: float = Overviews.SWEEP_INTERVAL.value) -> None:
+        """
+        Verkleinert regelmäßig die Instanzen untätiger Gilden, damit der Speicherverbrauch über lange Laufzeiten konstant bleibt.
+
+        :param interval: Der Abstand zwischen zwei Durchläufen in Sekunden.
+        :type interval: float
+        """
+        await self.client.wait_until_ready()
+        while not self.client.is_closed():
+            await asyncio.sleep(interval)
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.exception(f"Failed to sweep overview instances: {e}")
         
     async def startup(self):
         """
         Startet den Manager und initialisiert alle Gilden.
+        Gilden mit konfigurierter Registrierung werden zuerst initialisiert, sortiert nach Anzahl ihrer Registrierungen.
         Aufrufen bei On_ready Event des Clients.
 
         :return: None
         """
-        tasks = [self.init_guild(g) for g in self.client.guilds]
-        await asyncio.gather(*tasks)
+        self.warm = self.snapshots.load()
+        configured = await self.client.services.wz.registration.guilds()
+        priority = {guild_id: index for index, guild_id in enumerate(configured)}
+        # Gilden aus dem Snapshot sind ohne Discord-Aufrufe bereit und werden daher zuerst initialisiert
+        guilds = sorted(self.client.guilds, key=lambda g: (g.id not in self.warm, priority.get(g.id, len(priority))))
+        await self.startup_scheduler.run(guilds)
+        self.warm = {}
+        if self.restored:
+            self.verify_task = asyncio.create_task(self.verify_restored())
         logger.info("Manager startup complete.")
 
-    async def init_guild(self, guild: Guild):
+    def save_snapshot(self) -> int:
+        """
+        Schreibt den Zustand aller geladenen Übersichten und die letzten Fingerabdrücke des Reconcilers in den Snapshot.
+        Aufrufen beim geordneten Beenden des Clients.
+
+        :return: Die Anzahl der gespeicherten Gilden.
+        :rtype: int
+        """
+        guilds : Dict[int, GuildSnapshot] = {}
+        for guild_id, instances in self.instances_cache.items():
+            states = {}
+            for instance in instances:
+                try:
+                    state = instance.snapshot()
+                    if state is None:
+                        continue
+                    name = type(instance).__name__
+                    states[name] = {"state": state, "fingerprint": instance.dump_fingerprint(self.reconciler.known.get((guild_id, name)))}
+                except Exception as e:
+                    logger.exception(f"Failed to snapshot overview instance for guild {guild_id}: {e}")
+            if states:
+                guilds[guild_id] = states
+        saved = self.snapshots.save(guilds)
+        logger.info(f"Saved overview snapshot of {saved} guild(s).")
+        return saved
+
+    async def restore_guild(self, guild: Guild, instances: Instances) -> Instances:
+        """
+        Stellt die Übersicht-Instanzen einer Gilde aus dem Snapshot wieder her und übernimmt die gespeicherten Fingerabdrücke in den Reconciler.
+
+        :param guild: Die Discord-Gilde.
+        :type guild: discord.Guild
+        :param instances: Die Übersicht-Instanzen der Gilde.
+        :type instances: Instances
+        :return: Die Instanzen, die nicht wiederhergestellt wurden und vollständig synchronisiert werden müssen.
+        :rtype: Instances
+        """
+        snapshot = self.warm.pop(guild.id, None)
+        if not snapshot:
+            return instances
+        cold = []
+        for instance in instances:
+            name = type(instance).__name__
+            entry = snapshot.get(name) or {}
+            try:
+                if not entry.get("state") or not await instance.restore(entry["state"]):
+                    cold.append(instance)
+                    continue
+            except Exception as e:
+                logger.exception(f"Failed to restore overview instance {name} for guild {guild.id} from snapshot: {e}")
+                cold.append(instance)
+                continue
+            fingerprint = instance.load_fingerprint(entry.get("fingerprint"))
+            if fingerprint is not None:
+                # Der erste Abgleich vergleicht mit dem Stand vor dem Neustart und erkennt so Änderungen während der Ausfallzeit
+                self.reconciler.known[(guild.id, name)] = fingerprint
+            self.restored.add(guild.id)
+        logger.debug(f"Restored {len(instances) - len(cold)}/{len(instances)} overview instance(s) for guild {guild.id} from snapshot.")
+        return cold
+
+    async def verify_restored(self) -> None:
+        """
+        Prüft die aus dem Snapshot übernommenen Übersichten nacheinander im Hintergrund, nachdem alle Gilden bereit sind.
+        """
+        checked = 0
+        while self.restored:
+            guild_id = self.restored.pop()
+            for instance in self.instances_cache.get(guild_id, ()):
+                try:
+                    await instance.verify()
+                except Exception as e:
+                    logger.exception(f"Failed to verify restored overview instance for guild {guild_id}: {e}")
+            checked += 1
+        logger.info(f"Verified restored overviews of {checked} guild(s).")
+
+    def is_ready(self, guild_id: int) -> bool:
+        """
+        Gibt zurück, ob die Übersichten einer Gilde nicht mehr auf den Startup warten.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn die Gilde bereit ist, sonst False.
+        :rtype: bool
+        """
+        return self.startup_scheduler.is_ready(guild_id)
+
+    async def wait_ready(self, guild_id: int) -> bool:
+        """
+        Wartet, bis die Übersichten einer Gilde initialisiert sind, und zieht die Gilde dabei vor.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn die Gilde bereit ist, False bei Zeitüberschreitung.
+        :rtype: bool
+        """
+        return await self.startup_scheduler.wait_ready(guild_id)
+
+    async def init_guild(self, guild: Guild) -> bool:
         """
         Initialisiert die Übersicht-Instanzen für die angegebene Gilde, synchronisiert sie und stellt sie sicher.
 
         :param guild: Die Discord-Gilde, für die die Übersicht erstellt wird.
         :type guild: discord.Guild
-        :return: None
-        :rtype: None
+        :return: True, wenn alle Instanzen initialisiert wurden, sonst False.
+        :rtype: bool
         """
-        instances = await self.get_instances(guild)
+        if policy.breaker.is_open(guild.id):
+            logger.info(f"Skipping overview startup for guild {guild.id}: circuit open.")
+            return False
+        instances = await self.restore_guild(guild, await self.get_instances(guild))
+        status = True
         for instance in instances:
             try:
                 await instance.sync(startup=True)
@@ -92,6 +317,8 @@ class Manager:
                 logger.debug(f"Overview instance {instance.__class__.__name__} for guild {guild.id} synced successfully.")
             except Exception as e:
                 logger.exception(f"Failed to sync overview instance for guild {guild.id}: {e}")
+                status = False
+        return status
 
     async def sync(self, guild: Guild, startup: bool = False, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> bool:
         """
@@ -106,6 +333,9 @@ class Manager:
         :return: True, wenn die Synchronisierung erfolgreich war, sonst False.
         :rtype: bool
         """
+        if sync_config:
+            # Nach einer Änderung der Konfiguration kann eine Übersicht neu eingerichtet sein
+            self.unconfigured.discard(guild.id)
         instances = await self.get_instances(guild)
         status = True
         for instance in instances:
@@ -116,6 +346,35 @@ class Manager:
                 status = False
         return status
 
+    def schedule(self, guild: Guild, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> None:
+        """
+        Plant eine entprellte Synchronisierung mit anschließendem `ensure()` für die angegebene Gilde.
+        Mehrere Aufrufe innerhalb des Entprellfensters werden zu einer Aktualisierung zusammengeführt.
+
+        :param guild: Die Discord-Gilde, für die die Übersicht aktualisiert wird.
+        :type guild: discord.Guild
+        :param sync_data: Synchronisiert Daten (Registrierungen).
+        :param sync_config: Synchronisiert Konfiguration.
+        :param sync_discord: Synchronisiert Discord-Mitglieder mit DB.
+        """
+        self.scheduler.schedule(guild, sync_data=sync_data, sync_config=sync_config, sync_discord=sync_discord)
+
+    async def mark(self, guild: Guild, *events: State.SyncEvent) -> None:
+        """
+        Markiert die angegebenen Änderungen bei allen Übersicht-Instanzen der Gilde und plant eine entprellte Aktualisierung.
+        Die Aktualisierung führt nur die Synchronisierung aus, die für die markierten Änderungen nötig ist.
+
+        :param guild: Die Discord-Gilde, in der sich etwas geändert hat.
+        :type guild: discord.Guild
+        :param events: Die eingetretenen Synchronisierungsereignisse, ohne Ereignis wird die Übersicht nur sichergestellt.
+        :type events: State.SyncEvent
+        """
+        for instance in await self.get_instances(guild):
+            mark = getattr(instance, "mark", None)
+            if mark is not None:
+                mark(*events)
+        self.scheduler.schedule(guild)
+
     async def ensure(self, guild: Guild) -> bool:
         """
         Stellt sicher, dass die Übersicht-Instanzen für die angegebene Gilde korrekt sind.
@@ -211,23 +470,53 @@ class Manager:
                 status = False
         return status
     
+    def interested(self, guild_id: int, message_ids: Iterable[int]) -> Instances:
+        """
+        Gibt die bereits erstellten Übersicht-Instanzen einer Gilde zurück, die eine der Nachrichten erfasst haben.
+        Für Gilden ohne erstellte Instanzen wird keine Instanz erstellt, da diese noch keine Nachrichten erfasst haben.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param message_ids: Die IDs der gelöschten Nachrichten.
+        :type message_ids: Iterable[int]
+        :return: Die betroffenen Instanzen.
+        :rtype: Instances
+        """
+        instances = self.instances_cache.get(guild_id)
+        if not instances:
+            return []
+        message_ids = message_ids if isinstance(message_ids, (set, frozenset)) else set(message_ids)
+        return [instance for instance in instances if not message_ids.isdisjoint(getattr(instance, "tracked", ()))]
+
     async def on_message_delete(self, payload: RawMessageDeleteEvent) -> bool:
         """
-        Reagiert auf das Löschen einer Nachricht, indem es die Übersicht-Instanzen der betroffenen Gilde benachrichtigt.
+        Reagiert auf das Löschen einer Nachricht, indem es die betroffenen Übersicht-Instanzen der Gilde benachrichtigt.
+        Löschungen fremder Nachrichten werden ohne Datenbank- oder Discord-Zugriff verworfen.
 
         :param payload: Das Ereignis, das das Löschen der Nachricht beschreibt.
         :type payload: discord.RawMessageDeleteEvent
         """
-        guild = self.client.get_guild(payload.guild_id)
-        if not guild:
-            return False
-        
-        instances = await self.get_instances(guild)
         status = True
-        for instance in instances:
+        for instance in self.interested(payload.guild_id, (payload.message_id,)):
             try:
                 await instance.on_message_delete(payload)
             except Exception as e:
-                logger.exception(f"Failed to handle message delete for overview instance in guild {guild.id}: {e}")
+                logger.exception(f"Failed to handle message delete for overview instance in guild {payload.guild_id}: {e}")
                 status = False
-        return status
\ No newline at end of file
+        return status
+
+    async def on_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> bool:
+        """
+        Reagiert auf das gesammelte Löschen von Nachrichten. Jede betroffene Übersicht-Instanz wird genau einmal benachrichtigt.
+
+        :param payload: Das Ereignis, das das Löschen der Nachrichten beschreibt.
+        :type payload: discord.RawBulkMessageDeleteEvent
+        """
+        status = True
+        for instance in self.interested(payload.guild_id, payload.message_ids):
+            try:
+                await instance.on_bulk_message_delete(payload)
+            except Exception as e:
+                logger.exception(f"Failed to handle bulk message delete for overview instance in guild {payload.guild_id}: {e}")
+                status = False
+        return status
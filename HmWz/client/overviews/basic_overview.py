@@ -1,14 +1,19 @@
 """
 Modul, das die Basisklasse für alle Übersichten enthält, die in diesem Bot verwendet werden.
 Diese Klasse implementiert die Instance-Schnittstelle und bietet grundlegende Funktionen und Eigenschaften, die von allen Übersichten gemeinsam genutzt werden können. 
-Sie enthält Methoden zum Verwalten von Synchronisierungs-, Arbeits- und Löschstatus sowie Eigenschaften für den Zugriff auf den Client, die Gilde und die Services.
+Sie koordiniert Synchronisierung, Arbeit und Löschung über einen :class:`OperationCoordinator` und bietet Eigenschaften für den Zugriff auf den Client, die Gilde und die Services.
 """
 from __future__ import annotations
 import asyncio
-from typing import Union, Type, Optional
+import hashlib
+import json
+from typing import Any, Dict, Hashable, List, Sequence, Tuple, Union, Type, Optional
 from discord import Embed, Guild, Client, Color, Asset, utils
 from .instance import Instance 
+from .coordinator import OperationCoordinator, OperationKind
+from .state import State
 from ...services import Services
+from ...retry import RetryPolicy, policy
 
 type BasicOverviewType = Type[BasicOverview]
 """Typalias für den Typ einer Übersichtsklasse, die eine Instanz von BasicOverview zurückgibt."""
@@ -18,8 +23,9 @@ class BasicOverview(Instance):
     Basisklasse für alle Übersichten, die in diesem Bot verwendet werden.
     """
 
-    WAIT_INTERVAL : float = 0.5 
     WAIT_INTERVAL_LONG : float = 2.5
+    MAX_EMBEDS_PER_MESSAGE : int = 10
+    MAX_CHARS_PER_MESSAGE : int = 6000
 
     class BotEmbed(Embed):
         def __init__(self, title: str, description: str, color: Color, client_avatar: Optional[Asset] = None):
@@ -27,6 +33,47 @@ class BasicOverview(Instance):
             self.set_footer(text=f"|", icon_url=client_avatar.url if client_avatar else None)
             self.timestamp = utils.utcnow()
 
+        @property
+        def content_hash(self) -> str:
+            """Gibt einen Hash des Inhalts zurück, der flüchtige Felder wie den Zeitstempel nicht berücksichtigt."""
+            content = self.to_dict()
+            content.pop("timestamp", None)
+            return hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+    @classmethod
+    def pack_embeds(cls, embeds: Sequence[Embed]) -> List[List[Embed]]:
+        """
+        Verteilt Embeds der Reihe nach auf möglichst wenige Nachrichten.
+        Eine Nachricht enthält höchstens `MAX_EMBEDS_PER_MESSAGE` Embeds mit zusammen höchstens `MAX_CHARS_PER_MESSAGE` Zeichen.
+
+        :param embeds: Die Embeds, die verteilt werden sollen.
+        :type embeds: Sequence[discord.Embed]
+        :return: Die Embeds pro Nachricht.
+        :rtype: List[List[discord.Embed]]
+        """
+        packs : List[List[Embed]] = []
+        size = 0
+        for embed in embeds:
+            length = len(embed)
+            if not packs or len(packs[-1]) >= cls.MAX_EMBEDS_PER_MESSAGE or size + length > cls.MAX_CHARS_PER_MESSAGE:
+                packs.append([])
+                size = 0
+            packs[-1].append(embed)
+            size += length
+        return packs
+
+    @staticmethod
+    def pack_hash(embeds: Sequence[BotEmbed]) -> str:
+        """
+        Gibt den Inhalts-Hash einer Nachricht mit mehreren Embeds zurück.
+
+        :param embeds: Die Embeds der Nachricht.
+        :type embeds: Sequence[BotEmbed]
+        :return: Der Hash.
+        :rtype: str
+        """
+        return hashlib.sha1("".join(embed.content_hash for embed in embeds).encode()).hexdigest()
+
     def __init__(self, guild: Guild, services: Services, client: Client):
         """
         Initialisiert die Übersicht mit der Gilde, den Services und dem Client.
@@ -41,10 +88,12 @@ class BasicOverview(Instance):
         self.guild : Guild = guild
         self.services : Services = services
         self.client : Client = client
+        self.policy : RetryPolicy = policy
 
-        self.IS_SYNCING : bool = False
-        self.IS_WORKING : bool = False
-        self.IS_DELETING : bool = False
+        self.operations : OperationCoordinator = OperationCoordinator(self.log_context)
+        self.state : State = State()
+
+        self._style : Optional[Tuple[Color, Optional[Asset]]] = None
 
     @classmethod
     async def create(cls, guild: Guild, client: Client) -> Instance:
@@ -65,120 +114,160 @@ class BasicOverview(Instance):
             raise TypeError(f"Client services not found for guild {guild.id}.") 
 
         return cls(guild, services, client)
-    
-    async def sleep(self, seconds: float = WAIT_INTERVAL_LONG) -> Union[None, ValueError]:
+
+    @classmethod
+    async def configured(cls, guild: Guild, client: Client) -> bool:
         """
-        ## sleep(seconds: float)
-        verzögert die Ausführung.
+        Gibt zurück, ob die Übersicht für die Gilde eingerichtet ist. Nur dann erstellt der Manager eine Instanz.
 
-        :param seconds: Anzahl der Sekunden, die gewartet werden soll. Standard ist WAIT_INTERVAL_LONG.
-        :type seconds: float
-        :return: None, wenn die Verzögerung erfolgreich war, oder ValueError, wenn die Sekunden negativ sind.
-        :rtype: Union[None, ValueError]
-        :raise: ValueError: Wenn seconds negativ ist.
+        :param guild: Die Discord-Gilde.
+        :type guild: discord.Guild
+        :param client: Der Discord-Client.
+        :type client: discord.Client
+        :return: True, wenn die Übersicht eingerichtet ist, sonst False.
+        :rtype: bool
         """
-        try:
-            if seconds < 0:
-                raise ValueError(f"{self.log_context} Seconds must be non-negative.")
-            await asyncio.sleep(seconds)
-        except ValueError as e:
-            raise e
+        return True
+
+    @property
+    def is_compact(self) -> bool:
+        """Gibt zurück, ob die Übersicht ihre Discord-Objekte freigegeben hat."""
+        return False
 
-    async def wait_while_syncing(self, timeout: Optional[float] = 60) -> bool:
+    def compact(self) -> bool:
         """
-        Wartet, bis die Synchronisierung abgeschlossen ist.
+        Gibt Discord-Objekte einer untätigen Übersicht frei. Standardmäßig gibt es nichts freizugeben.
+
+        :return: True, wenn die Übersicht verkleinert wurde, sonst False.
+        :rtype: bool
         """
-        elapsed = 0
-        while self.IS_SYNCING:
-            if elapsed >= timeout:
-                self.IS_SYNCING = False
-            await self.sleep(self.WAIT_INTERVAL)
-            elapsed += self.WAIT_INTERVAL
+        return False
 
-    async def wait_while_working(self):
+    async def rehydrate(self) -> bool:
         """
-        Wartet, bis die Arbeit abgeschlossen ist.
+        Lädt eine verkleinerte Übersicht wieder vollständig.
+
+        :return: True, wenn die Übersicht bereit ist, sonst False.
+        :rtype: bool
         """
-        while self.IS_WORKING:
-            await self.sleep()
+        return True
+
+    def close(self) -> None:
+        """Beendet laufende Hintergrundaufgaben. Standardmäßig gibt es keine."""
 
-    async def wait_while_deleting(self):
+    async def fingerprint(self) -> Optional[Hashable]:
         """
-        Wartet, bis die Löschung abgeschlossen ist.
+        Bildet einen günstigen Fingerabdruck des Zustands in Datenbank und Discord. Standardmäßig wird die Übersicht nicht abgeglichen.
+
+        :return: Der Fingerabdruck oder None.
+        :rtype: Optional[Hashable]
         """
-        while self.IS_DELETING:
-            await self.sleep()
+        return None
+
+    def dump_fingerprint(self, fingerprint: Optional[Hashable]) -> Any:
+        """Wandelt einen Fingerabdruck für den Snapshot um. Standardmäßig wird kein Fingerabdruck gespeichert."""
+        return None
 
-    async def wait_while_busy(self):
+    def load_fingerprint(self, data: Any) -> Optional[Hashable]:
+        """Stellt einen Fingerabdruck aus dem Snapshot wieder her. Standardmäßig wird kein Fingerabdruck übernommen."""
+        return None
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
         """
-        Wartet, bis der Bot beschäftigt ist.
+        Gibt den Zustand für einen warmen Neustart zurück. Standardmäßig wird die Übersicht beim Neustart vollständig synchronisiert.
+
+        :return: Der Zustand oder None.
+        :rtype: Optional[Dict[str, Any]]
         """
-        while self.is_busy:
-            await self.sleep()
-        
-    
-    def sync_start(self) -> bool:
+        return None
+
+    async def restore(self, state: Dict[str, Any]) -> bool:
         """
-        Setzt den Synchronisierungsstatus auf True, um anzuzeigen, dass die Synchronisierung läuft.
+        Stellt die Übersicht aus einem Snapshot wieder her. Standardmäßig wird nichts übernommen.
 
-        :return: True, wenn die Synchronisierung gestartet wurde, sonst False.
+        :return: True, wenn die Übersicht wiederhergestellt wurde, sonst False.
         :rtype: bool
         """
-        self.IS_SYNCING = True
-        return self.IS_SYNCING
+        return False
+
+    async def verify(self) -> bool:
+        """Prüft einen aus einem Snapshot übernommenen Zustand. Standardmäßig gibt es nichts zu prüfen."""
+        return True
     
-    def work_start(self) -> bool:
+    async def sleep(self, seconds: float = WAIT_INTERVAL_LONG) -> Union[None, ValueError]:
         """
-        Setzt den Arbeitsstatus auf True, um anzuzeigen, dass die Arbeit läuft.
+        ## sleep(seconds: float)
+        verzögert die Ausführung.
 
-        :return: True, wenn die Arbeit gestartet wurde, sonst False.
-        :rtype: bool
+        :param seconds: Anzahl der Sekunden, die gewartet werden soll. Standard ist WAIT_INTERVAL_LONG.
+        :type seconds: float
+        :return: None, wenn die Verzögerung erfolgreich war, oder ValueError, wenn die Sekunden negativ sind.
+        :rtype: Union[None, ValueError]
+        :raise: ValueError: Wenn seconds negativ ist.
         """
-        self.IS_WORKING = True
-        return self.IS_WORKING  
-   
-    def delete_start(self) -> bool:
+        try:
+            if seconds < 0:
+                raise ValueError(f"{self.log_context} Seconds must be non-negative.")
+            await asyncio.sleep(seconds)
+        except ValueError as e:
+            raise e
+
+    def mark(self, *events: State.SyncEvent) -> None:
         """
-        Setzt den Löschstatus auf True, um anzuzeigen, dass die Löschung läuft.
+        Merkt sich, was sich geändert hat. Die nächste Synchronisierung führt nur die dafür nötige Arbeit aus.
 
-        :return: True, wenn die Löschung gestartet wurde, sonst False.
-        :rtype: bool
+        :param events: Die eingetretenen Synchronisierungsereignisse.
+        :type events: State.SyncEvent
         """
-        self.IS_DELETING = True
-        return self.IS_DELETING
+        self.state.mark(*events)
 
-    async def sync_stop(self) -> bool:
+    @property
+    def IS_SYNCING(self) -> bool:
+        """Gibt zurück, ob gerade synchronisiert wird."""
+        return self.operations.syncing
+
+    @property
+    def IS_WORKING(self) -> bool:
+        """Gibt zurück, ob gerade gerendert wird."""
+        return self.operations.working
+
+    @property
+    def IS_DELETING(self) -> bool:
+        """Gibt zurück, ob gerade gelöscht wird."""
+        return self.operations.deleting
+
+    async def wait_while_syncing(self, timeout: Optional[float] = None) -> bool:
         """
-        Setzt den Synchronisierungsstatus auf False, um anzuzeigen, dass die Synchronisierung abgeschlossen ist.
+        Wartet, bis die Synchronisierung abgeschlossen ist.
 
-        :return: True, wenn die Synchronisierung gestoppt wurde, sonst False.
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :return: True, wenn keine Synchronisierung mehr läuft, False bei Zeitüberschreitung.
         :rtype: bool
         """
-        self.IS_SYNCING = False
-        await self.sleep(self.WAIT_INTERVAL)
-        return not self.IS_SYNCING
+        return await self.operations.wait_idle(OperationKind.SYNC, timeout)
 
-    async def work_stop(self) -> bool:
+    async def wait_while_working(self, timeout: Optional[float] = None) -> bool:
         """
-        Setzt den Arbeitsstatus auf False, um anzuzeigen, dass die Arbeit abgeschlossen ist.
+        Wartet, bis die Arbeit abgeschlossen ist.
 
-        :return: True, wenn die Arbeit gestoppt wurde, sonst False.
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :return: True, wenn keine Arbeit mehr läuft, False bei Zeitüberschreitung.
         :rtype: bool
         """
-        self.IS_WORKING = False
-        await self.sleep(self.WAIT_INTERVAL)
-        return not self.IS_WORKING
+        return await self.operations.wait_idle(OperationKind.WORK, timeout)
 
-    async def delete_stop(self) -> bool:
+    async def wait_while_deleting(self, timeout: Optional[float] = None) -> bool:
         """
-        Setzt den Löschstatus auf False, um anzuzeigen, dass die Löschung abgeschlossen ist.
+        Wartet, bis die Löschung abgeschlossen ist.
 
-        :return: True, wenn die Löschung gestoppt wurde, sonst False.
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :return: True, wenn keine Löschung mehr läuft, False bei Zeitüberschreitung.
         :rtype: bool
         """
-        self.IS_DELETING = False
-        await self.sleep(self.WAIT_INTERVAL)
-        return not self.IS_DELETING
+        return await self.operations.wait_idle(OperationKind.DELETE, timeout)
 
     @property
     def is_busy(self) -> bool:
@@ -188,7 +277,7 @@ class BasicOverview(Instance):
         :return: True, wenn der Bot beschäftigt ist, sonst False.
         :rtype: bool
         """
-        return self.IS_SYNCING or self.IS_WORKING or self.IS_DELETING
+        return self.operations.is_busy
 
     @property
     def client_color(self) -> Color:
@@ -200,6 +289,36 @@ class BasicOverview(Instance):
         """
         return max(self.guild.get_member(self.client.user.id).roles, key=lambda r: r.position).color
 
+    @property
+    def style(self) -> Tuple[Color, Optional[Asset]]:
+        """
+        Gibt Farbe und Avatar für die Embeds dieser Gilde zurück. Beide Werte werden einmal berechnet und bis :meth:`reset_style` wiederverwendet.
+
+        :return: Farbe und Avatar des Clients.
+        :rtype: Tuple[discord.Color, Optional[discord.Asset]]
+        """
+        if self._style is None:
+            self._style = (self.client_color, self.client_avatar)
+        return self._style
+
+    def reset_style(self) -> None:
+        """Verwirft Farbe und Avatar, z.B. nachdem sich die Rollen des Bots oder das Gilden-Icon geändert haben."""
+        self._style = None
+
+    def embed(self, title: str, description: str) -> BotEmbed:
+        """
+        Erstellt ein BotEmbed mit der vorberechneten Farbe und dem Avatar der Gilde.
+
+        :param title: Der Titel des Embeds.
+        :type title: str
+        :param description: Die Beschreibung des Embeds.
+        :type description: str
+        :return: Das Embed.
+        :rtype: BotEmbed
+        """
+        color, avatar = self.style
+        return self.BotEmbed(title=title, description=description, color=color, client_avatar=avatar)
+
     @property
     def client_name(self) -> str:
         """
@@ -0,0 +1,221 @@
+"""
+Dieses Modul enthält die Koordination der Operationen einer Übersicht.
+Die Synchronisation schreibt die Daten der Übersicht und läuft exklusiv. Rendern (Senden, Aktualisieren, Bereinigen) liest die Daten,
+läuft daher nie parallel zu einer Synchronisation und ist untereinander serialisiert, weil alle Operationen denselben Kanal bearbeiten.
+Weitere Leser, z.B. der CSV-Export, dürfen parallel zum Rendern lesen. Das Löschen ist unabhängig davon nur untereinander exklusiv.
+
+Wartende Synchronisationen haben Vorrang vor neuen Lesern, damit ständige Klicks eine Synchronisation nicht aushungern.
+Statt in Intervallen zu pollen, warten alle Operationen auf eine gemeinsame :class:`asyncio.Condition` und werden sofort geweckt.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import Enum
+from typing import AsyncIterator, Callable, Dict, Optional
+
+from ...configuration import Operations
+
+__all__ = ["OperationCoordinator", "OperationKind", "OperationStats"]
+
+logger = logging.getLogger(__name__)
+
+class OperationKind(Enum):
+    """Die Arten von Operationen einer Übersicht."""
+    SYNC = "sync"
+    READ = "read"
+    WORK = "work"
+    DELETE = "delete"
+
+@dataclass(slots=True)
+class OperationStats:
+    """
+    Wartezeiten einer Operationsart.
+
+    :param count: Die Anzahl der gestarteten Operationen.
+    :type count: int
+    :param waited: Die gesamte Wartezeit in Sekunden.
+    :type waited: float
+    :param max_wait: Die längste Wartezeit in Sekunden.
+    :type max_wait: float
+    :param timeouts: Die Anzahl der Operationen, die wegen Zeitüberschreitung nicht gestartet wurden.
+    :type timeouts: int
+    """
+    count: int = 0
+    waited: float = 0.0
+    max_wait: float = 0.0
+    timeouts: int = 0
+
+    @property
+    def average_wait(self) -> float:
+        """Gibt die durchschnittliche Wartezeit in Sekunden zurück."""
+        return self.waited / self.count if self.count else 0.0
+
+class OperationCoordinator:
+    """
+    Koordiniert Synchronisation, Lesen, Rendern und Löschen einer Übersicht.
+
+    :param context: Der Log-Kontext der Übersicht.
+    :type context: str
+    :param timeout: Die maximale Wartezeit in Sekunden, bis eine Operation starten darf.
+    :type timeout: float
+    """
+    def __init__(self, context: str = "", timeout: float = Operations.TIMEOUT.value):
+        self.context : str = context
+        self.timeout : float = timeout
+        self.condition : asyncio.Condition = asyncio.Condition()
+        self.syncing : bool = False
+        self.working : bool = False
+        self.deleting : bool = False
+        self.readers : int = 0
+        self.waiting_syncs : int = 0
+        self.stats : Dict[OperationKind, OperationStats] = {kind: OperationStats() for kind in OperationKind}
+
+    @property
+    def is_busy(self) -> bool:
+        """Gibt zurück, ob gerade eine Operation läuft."""
+        return self.syncing or self.working or self.deleting or self.readers > 0
+
+    async def _acquire(self, kind: OperationKind, ready: Callable[[], bool], timeout: Optional[float]) -> None:
+        started = time.monotonic()
+        try:
+            async with asyncio.timeout(self.timeout if timeout is None else timeout):
+                async with self.condition:
+                    await self.condition.wait_for(ready)
+                    self._enter(kind)
+        except TimeoutError:
+            self.stats[kind].timeouts += 1
+            logger.warning(f"{self.context} Timed out after {time.monotonic() - started:.1f}s waiting to start {kind.value} ({self.summary()}).")
+            raise
+        waited = time.monotonic() - started
+        stats = self.stats[kind]
+        stats.count += 1
+        stats.waited += waited
+        stats.max_wait = max(stats.max_wait, waited)
+        if waited >= Operations.SLOW_WAIT.value:
+            logger.info(f"{self.context} Waited {waited:.2f}s to start {kind.value} ({self.summary()}).")
+
+    def _enter(self, kind: OperationKind) -> None:
+        if kind is OperationKind.SYNC:
+            self.syncing = True
+        elif kind is OperationKind.WORK:
+            self.working = True
+            self.readers += 1
+        elif kind is OperationKind.READ:
+            self.readers += 1
+        else:
+            self.deleting = True
+
+    async def _release(self, kind: OperationKind) -> None:
+        async with self.condition:
+            if kind is OperationKind.SYNC:
+                self.syncing = False
+            elif kind is OperationKind.WORK:
+                self.working = False
+                self.readers -= 1
+            elif kind is OperationKind.READ:
+                self.readers -= 1
+            else:
+                self.deleting = False
+            self.condition.notify_all()
+
+    @asynccontextmanager
+    async def sync(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Exklusiver Zugriff zum Schreiben der Daten. Wartet, bis alle Leser fertig sind.
+
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :raise TimeoutError: Wenn die Synchronisation nicht rechtzeitig starten konnte.
+        """
+        async with self.condition:
+            self.waiting_syncs += 1
+        try:
+            await self._acquire(OperationKind.SYNC, lambda: not self.syncing and self.readers == 0, timeout)
+        finally:
+            async with self.condition:
+                self.waiting_syncs -= 1
+                self.condition.notify_all()
+        try:
+            yield
+        finally:
+            await self._release(OperationKind.SYNC)
+
+    @asynccontextmanager
+    async def read(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Gemeinsamer Zugriff zum Lesen der Daten, z.B. für den CSV-Export.
+
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :raise TimeoutError: Wenn das Lesen nicht rechtzeitig starten konnte.
+        """
+        await self._acquire(OperationKind.READ, lambda: not self.syncing and self.waiting_syncs == 0, timeout)
+        try:
+            yield
+        finally:
+            await self._release(OperationKind.READ)
+
+    @asynccontextmanager
+    async def work(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Zugriff zum Rendern. Liest die Daten und ist untereinander serialisiert.
+
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :raise TimeoutError: Wenn das Rendern nicht rechtzeitig starten konnte.
+        """
+        await self._acquire(OperationKind.WORK, lambda: not self.syncing and not self.working and self.waiting_syncs == 0, timeout)
+        try:
+            yield
+        finally:
+            await self._release(OperationKind.WORK)
+
+    @asynccontextmanager
+    async def delete(self, timeout: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Exklusiver Zugriff zum Löschen der Nachrichten. Kann innerhalb von :meth:`work` verwendet werden.
+
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :raise TimeoutError: Wenn das Löschen nicht rechtzeitig starten konnte.
+        """
+        await self._acquire(OperationKind.DELETE, lambda: not self.deleting, timeout)
+        try:
+            yield
+        finally:
+            await self._release(OperationKind.DELETE)
+
+    async def wait_idle(self, kind: OperationKind, timeout: Optional[float] = None) -> bool:
+        """
+        Wartet, bis keine Operation der angegebenen Art mehr läuft, ohne selbst eine zu starten.
+
+        :param kind: Die Art der Operation.
+        :type kind: OperationKind
+        :param timeout: Die maximale Wartezeit in Sekunden, Standard ist das Timeout des Koordinators.
+        :type timeout: Optional[float]
+        :return: True, wenn die Operation beendet ist, False bei Zeitüberschreitung.
+        :rtype: bool
+        """
+        checks = {
+            OperationKind.SYNC: lambda: not self.syncing,
+            OperationKind.READ: lambda: self.readers == 0,
+            OperationKind.WORK: lambda: not self.working,
+            OperationKind.DELETE: lambda: not self.deleting,
+        }
+        try:
+            async with asyncio.timeout(self.timeout if timeout is None else timeout):
+                async with self.condition:
+                    await self.condition.wait_for(checks[kind])
+            return True
+        except TimeoutError:
+            return False
+
+    def summary(self) -> str:
+        """Gibt die Wartezeiten aller Operationsarten als einzeilige Zusammenfassung zurück."""
+        return ", ".join(
+            f"{kind.value}: {stats.count}x avg {stats.average_wait * 1000:.1f}ms max {stats.max_wait * 1000:.1f}ms timeouts {stats.timeouts}"
+            for kind, stats in self.stats.items()
+        )
@@ -2,8 +2,8 @@
 Modul, das die Definition der Instance-Schnittstelle enthält, die von allen Übersichtsinstanzen implementiert werden muss.
 """
 from __future__ import annotations
-from typing import Sequence, Protocol, Type, runtime_checkable
-from discord import RawMessageDeleteEvent
+from typing import Any, Dict, Hashable, Optional, Sequence, Set, Protocol, Type, runtime_checkable
+from discord import RawMessageDeleteEvent, RawBulkMessageDeleteEvent
 
 @runtime_checkable
 class Instance(Protocol):
@@ -11,9 +11,13 @@ class Instance(Protocol):
     Interface für alle Übersichtsinstanzen, die in diesem Bot verwendet werden.
     """
 
+    tracked: Set[int]
+    """Die IDs der Nachrichten, deren Löschung die Übersicht betrifft."""
+
     async def sync(self, startup: bool = False, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> bool: 
         """
         Soll die Übersicht synchronisieren, wenn diese eingerichtet ist.
+        Ohne Flags werden nur die zuvor markierten Änderungen synchronisiert.
 
         :param startup: Vollständige Synchronisation beim Startup.
         :param sync_data: Synchronisiert nur Daten (Registrierungen).
@@ -75,6 +79,93 @@ class Instance(Protocol):
         :rtype: bool
         """
         ...
+    async def on_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> bool: 
+        """
+        Soll auf das gesammelte Löschen von Nachrichten reagieren, wenn die Übersicht eingerichtet ist.
+
+        :param payload: Das Ereignis, das das Löschen der Nachrichten beschreibt.
+        :type payload: discord.RawBulkMessageDeleteEvent
+        :return: True, wenn die Übersicht erfolgreich auf das Löschen reagiert hat, sonst False.
+        :rtype: bool
+        """
+        ...
+    @property
+    def is_compact(self) -> bool:
+        """Soll zurückgeben, ob die Übersicht ihre Discord-Objekte freigegeben hat."""
+        ...
+    def compact(self) -> bool:
+        """
+        Soll Discord-Objekte einer untätigen Übersicht freigeben und nur eine kompakte Form behalten.
+
+        :return: True, wenn die Übersicht verkleinert wurde, sonst False.
+        :rtype: bool
+        """
+        ...
+    async def rehydrate(self) -> bool:
+        """
+        Soll eine verkleinerte Übersicht wieder vollständig laden.
+
+        :return: True, wenn die Übersicht bereit ist, sonst False.
+        :rtype: bool
+        """
+        ...
+    def close(self) -> None:
+        """Soll laufende Hintergrundaufgaben beenden, z.B. wenn der Bot die Gilde verlässt."""
+        ...
+    async def fingerprint(self) -> Optional[Hashable]:
+        """
+        Soll einen günstigen Fingerabdruck des Zustands in Datenbank und Discord bilden, ohne die Übersicht zu synchronisieren.
+
+        :return: Der Fingerabdruck oder None, wenn die Übersicht nicht abgeglichen werden soll.
+        :rtype: Optional[Hashable]
+        """
+        ...
+    def dump_fingerprint(self, fingerprint: Optional[Hashable]) -> Any:
+        """
+        Soll einen Fingerabdruck in eine JSON-kompatible Form für den Snapshot umwandeln.
+
+        :param fingerprint: Der Fingerabdruck.
+        :type fingerprint: Optional[Hashable]
+        :return: Die JSON-kompatible Form oder None.
+        :rtype: Any
+        """
+        ...
+    def load_fingerprint(self, data: Any) -> Optional[Hashable]:
+        """
+        Soll einen Fingerabdruck aus der JSON-kompatiblen Form des Snapshots wiederherstellen.
+
+        :param data: Die JSON-kompatible Form.
+        :type data: Any
+        :return: Der Fingerabdruck oder None.
+        :rtype: Optional[Hashable]
+        """
+        ...
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Soll den Zustand der Übersicht für einen warmen Neustart in JSON-kompatibler Form zurückgeben.
+
+        :return: Der Zustand oder None, wenn die Übersicht beim Neustart vollständig synchronisiert werden soll.
+        :rtype: Optional[Dict[str, Any]]
+        """
+        ...
+    async def restore(self, state: Dict[str, Any]) -> bool:
+        """
+        Soll die Übersicht aus einem Snapshot wiederherstellen, ohne die Nachrichten einzeln von Discord zu holen.
+
+        :param state: Der Zustand aus dem Snapshot.
+        :type state: Dict[str, Any]
+        :return: True, wenn die Übersicht wiederhergestellt wurde, False, wenn sie vollständig synchronisiert werden muss.
+        :rtype: bool
+        """
+        ...
+    async def verify(self) -> bool:
+        """
+        Soll den aus einem Snapshot übernommenen Zustand im Hintergrund mit Discord abgleichen.
+
+        :return: True, wenn der Zustand bestätigt oder eine Reparatur geplant wurde, sonst False.
+        :rtype: bool
+        """
+        ...
 
 type Instances = Sequence[Instance]
 """Typalias für eine Sequenz von Übersicht-Instanzen."""
@@ -0,0 +1,139 @@
+"""
+Dieses Modul enthält den deklarativen Plan für den Abgleich der Registrierung.
+Statt Änderungen direkt während des Vergleichs auszuführen, wird zuerst der Sollzustand (Datenbank, Rollen auf Discord, gerenderte Liste)
+mit dem beobachteten Zustand verglichen und als Liste von Schritten festgehalten. Ein Plan kann angezeigt werden, ohne etwas zu verändern (Dry-Run),
+oder ausgeführt werden. Beim Ausführen werden die Schritte nach Kosten geordnet: zuerst alle Datenbank-Schritte in einer Transaktion,
+dann Bearbeitungen bestehender Nachrichten, dann neue Nachrichten und zuletzt gesammelte Löschungen.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional
+
+__all__ = ["Plan", "PlanStep", "StepKind"]
+
+class StepKind(Enum):
+    """Die Arten von Schritten eines Plans, in der Reihenfolge ihrer Ausführung."""
+    DB_ADD = "db_add"
+    DB_REMOVE = "db_remove"
+    MAIN_EDIT = "main_edit"
+    MAIN_SEND = "main_send"
+    LIST_EDIT = "list_edit"
+    LIST_SEND = "list_send"
+    LIST_DELETE = "list_delete"
+
+    @property
+    def is_database(self) -> bool:
+        """Gibt zurück, ob der Schritt nur die Datenbank verändert."""
+        return self in (StepKind.DB_ADD, StepKind.DB_REMOVE)
+
+_ORDER = {kind: index for index, kind in enumerate(StepKind)}
+
+@dataclass(frozen=True, slots=True)
+class PlanStep:
+    """
+    Ein einzelner Schritt eines Plans.
+
+    :param kind: Die Art des Schritts.
+    :type kind: StepKind
+    :param target: Die ID des betroffenen Mitglieds oder der betroffenen Nachricht.
+    :type target: Optional[int]
+    :param index: Der Index der betroffenen Listen-Nachricht.
+    :type index: Optional[int]
+    :param value: Ein zusätzlicher Wert, z.B. die Rolle einer neuen Registrierung.
+    :type value: Optional[int]
+    """
+    kind: StepKind
+    target: Optional[int] = None
+    index: Optional[int] = None
+    value: Optional[int] = None
+
+    def describe(self) -> str:
+        """Gibt eine einzeilige Beschreibung des Schritts zurück."""
+        parts = [self.kind.value]
+        if self.index is not None:
+            parts.append(f"#{self.index + 1}")
+        if self.target is not None:
+            parts.append(str(self.target))
+        if self.value is not None:
+            parts.append(f"-> {self.value}")
+        return " ".join(parts)
+
+@dataclass(slots=True)
+class Plan:
+    """
+    Ein Plan aus Schritten, die den beobachteten Zustand in den Sollzustand überführen.
+
+    :param steps: Die Schritte des Plans.
+    :type steps: List[PlanStep]
+    :param bulk_size: Die maximale Anzahl an Nachrichten pro Sammellöschung.
+    :type bulk_size: int
+    """
+    steps: List[PlanStep] = field(default_factory=list)
+    bulk_size: int = 100
+
+    def add(self, kind: StepKind, target: Optional[int] = None, index: Optional[int] = None, value: Optional[int] = None) -> None:
+        """Fügt dem Plan einen Schritt hinzu."""
+        self.steps.append(PlanStep(kind=kind, target=target, index=index, value=value))
+
+    def extend(self, other: Plan) -> None:
+        """Übernimmt die Schritte eines anderen Plans."""
+        self.steps.extend(other.steps)
+
+    def of(self, *kinds: StepKind) -> List[PlanStep]:
+        """Gibt die Schritte der angegebenen Arten zurück."""
+        return [step for step in self.steps if step.kind in kinds]
+
+    @property
+    def ordered(self) -> List[PlanStep]:
+        """Gibt die Schritte in der Reihenfolge ihrer Ausführung zurück."""
+        return sorted(self.steps, key=lambda step: _ORDER[step.kind])
+
+    @property
+    def is_empty(self) -> bool:
+        """Gibt zurück, ob der Plan keine Schritte enthält."""
+        return not self.steps
+
+    @property
+    def counts(self) -> Dict[StepKind, int]:
+        """Gibt die Anzahl der Schritte pro Art zurück."""
+        counts = {}
+        for step in self.steps:
+            counts[step.kind] = counts.get(step.kind, 0) + 1
+        return counts
+
+    @property
+    def db_writes(self) -> int:
+        """Gibt die Anzahl der Datenbank-Transaktionen zurück. Alle Datenbank-Schritte werden gemeinsam geschrieben."""
+        return 1 if any(step.kind.is_database for step in self.steps) else 0
+
+    @property
+    def api_calls(self) -> int:
+        """
+        Gibt die geschätzte Anzahl der Discord-API-Aufrufe zurück.
+        Löschungen werden gesammelt, ältere Nachrichten als 14 Tage kosten beim Ausführen jeweils einen weiteren Aufruf.
+        """
+        deletes = len(self.of(StepKind.LIST_DELETE))
+        single = sum(1 for step in self.steps if not step.kind.is_database and step.kind is not StepKind.LIST_DELETE)
+        return single + -(-deletes // self.bulk_size)
+
+    def summary(self) -> str:
+        """Gibt die Anzahl der Schritte pro Art und die Kosten als einzeilige Zusammenfassung zurück."""
+        counts = self.counts
+        steps = ", ".join(f"{kind.value}: {counts[kind]}" for kind in StepKind if kind in counts) or "no changes"
+        return f"{steps} (api calls: {self.api_calls}, db writes: {self.db_writes})"
+
+    def lines(self, limit: int = 20) -> List[str]:
+        """
+        Gibt die Schritte in der Reihenfolge ihrer Ausführung als Zeilen zurück.
+
+        :param limit: Die maximale Anzahl an Zeilen, weitere Schritte werden zusammengefasst.
+        :type limit: int
+        :return: Die Zeilen des Plans.
+        :rtype: List[str]
+        """
+        ordered = self.ordered
+        lines = [step.describe() for step in ordered[:limit]]
+        if len(ordered) > limit:
+            lines.append(f"... +{len(ordered) - limit}")
+        return lines
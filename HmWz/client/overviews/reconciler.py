@@ -0,0 +1,233 @@
+"""
+Dieses Modul enthält den Abgleich der Übersichten im Hintergrund.
+Statt jede Gilde regelmäßig vollständig zu synchronisieren, bildet der Reconciler pro Übersicht einen günstigen Fingerabdruck,
+z.B. Anzahl und neuester Zeitstempel der Registrierungen, Mitgliederzahlen der konfigurierten Rollen und die erfassten Nachrichten.
+Nur wenn sich der Fingerabdruck seit dem letzten bekannten Stand verändert hat, wird die Gilde synchronisiert.
+Das Prüfintervall einer Gilde halbiert sich nach einer Abweichung und verdoppelt sich, solange sie ruhig bleibt.
+
+Eigene Änderungen der Übersichten, z.B. Klicks, Synchronisierungen oder Rollen-Jobs, verändern den Fingerabdruck ebenfalls.
+Die Übersichten übertragen nur den Teil, den sie selbst geschrieben haben, auf den bekannten Stand: eigene Rollenänderungen sofort
+über :meth:`Reconciler.adjust`, eigene Schreibvorgänge in der Datenbank kurz danach gesammelt über :meth:`Reconciler.acknowledge`.
+Eine Abweichung von außen, die zwischen zwei Prüfungen zusammen mit einer eigenen Änderung auftritt, bleibt so erhalten und löst die Synchronisierung aus.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from discord import Guild
+
+from ...configuration import Reconcile
+from ...retry import policy
+
+if TYPE_CHECKING:
+    from . import Manager
+
+__all__ = ["Reconciler", "ReconcileStats", "Acknowledgement"]
+
+logger = logging.getLogger(__name__)
+
+type Acknowledgement = Callable[[Hashable, Hashable], Hashable]
+"""Typalias für eine eigene Änderung, die aus dem bekannten und dem aktuellen Fingerabdruck den neuen bekannten Stand bildet."""
+
+@dataclass(slots=True)
+class ReconcileStats:
+    """
+    Statistiken des Reconcilers.
+
+    :param checks: Die Anzahl der geprüften Gilden.
+    :type checks: int
+    :param drifts: Die Anzahl der Prüfungen mit abweichendem Fingerabdruck.
+    :type drifts: int
+    :param syncs: Die Anzahl der erfolgreichen Synchronisierungen nach einer Abweichung.
+    :type syncs: int
+    :param failures: Die Anzahl der fehlgeschlagenen Prüfungen oder Synchronisierungen.
+    :type failures: int
+    :param guilds: Die Anzahl der Abweichungen pro Gilden-ID.
+    :type guilds: Dict[int, int]
+    """
+    checks: int = 0
+    drifts: int = 0
+    syncs: int = 0
+    failures: int = 0
+    guilds: Dict[int, int] = field(default_factory=dict)
+
+    @property
+    def drift_rate(self) -> float:
+        """Gibt den Anteil der Prüfungen mit Abweichung zurück."""
+        return self.drifts / self.checks if self.checks else 0.0
+
+    def summary(self) -> str:
+        """Gibt die Statistiken als einzeilige Zusammenfassung zurück."""
+        return f"{self.checks} checks, {self.drifts} drifts ({self.drift_rate:.1%}), {self.syncs} syncs, {self.failures} failures, {len(self.guilds)} drifting guild(s)"
+
+class Reconciler:
+    """
+    Gleicht die Übersichten der Gilden im Hintergrund ab, wenn ihr Fingerabdruck vom letzten bekannten Stand abweicht.
+
+    :param manager: Der Manager der Übersichten.
+    :type manager: Manager
+    :param interval: Das anfängliche Prüfintervall pro Gilde in Sekunden.
+    :type interval: float
+    :param min_interval: Das kürzeste Prüfintervall in Sekunden.
+    :type min_interval: float
+    :param max_interval: Das längste Prüfintervall in Sekunden.
+    :type max_interval: float
+    :param ack_delay: Die Verzögerung in Sekunden, nach der eigene Änderungen gesammelt auf den bekannten Stand übertragen werden.
+    :type ack_delay: float
+    """
+    def __init__(self, manager: Manager, interval: float = Reconcile.INTERVAL.value, min_interval: float = Reconcile.MIN_INTERVAL.value, max_interval: float = Reconcile.MAX_INTERVAL.value, ack_delay: float = Reconcile.ACK_DELAY.value):
+        self.manager : Manager = manager
+        self.interval : float = interval
+        self.min_interval : float = min_interval
+        self.max_interval : float = max_interval
+        self.ack_delay : float = ack_delay
+        self.acknowledgements : Dict[int, List[Tuple[str, Acknowledgement]]] = {}
+        self.ack_task : Optional[asyncio.Task] = None
+        self.known : Dict[Tuple[int, str], Hashable] = {}
+        self.intervals : Dict[int, float] = {}
+        self.due : Dict[int, float] = {}
+        self.stats : ReconcileStats = ReconcileStats()
+        self.prepare : Optional[Callable[[Guild], Awaitable]] = None
+        """Optionaler Aufruf vor der Synchronisierung einer abweichenden Gilde, z.B. zum Bereinigen des Mitglieder-Caches."""
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Entfernt den bekannten Stand einer Gilde, z.B. wenn der Bot die Gilde verlässt.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        self.known = {key: value for key, value in self.known.items() if key[0] != guild_id}
+        self.acknowledgements.pop(guild_id, None)
+        self.intervals.pop(guild_id, None)
+        self.due.pop(guild_id, None)
+        self.stats.guilds.pop(guild_id, None)
+
+    def acknowledge(self, guild_id: int, name: str, change: Acknowledgement) -> None:
+        """
+        Meldet einen eigenen Schreibvorgang einer Übersicht, z.B. nach einem Klick oder einer Synchronisierung.
+        Nach `ack_delay` wird der aktuelle Fingerabdruck gebildet und `change` überträgt daraus nur die selbst geschriebenen Teile
+        auf den bekannten Stand. Viele Meldungen kurz hintereinander werden dabei mit einer Abfrage pro Gilde zusammengefasst.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param name: Der Typname der Übersicht.
+        :type name: str
+        :param change: Bildet aus bekanntem und aktuellem Fingerabdruck den neuen bekannten Stand.
+        :type change: Acknowledgement
+        """
+        self.acknowledgements.setdefault(guild_id, []).append((name, change))
+        if self.ack_task is None or self.ack_task.done():
+            self.ack_task = asyncio.create_task(self._acknowledge())
+
+    def adjust(self, guild_id: int, name: str, change: Callable[[Hashable], Hashable]) -> None:
+        """
+        Überträgt eine eigene Änderung sofort auf den bekannten Stand, z.B. eine eigene Rollenänderung, sobald ihr Gateway-Ereignis eingetroffen ist.
+        Ohne bekannten Stand wird nichts übertragen, die erste Prüfung übernimmt dann den aktuellen Stand.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param name: Der Typname der Übersicht.
+        :type name: str
+        :param change: Bildet aus dem bekannten Fingerabdruck den neuen bekannten Stand.
+        :type change: Callable[[Hashable], Hashable]
+        """
+        key = (guild_id, name)
+        if key in self.known:
+            self.known[key] = change(self.known[key])
+
+    async def _acknowledge(self) -> None:
+        await asyncio.sleep(self.ack_delay)
+        pending, self.acknowledgements = self.acknowledgements, {}
+        for guild_id, changes in pending.items():
+            try:
+                prints = await self.fingerprints(guild_id)
+                for name, change in changes:
+                    key = (guild_id, name)
+                    if key in self.known and key in prints:
+                        self.known[key] = change(self.known[key], prints[key])
+            except Exception as e:
+                logger.warning(f"Failed to acknowledge overview changes of guild {guild_id}: {e}")
+
+    async def fingerprints(self, guild_id: int) -> Dict[Tuple[int, str], Hashable]:
+        """
+        Bildet die Fingerabdrücke aller bereits erstellten Übersichten einer Gilde, ohne verkleinerte Übersichten neu zu laden.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: Die Fingerabdrücke pro Gilde und Übersichtstyp.
+        :rtype: Dict[Tuple[int, str], Hashable]
+        """
+        prints = {}
+        for instance in self.manager.instances_cache.get(guild_id, ()):
+            fingerprint = await instance.fingerprint()
+            if fingerprint is not None:
+                prints[(guild_id, type(instance).__name__)] = fingerprint
+        return prints
+
+    async def check(self, guild: Guild) -> bool:
+        """
+        Prüft eine Gilde und synchronisiert sie nur, wenn ein Fingerabdruck vom letzten bekannten Stand abweicht.
+        Bei der ersten Prüfung wird der Stand nur gespeichert, da der Startup bereits synchronisiert hat.
+
+        :param guild: Die Discord-Gilde.
+        :type guild: discord.Guild
+        :return: True, wenn eine Abweichung gefunden wurde, sonst False.
+        :rtype: bool
+        """
+        self.stats.checks += 1
+        prints = await self.fingerprints(guild.id)
+        drift = any(key in self.known and self.known[key] != fingerprint for key, fingerprint in prints.items())
+        if drift:
+            self.stats.drifts += 1
+            self.stats.guilds[guild.id] = self.stats.guilds.get(guild.id, 0) + 1
+            logger.info(f"{guild.name} ({guild.id}) - Overview drift detected, synchronizing.")
+            if self.prepare is not None:
+                await self.prepare(guild)
+            if await self.manager.sync(guild=guild, sync_data=True, sync_discord=True) and await self.manager.ensure(guild=guild):
+                self.stats.syncs += 1
+            else:
+                self.stats.failures += 1
+            # Die Synchronisierung kann selbst Registrierungen oder Nachrichten ändern, ausstehende eigene Änderungen sind darin enthalten
+            prints = await self.fingerprints(guild.id)
+            self.acknowledgements.pop(guild.id, None)
+        self.known.update(prints)
+        return drift
+
+    def reschedule(self, guild_id: int, drift: bool, now: float) -> None:
+        interval = self.intervals.get(guild_id, self.interval)
+        interval = max(self.min_interval, interval / 2) if drift else min(self.max_interval, interval * 2)
+        self.intervals[guild_id] = interval
+        self.due[guild_id] = now + interval
+
+    async def tick(self) -> int:
+        """
+        Prüft alle fälligen Gilden, deren Übersichten bereits erstellt wurden.
+
+        :return: Die Anzahl der Gilden mit Abweichung.
+        :rtype: int
+        """
+        now = time.monotonic()
+        drifted = 0
+        for guild_id in list(self.manager.instances_cache):
+            # Gilden, die noch auf den Startup warten, werden erst danach geprüft
+            if self.due.setdefault(guild_id, now) > now or not self.manager.is_ready(guild_id):
+                continue
+            guild = self.manager.client.get_guild(guild_id)
+            if guild is None or policy.breaker.is_open(guild_id):
+                self.reschedule(guild_id, False, now)
+                continue
+            drift = False
+            try:
+                drift = await self.check(guild)
+                drifted += drift
+            except Exception as e:
+                self.stats.failures += 1
+                logger.exception(f"{guild.name} ({guild.id}) - Overview reconciliation failed: {e}")
+            self.reschedule(guild_id, drift, time.monotonic())
+        if drifted:
+            logger.info(f"Overview reconciliation: {self.stats.summary()}.")
+        return drifted
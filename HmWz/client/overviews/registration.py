@@ -1,27 +1,36 @@
 from __future__ import annotations
+import asyncio
+import datetime
 import logging
+import time
 
-from discord.ui import View, Button
+from discord.ui import View, Button, DynamicItem, Item
 from .registry import register
 from .basic_overview import BasicOverview
-from dataclasses import dataclass, field
-from typing import Optional, List, Tuple
+from .plan import Plan, StepKind
+from .roster import RosterIndex
+from .state import State
+from dataclasses import dataclass, field, replace
+from typing import Any, Coroutine, FrozenSet, Iterable, Optional, List, Set, Tuple, Dict
 from discord import (
     Guild,
     TextChannel,
     Message,
+    PartialMessage,
     Member,
     Role,
     Embed, 
     Interaction, 
-    ButtonStyle
+    ButtonStyle,
+    Object
 )
 
 from ...emojis import Emojis
-from ...event import RawMessageDeleteEvent
+from ...event import RawMessageDeleteEvent, RawBulkMessageDeleteEvent
 from ...services import wz, Services
+from ...services.wz.messages import WzMessages
 from ...types import RegistrationRole, RegistrationMember
-from ...utils import fetch_channel, fetch_message, fetch_member, fetch_role
+from ...utils import delete_messages, fetch_channel, fetch_message, fetch_members, fetch_role
 from ...exception import HTTPException, Forbidden, NotFound, InteractionResponded
 from ...i18n import t
 
@@ -31,7 +40,7 @@ type ConfigurationRoles = List[RegistrationRole]
 type RegistrationMembers = List[RegistrationMember]
 type RegistrationEmbeds = List[Embed]
 type RegistrationList = List[str]
-type RegistrationMessages = List[Message]
+type RegistrationMessages = List[PartialMessage]
 
 @dataclass(slots=True)
 class Records:
@@ -103,9 +112,10 @@ class Configuration:
     title: Optional[str] = None
     description: Optional[str] = None
     channel: Optional[TextChannel] = None
-    message: Optional[Message] = None
+    message: Optional[PartialMessage] = None
     embed: Optional[Embed] = None
     view: Optional[View] = None
+    hash: Optional[str] = None
 
     @property
     def has_channel(self) -> bool:
@@ -116,6 +126,10 @@ class Configuration:
         """Überprüft, ob gültige Rollen in der Konfiguration vorhanden sind."""
         return len(self.roles) > 0
     @property
+    def role_ids(self) -> Set[int]:
+        """Gibt die IDs der konfigurierten Registrierungsrollen zurück."""
+        return {r.role.id for r in self.roles}
+    @property
     def is_valid(self) -> bool:
         """Überprüft, ob die Registrierungskonfiguration vollständig ist (Kanal und Rollen)."""
         return self.has_channel and self.has_roles
@@ -152,6 +166,90 @@ class Data:
     messages: RegistrationMessages = field(default_factory=list)
     embeds: RegistrationEmbeds = field(default_factory=list)
     list: RegistrationList = field(default_factory=list)
+    hashes: Dict[int, str] = field(default_factory=dict)
+
+@dataclass(slots=True)
+class Rendered:
+    """Repräsentiert die gerenderte Ausgabe einer Datenversion, die von `ensure()` und dem CSV-Export wiederverwendet wird.
+
+    :param embeds: Die Embeds der Registrierungsliste.
+    :type embeds: RegistrationEmbeds
+    :param list: Die Zeilen der Registrierungsliste.
+    :type list: RegistrationList
+    :param csv: Der CSV-Export, wird beim ersten Abruf erstellt.
+    :type csv: Optional[str]
+    """
+    embeds: RegistrationEmbeds = field(default_factory=list)
+    list: RegistrationList = field(default_factory=list)
+    csv: Optional[str] = None
+
+type RenderKey = Tuple[int, int, str]
+"""Typalias für den Schlüssel des Render-Caches, bestehend aus Gilden-ID, Datenversion und Locale."""
+
+@dataclass(frozen=True, slots=True)
+class Fingerprint:
+    """Repräsentiert einen günstigen Fingerabdruck der Registrierung für den Abgleich im Hintergrund.
+
+    :param rows: Die Anzahl der Registrierungen in der Datenbank.
+    :type rows: int
+    :param latest: Der neueste Zeitstempel der Registrierungen.
+    :type latest: Optional[str]
+    :param roles: Die Mitgliederzahl pro konfigurierter Rolle.
+    :type roles: Tuple[Tuple[int, int], ...]
+    :param messages: Die IDs der gespeicherten Nachrichten des Bots.
+    :type messages: FrozenSet[int]
+    :param tracked: Ob die erfassten Nachrichten mit den gespeicherten übereinstimmen.
+    :type tracked: bool
+    """
+    rows: int
+    latest: Optional[str]
+    roles: Tuple[Tuple[int, int], ...]
+    messages: FrozenSet[int]
+    tracked: bool
+
+    def dump(self) -> List[Any]:
+        """Gibt den Fingerabdruck in JSON-kompatibler Form zurück."""
+        return [self.rows, self.latest, [list(role) for role in self.roles], sorted(self.messages), self.tracked]
+
+    @classmethod
+    def load(cls, data: List[Any]) -> Fingerprint:
+        """Stellt einen Fingerabdruck aus der Form von :meth:`dump` wieder her."""
+        rows, latest, roles, messages, tracked = data
+        return cls(rows=rows, latest=latest, roles=tuple((role, count) for role, count in roles), messages=frozenset(messages), tracked=tracked)
+
+    def adopt(self, fresh: Fingerprint, *, registrations: bool = False, messages: bool = False) -> Fingerprint:
+        """
+        Übernimmt nur die angegebenen, vom Bot selbst geschriebenen Teile aus einem aktuellen Fingerabdruck.
+        Die Mitgliederzahlen bekannter Rollen werden nie übernommen, da sie sich auch von außen ändern.
+        Nur die Auswahl der Rollen folgt der Konfiguration: neu konfigurierte Rollen werden mit ihrer aktuellen Zahl aufgenommen.
+
+        :param fresh: Der aktuelle Fingerabdruck.
+        :type fresh: Fingerprint
+        :param registrations: Ob Anzahl und neuester Zeitstempel der Registrierungen übernommen werden.
+        :type registrations: bool
+        :param messages: Ob die gespeicherten und erfassten Nachrichten übernommen werden.
+        :type messages: bool
+        :return: Der neue bekannte Stand.
+        :rtype: Fingerprint
+        """
+        known = dict(self.roles)
+        fingerprint = replace(self, roles=tuple((role, known.get(role, count)) for role, count in fresh.roles))
+        if registrations:
+            fingerprint = replace(fingerprint, rows=fresh.rows, latest=fresh.latest)
+        if messages:
+            fingerprint = replace(fingerprint, messages=fresh.messages, tracked=fresh.tracked)
+        return fingerprint
+
+    def shift(self, deltas: Dict[int, int]) -> Fingerprint:
+        """
+        Überträgt eigene Rollenänderungen auf die Mitgliederzahlen der Rollen.
+
+        :param deltas: Die Änderung der Mitgliederzahl pro Rollen-ID.
+        :type deltas: Dict[int, int]
+        :return: Der neue bekannte Stand.
+        :rtype: Fingerprint
+        """
+        return replace(self, roles=tuple((role, count + deltas.get(role, 0)) for role, count in self.roles))
 
 @dataclass(slots=True)
 class Stats:
@@ -166,6 +264,50 @@ class Stats:
     permanent: int = 0
     non_permanent: int = 0
 
+class RegistrationButton(DynamicItem[Button], template=r"hmwz:reg:(?P<guild>[0-9]+):(?P<role>[0-9]+)"):
+    """
+    Persistenter Button einer Registrierungsrolle. Die Custom-ID enthält Gilde und Rolle,
+    sodass Klicks auch nach einem Neustart ohne erneutes Bearbeiten der Nachricht an die richtige Übersicht weitergeleitet werden.
+
+    :param guild: Die ID der Gilde.
+    :type guild: int
+    :param role: Die ID der Registrierungsrolle.
+    :type role: int
+    :param label: Die Beschriftung des Buttons.
+    :type label: Optional[str]
+    :param row: Die Zeile des Buttons.
+    :type row: Optional[int]
+    """
+    def __init__(self, guild: int, role: int, label: Optional[str] = None, row: Optional[int] = None):
+        super().__init__(Button(label=label, style=ButtonStyle.primary, custom_id=f"hmwz:reg:{guild}:{role}"), row=row)
+        self.guild_id : int = guild
+        self.role_id : int = role
+
+    @classmethod
+    async def from_custom_id(cls, interaction: Interaction, item: Item, match) -> RegistrationButton:
+        return cls(int(match["guild"]), int(match["role"]), label=getattr(item, "label", None))
+
+    async def callback(self, interaction: Interaction) -> None:
+        guild = interaction.guild
+        role = guild.get_role(self.role_id) if guild is not None and guild.id == self.guild_id else None
+        manager = getattr(interaction.client, "overview_manager", None)
+        if role is None or manager is None:
+            await interaction.response.send_message(t(interaction, "wz.overview.registration.error_registration"), ephemeral=True)
+            logger.warning(f"{guild.name if guild else None} ({self.guild_id}) - Registration button for unknown role {self.role_id} clicked.")
+            return
+        # Vor dem Laden bestätigen: Das Warten auf den Startup oder das Reaktivieren einer verkleinerten Übersicht
+        # (Datenbank, Mitglieder und Listen-Nachrichten) kann länger als die 3 Sekunden der Interaktion dauern
+        await interaction.response.defer(ephemeral=True)
+        if not manager.is_ready(guild.id):
+            # Die Gilde wartet noch auf den Startup und wird vorgezogen, der Klick wird danach verarbeitet
+            await manager.wait_ready(guild.id)
+        overview : Optional[RegistrationOverview] = await manager.get_instance(guild, RegistrationOverview)
+        if overview is None:
+            send = interaction.followup.send if interaction.response.is_done() else interaction.response.send_message
+            await send(t(interaction, "wz.overview.registration.error_registration"), ephemeral=True)
+            return
+        await overview.registration_register(interaction, role)
+
 @register
 class RegistrationOverview(BasicOverview):
     """
@@ -181,127 +323,383 @@ class RegistrationOverview(BasicOverview):
         self.configuration : Configuration = Configuration()
         self.data : Data = Data()
         self.stats : Stats = Stats()
+        self.roster : RosterIndex = RosterIndex()
+        self.rendered : Dict[RenderKey, Rendered] = {}
+        self.own_deletions : Set[int] = set()
+        self.tracked : Set[int] = set()
+        self.tasks : Set[asyncio.Task] = set()
+        self.list_task : Optional[asyncio.Task] = None
+        self.list_dirty : bool = False
+        self.dormant : Optional[FrozenSet[int]] = None
+        self.wake_lock : asyncio.Lock = asyncio.Lock()
+        self.member_locks : Dict[int, asyncio.Lock] = {}
+        """Locks pro Mitglied, damit schnelle Klicks nacheinander gegen den bereits gespeicherten Stand entschieden werden."""
+        self.trusted : Set[int] = set()
+        """IDs der Nachrichten aus einem Snapshot, die beim Laden ohne Abruf von Discord übernommen werden."""
+
+    @classmethod
+    async def configured(cls, guild: Guild, client) -> bool:
+        """Gibt zurück, ob für die Gilde ein Registrierungskanal eingerichtet ist."""
+        services = getattr(client, "services", None)
+        if services is None:
+            return False
+        record = await services.wz.registration.get(guild=guild)
+        return record is not None and record.has_channel
+
+    @property
+    def is_compact(self) -> bool:
+        """Gibt zurück, ob die Übersicht ihre Discord-Objekte freigegeben hat."""
+        return self.dormant is not None
+
+    def is_registered(self, member_id: int) -> bool:
+        """
+        Gibt zurück, ob ein Mitglied registriert ist. Funktioniert auch in der kompakten Form.
+
+        :param member_id: Die ID des Mitglieds.
+        :type member_id: int
+        :return: True, wenn das Mitglied registriert ist, sonst False.
+        :rtype: bool
+        """
+        return member_id in self.dormant if self.dormant is not None else member_id in self.roster
+
+    def compact(self) -> bool:
+        """
+        Gibt Mitglieder, Nachrichten, Embeds und die View einer untätigen Übersicht frei.
+        Erhalten bleiben nur die IDs der registrierten Mitglieder und der erfassten Nachrichten sowie die konfigurierten Rollen,
+        damit Ereignisse weiterhin ohne Neuladen gefiltert werden können.
+
+        :return: True, wenn die Übersicht verkleinert wurde, sonst False.
+        :rtype: bool
+        """
+        if self.is_compact or self.operations.is_busy or self.tasks or self.state.is_dirty:
+            return False
+        self.dormant = frozenset(self.roster.entries)
+        if not any(lock.locked() for lock in self.member_locks.values()):
+            self.member_locks = {}
+        self.records = Records()
+        self.data = Data()
+        self.rendered = {}
+        self.roster = RosterIndex()
+        self.configuration.message = None
+        self.configuration.embed = None
+        self.configuration.view = None
+        self.reset_style()
+        # Beim Aufwecken werden Konfiguration und Registrierungen neu geladen
+        self.mark(State.SyncEvent.CHANGED_CONFIGURATION)
+        logger.debug(f"{self.log_context} Compacted idle registration overview ({len(self.dormant)} registrations).")
+        return True
+
+    async def rehydrate(self) -> bool:
+        """
+        Lädt eine verkleinerte Übersicht wieder vollständig. Gleichzeitige Aufrufe warten auf dasselbe Neuladen.
+
+        :return: True, wenn die Übersicht bereit ist, sonst False.
+        :rtype: bool
+        """
+        async with self.wake_lock:
+            if self.dormant is None:
+                return True
+            try:
+                return await self.sync()
+            finally:
+                self.dormant = None
+
+    def close(self) -> None:
+        """Beendet laufende Hintergrundaufgaben, z.B. wenn der Bot die Gilde verlässt."""
+        for task in list(self.tasks):
+            task.cancel()
+
+    async def fingerprint(self) -> Optional[Fingerprint]:
+        """
+        Bildet den Fingerabdruck aus zwei Datenbankabfragen und den Mitgliederzahlen der Rollen im Cache, ohne Discord-API-Aufrufe.
+
+        :return: Der Fingerabdruck oder None, wenn die Übersicht nicht eingerichtet ist.
+        :rtype: Optional[Fingerprint]
+        """
+        if not self.configuration.is_valid:
+            return None
+        rows, latest = await self.services.wz.registrations.fingerprint(guild=self.guild)
+        records = await self.services.wz.messages.get(guild=self.guild)
+        messages = frozenset(record.message for record in records or ())
+        return Fingerprint(
+            rows=rows,
+            latest=latest,
+            roles=tuple((r.role.id, len(r.role.members)) for r in self.configuration.roles),
+            messages=messages,
+            tracked=messages == self.tracked,
+        )
+
+    def dump_fingerprint(self, fingerprint: Optional[Fingerprint]) -> Optional[List[Any]]:
+        """Wandelt einen Fingerabdruck für den Snapshot um."""
+        return fingerprint.dump() if isinstance(fingerprint, Fingerprint) else None
+
+    def load_fingerprint(self, data: Any) -> Optional[Fingerprint]:
+        """Stellt einen Fingerabdruck aus dem Snapshot wieder her, ein unlesbarer Fingerabdruck wird verworfen."""
+        try:
+            return Fingerprint.load(data) if data else None
+        except (TypeError, ValueError):
+            return None
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Gibt die IDs der Nachrichten, ihre Hashes und die Reihenfolge des Rosters für einen warmen Neustart zurück.
+        Verkleinerte Übersichten haben ihre Nachrichten freigegeben und werden beim Neustart vollständig synchronisiert.
+
+        :return: Der Zustand oder None.
+        :rtype: Optional[Dict[str, Any]]
+        """
+        if not self.configuration.is_valid or self.is_compact or self.state.is_dirty:
+            return None
+        return {
+            "message": self.configuration.message.id if self.configuration.has_message else None,
+            "hash": self.records.configuration.hash if self.records.configuration is not None else None,
+            "messages": [message.id for message in self.data.messages],
+            "hashes": [self.data.hashes.get(message.id) for message in self.data.messages],
+            "roster": [key[-1] for key in self.roster.keys],
+        }
+
+    async def restore(self, state: Dict[str, Any]) -> bool:
+        """
+        Stellt die Übersicht aus einem Snapshot wieder her. Konfiguration und Registrierungen werden wie gewohnt aus der Datenbank geladen,
+        die Nachrichten aus dem Snapshot aber ohne Abruf von Discord übernommen. Der Abgleich mit den Rollen auf Discord
+        übernimmt der Reconciler anhand des gespeicherten Fingerabdrucks.
+        Weicht der geladene Stand vom Snapshot ab, wird im Hintergrund eine Aktualisierung geplant.
+
+        :param state: Der Zustand aus :meth:`snapshot`.
+        :type state: Dict[str, Any]
+        :return: True, wenn die Übersicht wiederhergestellt wurde, sonst False.
+        :rtype: bool
+        """
+        messages = list(state.get("messages") or ())
+        self.trusted = {message_id for message_id in (state.get("message"), *messages) if message_id is not None}
+        # Ohne Zurücksetzen würde die erste Synchronisierung als Startup den vollständigen Abgleich mit Discord ausführen
+        self.state.reset(State.SyncEvent.STARTUP)
+        try:
+            if not await self.sync(sync_config=True):
+                return False
+        finally:
+            self.trusted = set()
+        consistent = (
+            [message.id for message in self.data.messages] == messages
+            and [self.data.hashes.get(message.id) for message in self.data.messages] == list(state.get("hashes") or ())
+            and (self.records.configuration.hash if self.records.configuration is not None else None) == state.get("hash")
+            and [key[-1] for key in self.roster.keys] == list(state.get("roster") or ())
+            and self.plan_messages().is_empty
+        )
+        if not consistent:
+            logger.info(f"{self.log_context} Registration overview changed since snapshot, scheduling update.")
+            self.client.overview_manager.schedule(self.guild)
+        return True
+
+    async def verify(self) -> bool:
+        """
+        Prüft, ob die aus einem Snapshot übernommenen Nachrichten noch existieren. Fehlende Nachrichten werden wie gelöschte behandelt
+        und von `ensure()` neu gesendet.
+
+        :return: True, wenn alle Nachrichten geprüft wurden, sonst False.
+        :rtype: bool
+        """
+        if not self.configuration.is_valid or self.is_compact:
+            return True
+        partial = [message for message in (self.configuration.message, *self.data.messages) if message is not None and not isinstance(message, Message)]
+        missing = set()
+        for message in partial:
+            try:
+                await self.policy.run(message.fetch)
+            except NotFound:
+                missing.add(message.id)
+            except HTTPException as e:
+                logger.warning(f"{self.log_context} Failed to verify snapshot message {message.id}: {e}")
+                return False
+        if missing:
+            await self.forget_messages(missing)
+        logger.debug(f"{self.log_context} Verified {len(partial)} snapshot message(s), {len(missing)} missing.")
+        return True
 
     async def create_registrations_list(self) -> bool:
+        """Gleicht den Roster-Index mit den geladenen Registrierungen ab, statt die gesamte Liste neu zu sortieren."""
         try:
-            if not self.data.members:
-                self.data.list = []
-                return True
-            self.data.list = []
-            i = 0
-            self.data.members.sort(key=lambda m: (not m.role.permanent, m.role.role.name.lower(), m.member.display_name.lower()))
-            last_role : str = ""
-            for reg_member in self.data.members:
-                i += 1
-                reg_role = f"{reg_member.role.role.name} {Emojis.PERMA_REGISTRATION.value if reg_member.role.permanent else Emojis.NORMAL_REGISTRATION.value}"
-                if last_role != reg_role:
-                    last_role = reg_role
-                    self.data.list.append(f"**{last_role}**")
-                self.data.list.append(f"{i}. {reg_member.member.display_name}")
+            self.roster.update(self.data.members)
+            self.data.members = self.roster.members
             return True
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to create registrations list: {e}")
             return False
             
+    @property
+    def render_key(self) -> RenderKey:
+        """Gibt den Schlüssel des Render-Caches für die aktuelle Datenversion zurück."""
+        return (self.guild.id, self.roster.version, str(self.guild.preferred_locale))
+
     async def create_registrations_embeds(self, chunk_size=4095, max_players=40) -> bool:
-        """Erstellt Embeds mit Berücksichtigung von 4096 Zeichen-Limit und max. 35-40 Spielern pro Embed."""
+        """Erstellt Embeds mit Berücksichtigung von 4096 Zeichen-Limit und max. 35-40 Spielern pro Embed. Nur die ab der ersten Änderung betroffenen Seiten werden neu erstellt."""
         try:
-            if not self.data.list or len(self.data.list) == 0:
-                self.data.embeds = []
+            key = self.render_key
+            cached = self.rendered.get(key)
+            if cached is not None:
+                self.data.embeds = cached.embeds
+                self.data.list = cached.list
                 return True
-            self.data.embeds = []
-            permanent_registration = f"{Emojis.PERMA_REGISTRATION.value}: {self.stats.permanent}"
-            non_permanent_registration = f"{Emojis.NORMAL_REGISTRATION.value}: {self.stats.non_permanent}"
-            total_registrations = f"{self.stats.total}"
-            temp = ""
-            i = 0
-            player_count = 0
-            for row in self.data.list:
-                # Check beide Limits: Zeichen (4096) und Spieler (35)
-                if len(temp) + len(row) + 1 > chunk_size or player_count >= max_players:
-                    i += 1
-                    embed = self.BotEmbed(
-                        title=f"{i}. Anmeldungen: {total_registrations} ( {permanent_registration} | {non_permanent_registration} )",
-                        description=temp,
-                        color=self.client_color,
-                        client_avatar=self.client_avatar
-                    ) 
-                    self.data.embeds.append(embed)
-                    temp = ""
-                    player_count = 0
-                temp += row + "\n"
-                player_count += 1
-            if temp:
-                i += 1
-                embed = self.BotEmbed(
-                    title=f"{i}. Anmeldungen: {total_registrations} ( {permanent_registration} | {non_permanent_registration} )",
-                    description=temp,
-                    color=self.client_color,
-                    client_avatar=self.client_avatar
+
+            first = self.roster.render(chunk_size, max_players)
+            pages = self.roster.pages
+            rows = [row for page in pages for row in page.rows]
+            embeds = []
+            if pages:
+                # Die Zähler stehen nur auf der letzten Seite, damit eine neue Registrierung am Ende nur diese Seite verändert
+                totals = f"{self.stats.total} ( {Emojis.PERMA_REGISTRATION.value}: {self.stats.permanent} | {Emojis.NORMAL_REGISTRATION.value}: {self.stats.non_permanent} )"
+                embeds = self.data.embeds[:min(first, len(pages) - 1)]
+                last = len(pages) - 1
+                embeds.extend(
+                    self.embed(title=f"{i + 1}. Anmeldungen: {totals}" if i == last else f"{i + 1}. Anmeldungen", description=pages[i].text)
+                    for i in range(len(embeds), len(pages))
                 )
-                self.data.embeds.append(embed)
+            self.data.embeds = embeds
+            self.data.list = rows
+            self.rendered = {key: Rendered(embeds=embeds, list=rows)}
             return True
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to create registrations embeds: {e}")
             return False
 
+    def export_csv(self) -> str:
+        """
+        Gibt die Registrierungen als CSV zurück. Der Export wird pro Datenversion nur einmal erstellt.
+
+        :return: Der CSV-Inhalt.
+        :rtype: str
+        """
+        rendered = self.rendered.setdefault(self.render_key, Rendered(embeds=self.data.embeds, list=self.data.list))
+        if rendered.csv is None:
+            lines = ["NR; Discord_Name; Guild_Name; Role; Timestamp; Score; Comment"]
+            for idx, member in enumerate(self.data.members, start=1):
+                user_name = member.member.name if member.member and member.member.name else "null"
+                member_name = member.member.display_name if member.member and member.member.display_name else "null"
+                role_name = member.role.role.name if member.role else "Unknown Role"
+                score = member.score if member.score is not None else 0
+                timestamp = member.timestamp if member.timestamp else "Unknown Timestamp"
+                lines.append(f"{idx}; {user_name}; {member_name}; {role_name}; {timestamp}; {score}; ")
+            rendered.csv = "\n".join(lines) + "\n"
+        return rendered.csv
+
+    def plan_list(self, packs: List[RegistrationEmbeds]) -> Plan:
+        """
+        Vergleicht die gerenderten Seiten mit den bestehenden Listen-Nachrichten, ohne etwas zu verändern.
+
+        :param packs: Die Embeds pro Listen-Nachricht.
+        :type packs: List[RegistrationEmbeds]
+        :return: Die Schritte, die die Listen-Nachrichten auf den gerenderten Stand bringen.
+        :rtype: Plan
+        """
+        plan = Plan()
+        messages = self.data.messages or []
+        for i in range(max(len(packs), len(messages))):
+            if i < len(packs) and i < len(messages):
+                # Bestehende Nachricht nur aktualisieren, wenn sich der Inhalt geändert hat
+                if self.data.hashes.get(messages[i].id) != self.pack_hash(packs[i]):
+                    plan.add(StepKind.LIST_EDIT, target=messages[i].id, index=i)
+            elif i < len(packs):
+                plan.add(StepKind.LIST_SEND, index=i)
+            else:
+                plan.add(StepKind.LIST_DELETE, target=messages[i].id, index=i)
+        return plan
+
+    def plan_messages(self) -> Plan:
+        """
+        Vergleicht die Registrierungsmeldung und die Listen-Nachrichten mit dem gerenderten Stand, ohne etwas zu verändern.
+
+        :return: Die Schritte für die Nachrichten der Übersicht.
+        :rtype: Plan
+        """
+        plan = Plan()
+        if not self.configuration.is_valid:
+            return plan
+        if not self.configuration.has_message:
+            plan.add(StepKind.MAIN_SEND)
+        elif (self.records.configuration.hash if self.records.configuration is not None else None) != self.configuration.hash:
+            plan.add(StepKind.MAIN_EDIT, target=self.configuration.message.id)
+        plan.extend(self.plan_list(self.pack_embeds(self.data.embeds or [])))
+        return plan
+
     async def update_registrations(self) -> bool:
+        """
+        Bringt die Listen-Nachrichten auf den gerenderten Stand. Die Schritte werden zuerst geplant und dann nach Kosten geordnet ausgeführt:
+        Bearbeitungen, neue Nachrichten und zuletzt eine gesammelte Löschung überschüssiger Nachrichten.
+
+        :return: True, wenn die Liste aktualisiert wurde, sonst False.
+        :rtype: bool
+        """
         try:
             if self.configuration.is_valid:
-                embeds = self.data.embeds or []
+                # Mehrere Embeds pro Nachricht, damit große Listen nur wenige Nachrichten und Edits benötigen
+                packs = self.pack_embeds(self.data.embeds or [])
                 messages = self.data.messages or []
-                len_embeds = len(embeds)
-                len_messages = len(messages)
-                updated_messages = []
-
-                for i in range(max(len_embeds, len_messages)):
-                    if i < len_embeds and i < len_messages:
-                        # Bestehende Nachricht aktualisieren
-                        try:
-                            await messages[i].edit(embed=embeds[i])
-                            await self.services.wz.list.update(
-                                guild=self.guild,
-                                message=messages[i].id,
-                                title=embeds[i].title,
-                                text=embeds[i].description
-                            )
-                            updated_messages.append(messages[i])
-                        except Exception as e:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Failed to update message {messages[i].id}: {e}")
-                    elif i < len_embeds:
-                        # Neue Nachricht senden
-                        try:
-                            new_msg = await self.configuration.channel.send(embed=embeds[i])
-                            await self.services.wz.list.add(
-                                guild=self.guild,
-                                channel=self.configuration.channel.id,
-                                message=new_msg.id,
-                                title=embeds[i].title,
-                                text=embeds[i].description
-                            )
-                            updated_messages.append(new_msg)
-                        except NotFound:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Registration channel {self.configuration.channel.id} not found for sending new message.")
-                        except Forbidden:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Missing permissions to access registration channel {self.configuration.channel.id} for sending new message.")
-                        except HTTPException as e:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: HTTP error while sending new message in registration channel {self.configuration.channel.id}: {e}")
-                        except ValueError as e:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Failed to add new message to database: {e}")
-                    elif i < len_messages:
-                        # Überschüssige Nachricht löschen
-                        try:
-                            await messages[i].delete()
-                        except NotFound:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Message {messages[i].id} not found for deletion.")
-                        except Forbidden:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: Missing permissions to delete message {messages[i].id}.")
-                        except HTTPException as e:
-                            logger.warning(f"{self.log_context} Registrations List Overview update warning: HTTP error while deleting message {messages[i].id}: {e}")
-                        await self.services.wz.list.remove(guild=self.guild, message=messages[i].id)
+                plan = self.plan_list(packs)
+                failed : Set[int] = set()
+                sent : Dict[int, Message] = {}
+
+                for step in plan.of(StepKind.LIST_EDIT):
+                    message = messages[step.index]
+                    try:
+                        content_hash = self.pack_hash(packs[step.index])
+                        await message.edit(embeds=packs[step.index])
+                        await self.services.wz.list.update(
+                            guild=self.guild,
+                            message=message.id,
+                            title=packs[step.index][0].title,
+                            text="".join(embed.description for embed in packs[step.index]),
+                            hash=content_hash
+                        )
+                        self.data.hashes[message.id] = content_hash
+                    except Exception as e:
+                        failed.add(message.id)
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: Failed to update message {message.id}: {e}")
+
+                for step in plan.of(StepKind.LIST_SEND):
+                    try:
+                        new_msg = await self.configuration.channel.send(embeds=packs[step.index])
+                        await self.services.wz.messages.add(guild=self.guild, channel=self.configuration.channel.id, message=new_msg.id, kind=WzMessages.LIST)
+                        content_hash = self.pack_hash(packs[step.index])
+                        await self.services.wz.list.add(
+                            guild=self.guild,
+                            channel=self.configuration.channel.id,
+                            message=new_msg.id,
+                            title=packs[step.index][0].title,
+                            text="".join(embed.description for embed in packs[step.index]),
+                            hash=content_hash
+                        )
+                        self.data.hashes[new_msg.id] = content_hash
+                        sent[step.index] = new_msg
+                    except NotFound:
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: Registration channel {self.configuration.channel.id} not found for sending new message.")
+                    except Forbidden:
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: Missing permissions to access registration channel {self.configuration.channel.id} for sending new message.")
+                    except HTTPException as e:
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: HTTP error while sending new message in registration channel {self.configuration.channel.id}: {e}")
+                    except ValueError as e:
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: Failed to add new message to database: {e}")
 
+                # Überschüssige Nachrichten gesammelt statt einzeln löschen
+                surplus = tuple(step.target for step in plan.of(StepKind.LIST_DELETE))
+                if surplus:
+                    self.own_deletions.update(surplus)
+                    try:
+                        await delete_messages(self.configuration.channel, surplus)
+                    except Forbidden:
+                        logger.warning(f"{self.log_context} Registrations List Overview update warning: Missing permissions to delete {len(surplus)} messages.")
+                    await self.services.wz.list.remove(guild=self.guild, messages=surplus)
+                    await self.services.wz.messages.remove(guild=self.guild, messages=surplus)
+                    for message_id in surplus:
+                        self.data.hashes.pop(message_id, None)
+
+                logger.debug(f"{self.log_context} Registrations list: {len(plan.steps) - len(failed)} of {max(len(packs), len(messages))} messages changed ({len(self.data.embeds or [])} embeds).")
                 # Messages-Liste aktualisieren, damit beim nächsten Aufruf wiederverwendet wird
-                self.data.messages = updated_messages
+                self.data.messages = [
+                    messages[i] if i < len(messages) else sent[i]
+                    for i in range(len(packs))
+                    if (i < len(messages) and messages[i].id not in failed) or i in sent
+                ]
+                self.track()
                 return True
             else:
                 logger.debug(f"{self.log_context} Cannot update registrations list overview: Invalid setup.")
@@ -310,39 +708,210 @@ class RegistrationOverview(BasicOverview):
             logger.exception(f"{self.log_context} Registrations List Overview update failed: {e}")
             return False
 
+    async def plan(self) -> Plan:
+        """
+        Erstellt den vollständigen Plan für den Abgleich, ohne etwas zu verändern (Dry-Run).
+        Der Sollzustand der Registrierungen ergibt sich aus den Rollen auf Discord, der Sollzustand der Nachrichten aus der gerenderten Liste.
+
+        :raise TimeoutError: Wenn das Lesen nicht rechtzeitig starten konnte.
+        :return: Der Plan.
+        :rtype: Plan
+        """
+        plan = Plan()
+        async with self.operations.read():
+            if not self.configuration.is_valid:
+                return plan
+            if self.client.is_chunked(self.guild):
+                records = await self.services.wz.registrations.get(guild=self.guild)
+                added, removed = self.registration_diff(record.member for record in records or ())
+                for member_id, role_id in added.items():
+                    plan.add(StepKind.DB_ADD, target=member_id, value=role_id)
+                for member_id in removed:
+                    plan.add(StepKind.DB_REMOVE, target=member_id)
+            plan.extend(self.plan_messages())
+        return plan
+
+    async def apply(self, plan: Plan) -> bool:
+        """
+        Führt einen Plan aus. Alle Datenbank-Schritte werden in einer Transaktion geschrieben, danach werden die Nachrichten sichergestellt.
+        Da sich die Seiten der Liste durch die Datenbank-Schritte verschieben können, werden die Nachrichten-Schritte dabei neu geplant.
+
+        :param plan: Der auszuführende Plan.
+        :type plan: Plan
+        :return: True, wenn der Plan ausgeführt wurde, sonst False.
+        :rtype: bool
+        """
+        if plan.is_empty:
+            return True
+        added = {step.target: step.value for step in plan.of(StepKind.DB_ADD)}
+        removed = tuple(step.target for step in plan.of(StepKind.DB_REMOVE))
+        if added or removed:
+            if not await self.services.wz.registrations.apply(guild=self.guild, added=added, removed=removed):
+                return False
+            logger.info(f"{self.log_context} Applied plan: {len(added)} registrations added, {len(removed)} removed.")
+            self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
+        if not await self.sync():
+            return False
+        return await self.ensure()
+
     async def registration_register(self, interaction: Interaction, role: Role):
-            try:
+        """
+        Schneller Pfad für einen Klick auf einen Registrierungs-Button.
+        Unter einem Lock pro Mitglied wird der aktuelle Stand aus der Datenbank gelesen, die Änderung gespeichert und Roster und Zähler
+        sofort angepasst, sodass ein weiterer Klick desselben Mitglieds gegen den neuen Stand entschieden wird. Danach wird der Benutzer benachrichtigt.
+        Nur die Rollenänderung und das Rendern der betroffenen Listen-Seiten laufen anschließend im Hintergrund.
+
+        :param interaction: Die Interaktion des Klicks.
+        :type interaction: discord.Interaction
+        :param role: Die Rolle des geklickten Buttons.
+        :type role: discord.Role
+        """
+        started = time.monotonic()
+        try:
+            if not interaction.response.is_done():
                 await interaction.response.defer(ephemeral=True)
-                records =await self.services.wz.registrations.get(guild=self.guild, member=interaction.user.id)
-                registration : wz.RegistrationsRecord = records[0] if records and len(records) > 0 else None
-                message = ""
-                if registration and registration.role == role.id:
-                    await self.services.wz.registrations.remove(guild=self.guild, member=interaction.user.id)
+            configured = next((r for r in self.configuration.roles if r.role.id == role.id), None)
+            if configured is None:
+                raise ValueError(f"Role {role.id} is not configured for registration.")
+            async with self.member_locks.setdefault(interaction.user.id, asyncio.Lock()):
+                records = await self.services.wz.registrations.get(guild=self.guild, member=interaction.user.id)
+                old_role_id = records[0].role if records else None
+                old_role = self.guild.get_role(old_role_id) if old_role_id is not None else None
+                timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+                if old_role_id == role.id:
+                    stored = await self.services.wz.registrations.remove(guild=self.guild, member=interaction.user.id)
                     message = t(interaction, "wz.overview.registration.remove_registration", role_name=role.name)
-                    await interaction.user.remove_roles(role, reason="WZ Deregistration")
-                    action = "deregister"
-                elif registration and registration.role != role.id:
-                    old_role = interaction.guild.get_role(registration.role)
-                    if old_role:
-                        await interaction.user.remove_roles(old_role, reason="WZ Registration Update")
-                    await self.services.wz.registrations.add(guild=self.guild, member=interaction.user.id, role=role.id)
-                    await interaction.user.add_roles(role, reason="WZ Registration")
+                    add, remove, reason, action = [], [role], "WZ Deregistration", "deregister"
+                    configured = None
+                elif old_role_id is not None:
+                    stored = await self.services.wz.registrations.add(guild=self.guild, member=interaction.user.id, role=role.id, timestamp=timestamp)
                     message = t(interaction, "wz.overview.registration.update_registration", role_name=role.name)
-                    action = "update"
-                else:       
-                    await self.services.wz.registrations.add(guild=self.guild, member=interaction.user.id, role=role.id)
-                    await interaction.user.add_roles(role, reason="WZ Registration")
+                    add, remove, reason, action = [role], [old_role] if old_role is not None else [], "WZ Registration Update", "update"
+                else:
+                    stored = await self.services.wz.registrations.add(guild=self.guild, member=interaction.user.id, role=role.id, timestamp=timestamp)
                     message = t(interaction, "wz.overview.registration.new_registration", role_name=role.name)
-                    action = "register"
+                    add, remove, reason, action = [role], [], "WZ Registration", "register"
+                if not stored:
+                    raise RuntimeError(f"Failed to store registration action({action}).")
+                # Ohne await zwischen Speichern und Anpassen sieht der nächste Klick Datenbank und Roster im selben Stand
+                self.apply_roster(interaction.user, configured, timestamp)
+
+            await interaction.followup.send(message, ephemeral=True)
+            logger.debug(f"{self.log_context} {interaction.user} registration action({action}) for role {role.id} acknowledged after {(time.monotonic() - started) * 1000:.0f}ms.")
+            self.background(self.apply_registration(interaction.user, add=add, remove=remove, reason=reason))
+        except (HTTPException, Forbidden, NotFound, InteractionResponded, Exception) as e:
+            await interaction.followup.send(t(interaction, "wz.overview.registration.error_registration"), ephemeral=True)
+            logger.exception(f"{self.log_context} {interaction.user} failed to register for role {role.name}: {e}")
+
+    def background(self, coroutine: Coroutine) -> asyncio.Task:
+        """
+        Startet eine Aufgabe im Hintergrund und hält eine Referenz, bis sie beendet ist.
+
+        :param coroutine: Die auszuführende Coroutine.
+        :type coroutine: Coroutine
+        :return: Die gestartete Aufgabe.
+        :rtype: asyncio.Task
+        """
+        task = asyncio.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def apply_roster(self, member: Member, configured: Optional[RegistrationRole], timestamp: str) -> None:
+        """
+        Passt Roster und Zähler an eine bereits gespeicherte Registrierungsänderung an, ohne zu rendern.
+        Läuft gerade eine Synchronisierung, die die Registrierungen vor dem Speichern gelesen haben kann, wird eine weitere Synchronisierung vorgemerkt,
+        damit sie die Änderung nicht dauerhaft mit älteren Daten überschreibt.
+
+        :param member: Das Mitglied, dessen Registrierung sich geändert hat.
+        :type member: discord.Member
+        :param configured: Die neue Registrierungsrolle oder None, wenn sich das Mitglied abgemeldet hat.
+        :type configured: Optional[RegistrationRole]
+        :param timestamp: Der gespeicherte Zeitstempel der Registrierung.
+        :type timestamp: str
+        """
+        current = self.roster.entries.get(member.id)
+        if current is not None:
+            self.count(current[1].role, -1)
+        if configured is not None:
+            self.roster.upsert(RegistrationMember(member=member, role=configured, score=configured.score, timestamp=timestamp))
+            self.count(configured, 1)
+        else:
+            self.roster.remove(member.id)
+        self.data.members = self.roster.members
+        if self.operations.is_busy:
+            self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
+            self.client.overview_manager.schedule(self.guild)
+
+    async def apply_registration(self, member: Member, *, add: List[Role], remove: List[Role], reason: str) -> None:
+        """
+        Wendet eine bereits gespeicherte Registrierungsänderung auf Discord an und rendert die ab der Änderung betroffenen Seiten.
+        Roster und Zähler wurden bereits im Klick angepasst.
+
+        :param member: Das Mitglied, dessen Registrierung sich geändert hat.
+        :type member: discord.Member
+        :param add: Die Rollen, die dem Mitglied hinzugefügt werden.
+        :type add: List[discord.Role]
+        :param remove: Die Rollen, die dem Mitglied entfernt werden.
+        :type remove: List[discord.Role]
+        :param reason: Der Grund für das Audit-Log.
+        :type reason: str
+        """
+        try:
+            if await self.client.role_updates.update(member, add=add, remove=remove, reason=reason):
+                # Die gespeicherte Registrierung stimmt mit den Rollen überein, die Rollenänderung selbst meldet das Gateway-Ereignis
+                self.acknowledge(registrations=True)
+            else:
+                logger.warning(f"{self.log_context} Failed to update registration roles for member {member.id}, scheduling a discord sync to reconcile them.")
+                self.mark(State.SyncEvent.CHANGED_DISCORD)
+                self.client.overview_manager.schedule(self.guild)
+            # Wartet auf eine laufende Synchronisierung, damit das Rendern nicht mit ihr kollidiert
+            async with self.operations.sync():
+                await self.create_registrations_embeds()
+            self.refresh_list()
+        except TimeoutError:
+            self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
+            self.client.overview_manager.schedule(self.guild)
+        except Exception as e:
+            logger.exception(f"{self.log_context} Failed to apply registration of member {member.id}: {e}")
+            self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
+            self.client.overview_manager.schedule(self.guild)
+
+    def count(self, role: RegistrationRole, delta: int) -> None:
+        """
+        Passt die Zähler der Registrierungen für eine Rolle an.
+
+        :param role: Die Registrierungsrolle.
+        :type role: RegistrationRole
+        :param delta: Die Änderung der Anzahl.
+        :type delta: int
+        """
+        self.stats.total += delta
+        if role.permanent:
+            self.stats.permanent += delta
+        else:
+            self.stats.non_permanent += delta
+
+    def refresh_list(self) -> None:
+        """
+        Plant die Aktualisierung der Listen-Nachrichten. Klicks während einer laufenden Aktualisierung werden zu einem weiteren Durchlauf zusammengefasst.
+        """
+        self.list_dirty = True
+        if self.list_task is None or self.list_task.done():
+            self.list_task = self.background(self._refresh_list())
 
-                await interaction.followup.send(message, ephemeral=True)
-                await self.sync(sync_data=True)
-                await self.ensure()
-                await self.sleep(self.WAIT_INTERVAL)
-                logger.debug(f"{self.log_context} {interaction.user} registration action({action}) for role {role.id}.")
-            except (HTTPException, Forbidden, NotFound, InteractionResponded, Exception) as e:
-                await interaction.followup.send(t(interaction, "wz.overview.registration.error_registration"), ephemeral=True)
-                logger.exception(f"{self.log_context} {interaction.user} failed to register for role {role.name}: {e}")
+    async def _refresh_list(self) -> None:
+        while self.list_dirty:
+            self.list_dirty = False
+            try:
+                async with self.operations.work():
+                    # Nur die Listen-Nachrichten, deren Inhalt sich geändert hat, werden bearbeitet
+                    if await self.update_registrations():
+                        self.acknowledge(messages=True)
+            except TimeoutError:
+                self.mark(State.SyncEvent.CHANGED_DISPLAY)
+                self.client.overview_manager.schedule(self.guild)
+                return
 
     def gen_view(self)->View:
         view = View(timeout=None)
@@ -352,31 +921,20 @@ class RegistrationOverview(BasicOverview):
             return view
         
         for configured in self.configuration.roles:
-            def gen_callback(r: Role):
-                async def callback(interaction: Interaction):
-                    await self.registration_register(interaction, r)
-                return callback
-            
-            button = Button(
-                label=configured.role.name,
-                style=ButtonStyle.primary,
-                row=row
-            )
-            button.callback = gen_callback(configured.role)
-            view.add_item(button)
+            # Persistente Buttons, die Klicks über ihre Custom-ID statt über eine Closure dieser Instanz zuordnen
+            view.add_item(RegistrationButton(self.guild.id, configured.role.id, label=configured.role.name, row=row))
             row += 1
             logger.debug(f"{self.log_context} Added registration role button for role {configured.role.id if configured.role else 'unknown'} to view.")
         return view
 
     def create_registration_message(self)->bool:
         try:
-            self.configuration.embed = self.BotEmbed(
+            self.configuration.embed = self.embed(
                 title=self.configuration.title or "Anmeldung",
-                description=self.configuration.description or "Melde dich hier für den nächsten WZ an.",
-                color=self.client_color,
-                client_avatar=self.client_avatar
+                description=self.configuration.description or "Melde dich hier für den nächsten WZ an."
             )
             self.configuration.view = self.gen_view()
+            self.configuration.hash = self.message_hash
             return True
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to create registration message: {e}")
@@ -414,8 +972,25 @@ class RegistrationOverview(BasicOverview):
             self.data.messages = []
             return False
         
+    async def resolve_message(self, message_id: Optional[int]) -> Optional[PartialMessage]:
+        """
+        Gibt eine Nachricht im Registrierungskanal zurück. Nachrichten aus einem Snapshot werden ohne Abruf als `PartialMessage` übernommen
+        und erst von :meth:`verify` geprüft, alle anderen werden von Discord geholt.
+
+        :param message_id: Die ID der Nachricht.
+        :type message_id: Optional[int]
+        :return: Die Nachricht oder None, wenn sie nicht gefunden wurde.
+        :rtype: Optional[PartialMessage]
+        """
+        if message_id is not None and message_id in self.trusted:
+            return self.configuration.channel.get_partial_message(message_id)
+        return await fetch_message(self.configuration.channel, message_id)
+
     async def sync_configuration(self) -> None:
         await self.records.sync_configuration(self.services, self.guild)
+        # Rollen, Farbe oder Avatar können sich geändert haben, daher alle Seiten neu rendern
+        self.reset_style()
+        self.roster.invalidate()
         if self.records.is_configured:
             self.configuration.roles = []
             if self.records.is_configured:
@@ -426,7 +1001,7 @@ class RegistrationOverview(BasicOverview):
                         if role is not None and isinstance(role, Role):
                             self.configuration.roles.append(RegistrationRole(role=role, score=r.score, permanent=r.permanent))
 
-                    self.configuration.message = await fetch_message(self.configuration.channel, self.records.configuration.message) 
+                    self.configuration.message = await self.resolve_message(self.records.configuration.message)
                     self.configuration.title = self.records.configuration.title
                     self.configuration.description = self.records.configuration.description
 
@@ -437,11 +1012,13 @@ class RegistrationOverview(BasicOverview):
         # Reset data
         self.data.members = []
         self.data.messages = []
+        self.data.hashes = {record.message: record.hash for record in self.records.registrations_messages or () if record.hash}
         
         if self.records.is_configured and self.records.has_registrations:
             try:
+                members = await fetch_members(self.guild, tuple(record.member for record in self.records.registrations))
                 for record in self.records.registrations:
-                    member = await fetch_member(self.guild, record.member)
+                    member = members.get(record.member)
                     if member is not None and isinstance(member, Member):
                         role = next((r for r in self.configuration.roles if r.role.id == record.role), None)
                         if role is not None:
@@ -449,8 +1026,8 @@ class RegistrationOverview(BasicOverview):
     
                 if self.records.has_registration_messages:
                     for record in self.records.registrations_messages:
-                        message = await fetch_message(self.configuration.channel, record.message)
-                        if message is not None and isinstance(message, Message):
+                        message = await self.resolve_message(record.message)
+                        if message is not None and isinstance(message, PartialMessage):
                             self.data.messages.append(message)  
                 #await self.sync_list_messages_from_db()
                 self.stats.total = len(self.data.members)
@@ -473,8 +1050,8 @@ class RegistrationOverview(BasicOverview):
 
             if self.records.has_registration_messages:
                 for record in self.records.registrations_messages:
-                    message = await fetch_message(self.configuration.channel, record.message)
-                    if message is not None and isinstance(message, Message):
+                    message = await self.resolve_message(record.message)
+                    if message is not None and isinstance(message, PartialMessage):
                         self.data.messages.append(message)
 
             await self.create_registrations_list()
@@ -482,144 +1059,296 @@ class RegistrationOverview(BasicOverview):
             return True    
             
     async def sync_discord(self) -> bool:
-        def check_member_with_registration_role(roles : ConfigurationRoles, member: Member) -> bool:
-            try:
-                for configured in roles:
-                    if configured.role in member.roles:
-                        return True
-                return False
-            except Exception as e:
-                logger.exception(f"{self.log_context} Failed to check user {member.id} for registration roles: {e}")
-                return False
+        """
+        Gleicht die Registrierungen mit den Rollen auf Discord ab.
+        Statt jedes Mitglied mit jeder Registrierung zu vergleichen, werden die Mitglieder der konfigurierten Rollen gesammelt
+        und die Abweichungen als Mengendifferenz bestimmt. Alle Änderungen werden in einer einzigen Transaktion gespeichert.
+
+        :return: True, wenn der Abgleich erfolgreich war, sonst False.
+        :rtype: bool
+        """
+        if not self.client.is_chunked(self.guild):
+            logger.debug(f"{self.log_context} Skipping discord sync, member list not chunked.")
+            return True
         try:
             raw_records = await self.services.wz.registrations.get(guild=self.guild)
-            records = raw_records if raw_records is not None else []
-            for member in self.guild.members:
-                has_registration_role = check_member_with_registration_role(self.configuration.roles, member)
-                registration_record = next((record for record in records if record.member == member.id), None)
-                if member.bot:
-                    continue
-                if has_registration_role and not registration_record:
-                    await self.services.wz.registrations.add(guild=self.guild, member=member.id, role=next((role for role in self.configuration.roles if role.role in member.roles), None).role.id)
-                    logger.info(f"{self.log_context} Added registration record for member {member.id} with registration role.")
-                elif not has_registration_role and registration_record:
-                    await self.services.wz.registrations.remove(guild=self.guild, member=member.id)
-                    logger.info(f"{self.log_context} Removed registration record for member {member.id} without registration role.")
+            added, removed = self.registration_diff(record.member for record in raw_records or ())
+            if not added and not removed:
+                return True
+            if not await self.services.wz.registrations.apply(guild=self.guild, added=added, removed=removed):
+                return False
+            logger.info(f"{self.log_context} Reconciled registrations with discord: {len(added)} added, {len(removed)} removed.")
+            self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
             return True
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to sync registrations from discord: {e}")
             return False
 
+    def registration_diff(self, registered: Iterable[int]) -> Tuple[Dict[int, int], Tuple[int, ...]]:
+        """
+        Vergleicht die gespeicherten Registrierungen mit den Mitgliedern der konfigurierten Rollen auf Discord, ohne etwas zu verändern.
+
+        :param registered: Die IDs der in der Datenbank registrierten Mitglieder.
+        :type registered: Iterable[int]
+        :return: Die fehlenden Registrierungen (Mitglied -> Rolle) und die IDs der überzähligen Registrierungen.
+        :rtype: Tuple[Dict[int, int], Tuple[int, ...]]
+        """
+        records = set(registered)
+        # Mitglied -> erste konfigurierte Rolle, die das Mitglied besitzt
+        expected : Dict[int, int] = {}
+        for configured in self.configuration.roles:
+            for member in configured.role.members:
+                if not member.bot:
+                    expected.setdefault(member.id, configured.role.id)
+        added = {member_id: role_id for member_id, role_id in expected.items() if member_id not in records}
+        # Registrierungen von Mitgliedern, die die Gilde verlassen haben, werden beim Verlassen entfernt
+        removed = tuple(
+            member_id for member_id in records - expected.keys()
+            if (member := self.guild.get_member(member_id)) is not None and not member.bot
+        )
+        return added, removed
+
     async def sync_startup(self) -> bool:
-        await self.sync_configuration()
-        await self.sync_discord()
-        await self.sync_registrations()
+        self.mark(State.SyncEvent.STARTUP)
+        return await self.flush()
 
-    async def sync(self, startup: bool = False, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> bool:
-        try:
-            await self.wait_while_syncing()
-            self.sync_start()
+    async def flush(self) -> bool:
+        """
+        Führt nur die Synchronisierung aus, die für die markierten Änderungen nötig ist.
+        Die Konfiguration wird nur bei geänderter Konfiguration geladen, der Abgleich mit Discord nur bei erkannten Abweichungen
+        und die Registrierungen werden nur neu geladen und gerendert, wenn sie sich geändert haben.
+        Schlägt ein Schritt fehl, bleibt seine Markierung für die nächste Synchronisierung erhalten.
 
-            # Default zu startup wenn keine Flags gesetzt
-            if not any((startup, sync_data, sync_config, sync_discord)):
-                startup = True
+        :return: True, wenn alle Schritte erfolgreich waren, sonst False.
+        :rtype: bool
+        """
+        Event = State.SyncEvent
+        if self.state.check(Event.STARTUP):
+            self.mark(Event.CHANGED_CONFIGURATION, Event.CHANGED_DISCORD)
+        if self.state.check(Event.CHANGED_CONFIGURATION):
+            try:
+                await self.sync_configuration()
+            except Exception:
+                self.mark(Event.CHANGED_CONFIGURATION)
+                raise
+            # Die Registrierungen verweisen auf die konfigurierten Rollen und müssen neu zugeordnet werden
+            self.mark(Event.CHANGED_REGISTRATIONS)
+        if self.state.check(Event.CHANGED_DISCORD):
+            if not await self.sync_discord():
+                self.mark(Event.CHANGED_DISCORD)
+                return False
+        if self.state.check(Event.CHANGED_REGISTRATIONS):
+            # Neu laden rendert auch die Anzeige neu
+            self.state.reset(Event.CHANGED_DISPLAY)
+            if not await self.sync_registrations():
+                self.mark(Event.CHANGED_REGISTRATIONS)
+                return False
+        elif self.state.check(Event.CHANGED_DISPLAY):
+            # Nur Namen haben sich geändert, der Roster sortiert betroffene Mitglieder ohne Datenbankzugriff neu ein
+            await self.create_registrations_list()
+            await self.create_registrations_embeds()
+        return True
 
-            if startup:
-                await self.sync_startup()
-            else:
+    async def sync(self, startup: bool = False, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> bool:
+        try:
+            async with self.operations.sync():
+                Event = State.SyncEvent
+                if startup:
+                    self.mark(Event.STARTUP)
                 if sync_config:
-                    await self.sync_configuration()
-                
+                    self.mark(Event.CHANGED_CONFIGURATION)
                 if sync_discord:
-                    await self.sync_discord()
-                    
-                if sync_data or sync_discord:
-                    await self.sync_registrations()
+                    self.mark(Event.CHANGED_DISCORD)
+                if sync_data:
+                    self.mark(Event.CHANGED_REGISTRATIONS)
 
-            if self.configuration.is_valid:
-                self.create_registration_message()
+                # Nur ein Abgleich mit Discord stellt den gesamten Stand wieder her, sonst werden nur die eigenen Schreibvorgänge übernommen
+                reconciled = self.state.on_startup or self.state.sync_from_discord
+                # Ohne Flags werden nur die bereits markierten Änderungen synchronisiert
+                flushed = await self.flush()
+                self.track()
+                if not flushed:
+                    # Die Markierungen der fehlgeschlagenen Schritte bleiben für die nächste Synchronisierung erhalten
+                    logger.warning(f"{self.log_context} Registration Overview: sync incomplete, keeping pending changes for the next sync.")
+                    return False
 
-            else:
-                logger.info(f"{self.log_context} Registration overview is not properly configured. Sync will be skipped.")
-                return False
-            logger.info(f"{self.log_context} Registration Overview: synced successfully.")
-            return True
+                if self.configuration.is_valid:
+                    self.create_registration_message()
+
+                else:
+                    logger.info(f"{self.log_context} Registration overview is not properly configured. Sync will be skipped.")
+                    return False
+                logger.info(f"{self.log_context} Registration Overview: synced successfully.")
+                self.acknowledge(registrations=True, messages=True, discord=reconciled)
+                return True
+        except TimeoutError:
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to sync registration overview: {e}")
             return False
-        finally:
-            await self.sync_stop()
+
+    def forget_role(self, role: int) -> None:
+        """
+        Entfernt eine gelöschte Rolle aus der geladenen Konfiguration, ohne die gesamte Konfiguration neu zu laden.
+        Die Registrierungen mit dieser Rolle werden als geändert markiert.
+
+        :param role: Die ID der gelöschten Rolle.
+        :type role: int
+        """
+        self.configuration.roles = [r for r in self.configuration.roles if r.role.id != role]
+        self.mark(State.SyncEvent.CHANGED_REGISTRATIONS)
 
     async def ensure(self) -> bool:
         try:
-            if self.configuration.is_valid:
-                if await self.update():
-                    return True
-                await self.delete()
-                for attempt in range(3):
-                    try:
-                        return await self.send()
-                    except Exception as e:
-                        logger.exception(f"{self.log_context} Failed to send registration overview during ensure attempt {attempt+1}: {e}")
-                        await self.sleep(300)
+            if not self.configuration.is_valid:
+                return False
+            if not self.policy.breaker.allow(self.guild.id):
+                logger.info(f"{self.log_context} Registration overview ensure skipped: circuit open for another {self.policy.breaker.retry_after(self.guild.id):.0f}s.")
+                return False
+            if await self.update():
+                await self.repaired()
+                self.acknowledge(messages=True)
+                return True
+            await self.delete()
+            if await self.send():
+                await self.repaired()
+                self.acknowledge(messages=True)
+                return True
+            # Nicht auf Wiederholungen warten, die Reparatur übernimmt die Warteschlange des Managers
+            await self.defer_repair("update and send failed")
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to ensure registration overview: {e}")
             return False
 
+    async def defer_repair(self, error: str) -> None:
+        """
+        Merkt die Gilde nach einer fehlgeschlagenen Zustellung zur Reparatur vor, ohne auf die Wiederholung zu warten.
+
+        :param error: Der Grund des Fehlschlags.
+        :type error: str
+        """
+        manager = getattr(self.client, "overview_manager", None)
+        if manager is None:
+            logger.warning(f"{self.log_context} Failed to ensure registration overview: {error}")
+            return
+        await manager.repairs.schedule(self.guild.id, error)
+
+    def acknowledge(self, *, registrations: bool = False, messages: bool = False, discord: bool = False) -> None:
+        """
+        Meldet dem Reconciler eigene Schreibvorgänge, damit sie beim nächsten Abgleich nicht als Abweichung gelten.
+        Nur die angegebenen Teile des Fingerabdrucks werden übernommen, eine gleichzeitige Abweichung von außen bleibt erhalten.
+
+        :param registrations: Ob die Registrierungen in der Datenbank geschrieben oder neu geladen wurden.
+        :type registrations: bool
+        :param messages: Ob die Nachrichten gesendet, bearbeitet oder neu erfasst wurden.
+        :type messages: bool
+        :param discord: Ob der gesamte Stand mit Discord abgeglichen wurde, dann wird der aktuelle Fingerabdruck vollständig übernommen.
+        :type discord: bool
+        """
+        manager = getattr(self.client, "overview_manager", None)
+        if manager is None:
+            return
+        def change(known: Fingerprint, fresh: Fingerprint) -> Fingerprint:
+            return fresh if discord else known.adopt(fresh, registrations=registrations, messages=messages)
+        manager.reconciler.acknowledge(self.guild.id, type(self).__name__, change)
+
+    def acknowledge_roles(self, before: Iterable[int], after: Iterable[int]) -> None:
+        """
+        Überträgt eine eigene Rollenänderung eines Mitglieds auf den bekannten Stand des Reconcilers, sobald ihr Gateway-Ereignis eingetroffen ist.
+
+        :param before: Die IDs der Registrierungsrollen des Mitglieds vor der Änderung.
+        :type before: Iterable[int]
+        :param after: Die IDs der Registrierungsrollen des Mitglieds nach der Änderung.
+        :type after: Iterable[int]
+        """
+        manager = getattr(self.client, "overview_manager", None)
+        before, after = set(before), set(after)
+        deltas = {role: 1 for role in after - before} | {role: -1 for role in before - after}
+        if manager is not None and deltas:
+            manager.reconciler.adjust(self.guild.id, type(self).__name__, lambda known: known.shift(deltas))
+
+    async def repaired(self) -> None:
+        """Entfernt eine ausstehende Reparatur der Gilde nach einer erfolgreichen Zustellung."""
+        manager = getattr(self.client, "overview_manager", None)
+        if manager is not None and manager.repairs.is_pending(self.guild.id):
+            await manager.repairs.resolve(self.guild.id)
+            logger.info(f"{self.log_context} Registration overview repaired.")
+
     async def send(self) -> bool:
         try:
-            await self.wait_while_busy()
-            self.work_start()
-            if not self.configuration.is_valid:
-                logger.info(f"{self.log_context} Cannot send registration overview: Invalid configuration.")
-                return False
+            async with self.operations.work():
+                if not self.configuration.is_valid:
+                    logger.info(f"{self.log_context} Cannot send registration overview: Invalid configuration.")
+                    return False
             
-            if self.configuration.has_message:
-                await self.delete()
+                if self.configuration.has_message:
+                    await self.delete()
 
-            self.configuration.message = await self.configuration.channel.send(embed=self.configuration.embed, view=self.configuration.view)
+                self.configuration.message = await self.configuration.channel.send(embed=self.configuration.embed, view=self.configuration.view)
+                await self.services.wz.messages.add(guild=self.guild, channel=self.configuration.channel.id, message=self.configuration.message.id, kind=WzMessages.REGISTRATION)
+                self.track()
 
-            await self.services.wz.registration.setup_registration(
-                guild=self.guild,
-                message=self.configuration.message.id,
-            )
+                await self.services.wz.registration.setup_registration(
+                    guild=self.guild,
+                    message=self.configuration.message.id,
+                )
+                await self.store_message_hash()
             
-            await self.update_registrations()
-            logger.info(f"{self.log_context} Registration overview sent successfully.")
-            return True
+                await self.update_registrations()
+                self.policy.breaker.record_success(self.guild.id)
+                logger.info(f"{self.log_context} Registration overview sent successfully.")
+                return True
         except Forbidden:
+            self.policy.breaker.record_failure(self.guild.id)
             logger.warning(f"{self.log_context} Missing permissions to send message in registration channel {self.configuration.channel.id}.")
             return False
         except NotFound:
+            self.policy.breaker.record_failure(self.guild.id)
             logger.warning(f"{self.log_context} Registration channel {self.configuration.channel.id} not found for sending message.")
             return False
         except HTTPException as e:
             logger.warning(f"{self.log_context} HTTP error while sending message in registration channel {self.configuration.channel.id}: {e}")
             return False
+        except TimeoutError:
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to send registration overview: {e}")
             return False
-        finally:
-            await self.work_stop()
     
+    @property
+    def message_hash(self) -> str:
+        """Gibt den Inhalts-Hash der Registrierungsmeldung aus Embed und Buttons zurück."""
+        buttons = "".join(f"{item.custom_id}={item.item.label}" for item in self.configuration.view.children) if self.configuration.view else ""
+        return self.pack_hash([self.configuration.embed]) + buttons if self.configuration.embed else buttons
+
+    async def store_message_hash(self) -> None:
+        """Speichert den Inhalts-Hash der aktuellen Registrierungsmeldung."""
+        if await self.services.wz.registration.set_hash(guild=self.guild, hash=self.configuration.hash) and self.records.configuration is not None:
+            self.records.configuration = replace(self.records.configuration, hash=self.configuration.hash)
+
     async def update(self) -> bool:
         try:
-            await self.wait_while_busy()
-            self.work_start()   
-
-            if not self.configuration.is_valid:
-                logger.info(f"{self.log_context} Cannot update registration overview: Invalid configuration.")
-                return False
+            async with self.operations.work():
+                if not self.configuration.is_valid:
+                    logger.info(f"{self.log_context} Cannot update registration overview: Invalid configuration.")
+                    return False
             
-            if not self.configuration.has_message:
-                logger.info(f"{self.log_context} Cannot update registration overview: No existing message.")
-                return False
-      
-            await self.configuration.message.edit(embed=self.configuration.embed, view=self.configuration.view)
-            await self.update_registrations()
-            logger.info(f"{self.log_context} Registration overview updated successfully.")
-            return True
+                if not self.configuration.has_message:
+                    logger.info(f"{self.log_context} Cannot update registration overview: No existing message.")
+                    return False
+
+                # Die Buttons sind persistent, eine unveränderte Meldung muss daher auch nach einem Neustart nicht bearbeitet werden
+                stored = self.records.configuration.hash if self.records.configuration is not None else None
+                if stored != self.configuration.hash:
+                    await self.configuration.message.edit(embed=self.configuration.embed, view=self.configuration.view)
+                    await self.store_message_hash()
+                await self.update_registrations()
+                self.policy.breaker.record_success(self.guild.id)
+                logger.info(f"{self.log_context} Registration overview updated successfully.")
+                return True
         except Forbidden:
+            self.policy.breaker.record_failure(self.guild.id)
             logger.warning(f"{self.log_context} Missing permissions to edit message in registration channel {self.configuration.channel.id}.")
             return False
         except NotFound:
@@ -628,62 +1357,140 @@ class RegistrationOverview(BasicOverview):
         except HTTPException as e:
             logger.warning(f"{self.log_context} HTTP error while updating message in registration channel {self.configuration.channel.id}: {e}")
             return False   
+        except TimeoutError:
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to update registration overview: {e}")
             return False
-        finally:
-            await self.work_stop()
         
     async def clean(self) -> bool:
         try:
-            await self.wait_while_busy()
-            self.work_start()
-
-            if not self.configuration.is_valid:
-                return False
+            async with self.operations.work():
+                if not self.configuration.is_valid:
+                    return False
 
-            await self.configuration.channel.purge(limit=999, check=lambda m: m.author.id != self.client.user.id and m.pinned == False)
-            return True
+                # Nur Nachrichten nach der Bereinigungsmarke prüfen, statt den gesamten Verlauf erneut zu durchsuchen
+                watermark = self.records.configuration.cleaned if self.records.configuration else None
+                if watermark and self.configuration.channel.last_message_id == watermark:
+                    return True
+                # Ohne Marke würde `after=None` mit `oldest_first=True` am Anfang des Kanals beginnen.
+                # Der erste Lauf prüft daher wie zuvor `purge` die neuesten Nachrichten, danach wird ab der Marke fortgesetzt
+                history = (
+                    self.configuration.channel.history(limit=999, after=Object(id=watermark), oldest_first=True)
+                    if watermark else self.configuration.channel.history(limit=999)
+                )
+                newest = watermark
+                ids = []
+                async for message in history:
+                    newest = max(newest or 0, message.id)
+                    if message.author.id != self.client.user.id and not message.pinned:
+                        ids.append(message.id)
+                if ids:
+                    await delete_messages(self.configuration.channel, ids)
+                if newest and newest != watermark:
+                    await self.services.wz.registration.set_cleaned(guild=self.guild, message=newest)
+                    self.records.configuration = replace(self.records.configuration, cleaned=newest)
+                logger.debug(f"{self.log_context} Cleaned {len(ids)} messages after watermark {watermark}.")
+                return True
         except Forbidden:
             logger.warning(f"{self.log_context} Missing permissions to purge messages in registration channel {self.configuration.channel.id}.")
             return False
         except NotFound:
             logger.warning(f"{self.log_context} Registration channel {self.configuration.channel.id} not found for purging messages.")
             return False     
+        except TimeoutError:
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to clean registration channel: {e}")
             return False
-        finally:            
-            await self.work_stop()
 
     async def delete(self) -> bool:
         try:
-            await self.wait_while_deleting()
-            self.delete_start()
-
-            if not self.configuration.is_valid:
-                return False
-            if self.configuration.has_message:
-                await self.configuration.channel.purge(limit=999, check=lambda m: m.author.id == self.client.user.id and m.id != self.configuration.message.id)
-            else:
-                await self.configuration.channel.purge(limit=999, check=lambda m: m.author.id == self.client.user.id)
-            return True
+            async with self.operations.delete():
+                if not self.configuration.is_valid:
+                    return False
+                keep = self.configuration.message.id if self.configuration.has_message else None
+                tracked = await self.services.wz.messages.get(guild=self.guild, channel=self.configuration.channel.id)
+                if tracked is None:
+                    # Noch keine Nachrichten erfasst, z.B. vor dem ersten Senden: einmalig den Verlauf durchsuchen
+                    deleted = [m.id for m in await self.configuration.channel.purge(limit=999, check=lambda m: m.author.id == self.client.user.id and m.id != keep)]
+                else:
+                    ids = [record.message for record in tracked if record.message != keep]
+                    # Die Lösch-Ereignisse können nach dem Ende der Löschung eintreffen und werden anhand der ID ignoriert
+                    self.own_deletions.update(ids)
+                    deleted = await delete_messages(self.configuration.channel, ids)
+                    await self.services.wz.messages.remove(guild=self.guild, messages=tuple(deleted))
+                self.own_deletions.update(deleted)
+                # Die Listen-Nachrichten wurden mit gelöscht und müssen beim nächsten Update neu gesendet werden
+                if self.data.messages:
+                    await self.services.wz.list.remove(guild=self.guild, messages=tuple(m.id for m in self.data.messages))
+                    self.data.messages = []
+                    self.data.hashes = {}
+                self.track()
+                return True
         except Forbidden:
             logger.warning(f"{self.log_context} Missing permissions to delete messages in registration channel {self.configuration.channel.id}.")
             return False
         except HTTPException as e:
             logger.warning(f"{self.log_context} HTTP error while deleting messages in registration channel {self.configuration.channel.id}: {e}")
             return False
+        except TimeoutError:
+            return False
         except Exception as e:
             logger.exception(f"{self.log_context} Failed to delete registration messages: {e}")
             return False
-        finally:
-            await self.delete_stop()
 
-    async def on_message_delete(self, payload: RawMessageDeleteEvent) -> bool:
-        if self.IS_DELETING:
-            await self.wait_while_deleting()
+    def track(self) -> None:
+        """
+        Aktualisiert die IDs der Nachrichten, deren Löschung die Übersicht betrifft: die Registrierungsnachricht und die Listen-Nachrichten.
+        Der Manager prüft gelöschte Nachrichten gegen diese Menge und verwirft fremde Löschungen, ohne die Übersicht aufzurufen.
+        """
+        tracked = {m.id for m in self.data.messages}
+        if self.configuration.has_message:
+            tracked.add(self.configuration.message.id)
+        self.tracked = tracked
+        # Lösch-Ereignisse für nicht mehr erfasste Nachrichten werden bereits vom Manager verworfen
+        self.own_deletions &= tracked
+
+    async def forget_messages(self, message_ids: Set[int]) -> bool:
+        """
+        Vergisst gelöschte Nachrichten der Übersicht und plant eine Reparatur.
+        Gelöschte Listen-Nachrichten werden aus der Reihenfolge entfernt, sodass `ensure()` nur die Seiten ab der ersten Lücke bearbeitet
+        und nur so viele Nachrichten neu sendet, wie fehlen. Fehlt die Registrierungsnachricht, wird die Übersicht neu gesendet.
+
+        :param message_ids: Die IDs der gelöschten Nachrichten.
+        :type message_ids: Set[int]
+        :return: True, wenn eine Reparatur geplant wurde, sonst False.
+        :rtype: bool
+        """
+        # Eigene Löschungen lösen dieses Ereignis ebenfalls aus und werden ignoriert
+        own = message_ids & self.own_deletions
+        self.own_deletions -= own
+        missing = (message_ids - own) & self.tracked
+        if not missing:
             return False
-        await self.sync(sync_config=True)
-        await self.ensure()
-        return True
\ No newline at end of file
+        if self.configuration.has_message and self.configuration.message.id in missing:
+            self.configuration.message = None
+        lost = [m.id for m in self.data.messages if m.id in missing]
+        if lost:
+            # Gelöschte Listen-Nachrichten vergessen, damit die Seiten trotz unverändertem Hash neu gesendet werden
+            self.data.messages = [m for m in self.data.messages if m.id not in missing]
+            for message_id in lost:
+                self.data.hashes.pop(message_id, None)
+        # In der kompakten Form sind die Listen-Nachrichten nicht geladen, daher alle fehlenden IDs entfernen
+        await self.services.wz.list.remove(guild=self.guild, messages=tuple(missing))
+        await self.services.wz.messages.remove(guild=self.guild, messages=tuple(missing))
+        if self.is_compact:
+            self.tracked = self.tracked - missing
+        else:
+            self.track()
+        logger.info(f"{self.log_context} {len(missing)} overview message(s) deleted, scheduling repair.")
+        # Die Daten sind unverändert, `ensure()` sendet fehlende Nachrichten erneut
+        self.client.overview_manager.schedule(self.guild)
+        return True
+
+    async def on_message_delete(self, payload: RawMessageDeleteEvent) -> bool:
+        return await self.forget_messages({payload.message_id})
+
+    async def on_bulk_message_delete(self, payload: RawBulkMessageDeleteEvent) -> bool:
+        return await self.forget_messages(set(payload.message_ids))
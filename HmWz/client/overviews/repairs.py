@@ -0,0 +1,266 @@
+"""
+Dieses Modul enthält die Warteschlange für fehlgeschlagene Zustellungen der Übersichten.
+Schlägt `ensure()` fehl, wartet der Aufrufer nicht mehr auf Wiederholungen, sondern die Gilde wird mit exponentiellem Backoff
+und Jitter zur Reparatur vorgemerkt. Die fälligen Reparaturen liegen in einem Heap, den eine einzige Schleife des Managers abarbeitet.
+Die Warteschlange wird in der Datenbank gespeichert, sodass ausstehende Reparaturen einen Neustart überstehen.
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from ...configuration import Repair
+from ...retry import policy
+
+if TYPE_CHECKING:
+    from . import Manager
+
+__all__ = ["RepairQueue", "RepairEntry", "RepairStats"]
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, slots=True)
+class RepairEntry:
+    """
+    Eine ausstehende Reparatur einer Gilde.
+
+    :param guild: Die ID der Gilde.
+    :type guild: int
+    :param attempts: Die Anzahl der bisher fehlgeschlagenen Versuche.
+    :type attempts: int
+    :param due: Der Zeitpunkt des nächsten Versuchs als Unix-Zeitstempel.
+    :type due: float
+    :param error: Der Grund des letzten Fehlschlags.
+    :type error: Optional[str]
+    """
+    guild: int
+    attempts: int
+    due: float
+    error: Optional[str] = None
+
+@dataclass(slots=True)
+class RepairStats:
+    """
+    Statistiken der Reparatur-Warteschlange.
+
+    :param scheduled: Die Anzahl der vorgemerkten Reparaturen.
+    :type scheduled: int
+    :param attempts: Die Anzahl der ausgeführten Versuche.
+    :type attempts: int
+    :param repaired: Die Anzahl der erfolgreichen Reparaturen.
+    :type repaired: int
+    :param abandoned: Die Anzahl der Reparaturen, die nach `Repair.MAX_ATTEMPTS` Versuchen aufgegeben wurden.
+    :type abandoned: int
+    """
+    scheduled: int = 0
+    attempts: int = 0
+    repaired: int = 0
+    abandoned: int = 0
+
+    def summary(self) -> str:
+        """Gibt die Statistiken als einzeilige Zusammenfassung zurück."""
+        return f"{self.scheduled} scheduled, {self.attempts} attempts, {self.repaired} repaired, {self.abandoned} abandoned"
+
+class RepairQueue:
+    """
+    Persistente Warteschlange für Reparaturen der Übersichten mit Backoff pro Gilde.
+
+    :param manager: Der Manager der Übersichten.
+    :type manager: Manager
+    :param base_delay: Die Wartezeit nach dem ersten Fehlschlag in Sekunden.
+    :type base_delay: float
+    :param max_delay: Die maximale Wartezeit in Sekunden.
+    :type max_delay: float
+    :param max_attempts: Die Anzahl der Versuche, nach der eine Reparatur aufgegeben wird.
+    :type max_attempts: int
+    """
+    def __init__(self, manager: Manager, base_delay: float = Repair.BASE_DELAY.value, max_delay: float = Repair.MAX_DELAY.value, max_attempts: int = Repair.MAX_ATTEMPTS.value):
+        self.manager : Manager = manager
+        self.base_delay : float = base_delay
+        self.max_delay : float = max_delay
+        self.max_attempts : int = max_attempts
+        self.entries : Dict[int, RepairEntry] = {}
+        self.heap : List[Tuple[float, int]] = []
+        self.wake : asyncio.Event = asyncio.Event()
+        self.stats : RepairStats = RepairStats()
+
+    @property
+    def repairs(self):
+        """Gibt den Datenbank-Service der Reparaturen zurück."""
+        return self.manager.client.services.wz.repairs
+
+    def backoff(self, attempts: int) -> float:
+        """
+        Berechnet die Wartezeit bis zum nächsten Versuch mit exponentiellem Backoff und Jitter.
+        Die Hälfte der Wartezeit ist fest, damit Wiederholungen nicht sofort erfolgen, die andere Hälfte ist zufällig verteilt.
+
+        :param attempts: Die Anzahl der bisher fehlgeschlagenen Versuche, mindestens 1.
+        :type attempts: int
+        :return: Die Wartezeit in Sekunden.
+        :rtype: float
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def _push(self, entry: RepairEntry) -> None:
+        self.entries[entry.guild] = entry
+        # Veraltete Einträge bleiben im Heap und werden beim Entnehmen anhand des Fälligkeitszeitpunkts verworfen
+        heapq.heappush(self.heap, (entry.due, entry.guild))
+        self.wake.set()
+
+    def is_pending(self, guild_id: int) -> bool:
+        """
+        Gibt zurück, ob für die Gilde eine Reparatur aussteht.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn eine Reparatur aussteht, sonst False.
+        :rtype: bool
+        """
+        return guild_id in self.entries
+
+    def pending(self) -> List[RepairEntry]:
+        """
+        Gibt alle ausstehenden Reparaturen zurück, sortiert nach dem Zeitpunkt des nächsten Versuchs.
+
+        :return: Die ausstehenden Reparaturen.
+        :rtype: List[RepairEntry]
+        """
+        return sorted(self.entries.values(), key=lambda entry: entry.due)
+
+    def status(self) -> str:
+        """
+        Gibt die Statistiken und die ausstehenden Reparaturen als einzeilige Zusammenfassung zurück.
+
+        :return: Die Zusammenfassung.
+        :rtype: str
+        """
+        now = time.time()
+        pending = "; ".join(f"guild {entry.guild} in {max(0.0, entry.due - now):.0f}s (attempt {entry.attempts}/{self.max_attempts})" for entry in self.pending())
+        return f"{self.stats.summary()}, {len(self.entries)} pending" + (f": {pending}" if pending else "")
+
+    async def schedule(self, guild_id: int, error: Optional[str] = None) -> Optional[RepairEntry]:
+        """
+        Merkt eine Gilde nach einer fehlgeschlagenen Zustellung zur Reparatur vor und kehrt sofort zurück.
+        Ist bereits eine Reparatur vorgemerkt, zählt der Fehlschlag als weiterer Versuch.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param error: Der Grund des Fehlschlags.
+        :type error: Optional[str]
+        :return: Die vorgemerkte Reparatur oder None, wenn die Reparatur aufgegeben wurde.
+        :rtype: Optional[RepairEntry]
+        """
+        current = self.entries.get(guild_id)
+        attempts = (current.attempts if current else 0) + 1
+        if attempts > self.max_attempts:
+            self.stats.abandoned += 1
+            logger.error(f"Giving up repairing overview of guild {guild_id} after {attempts - 1} attempts: {error}")
+            await self.resolve(guild_id)
+            return None
+        entry = RepairEntry(guild=guild_id, attempts=attempts, due=time.time() + self.backoff(attempts), error=error)
+        self._push(entry)
+        self.stats.scheduled += 1
+        await self.repairs.put(guild=guild_id, attempts=entry.attempts, due=entry.due, error=error)
+        logger.info(f"Scheduled overview repair for guild {guild_id} in {entry.due - time.time():.0f}s (attempt {attempts}/{self.max_attempts}): {error}")
+        return entry
+
+    async def resolve(self, guild_id: int) -> bool:
+        """
+        Entfernt die ausstehende Reparatur einer Gilde, z.B. nachdem die Übersicht erfolgreich zugestellt wurde.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn eine Reparatur ausstand, sonst False.
+        :rtype: bool
+        """
+        if self.entries.pop(guild_id, None) is None:
+            return False
+        await self.repairs.remove(guild=guild_id)
+        return True
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Entfernt die Reparatur einer Gilde nur aus dem Speicher, z.B. wenn der Bot die Gilde verlässt und ihre Daten ohnehin gelöscht werden.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        self.entries.pop(guild_id, None)
+
+    async def load(self) -> int:
+        """
+        Lädt die gespeicherten Reparaturen, z.B. nach einem Neustart. Überfällige Reparaturen werden sofort fällig.
+
+        :return: Die Anzahl der geladenen Reparaturen.
+        :rtype: int
+        """
+        records = await self.repairs.get()
+        for record in records or ():
+            self._push(RepairEntry(guild=record.guild, attempts=record.attempts, due=record.due, error=record.error))
+        if records:
+            logger.info(f"Loaded {len(records)} pending overview repair(s).")
+        return len(records or ())
+
+    async def attempt(self, entry: RepairEntry) -> None:
+        """
+        Führt eine fällige Reparatur aus. Schlägt `ensure()` erneut fehl, merkt die Übersicht die Gilde selbst wieder vor.
+
+        :param entry: Die fällige Reparatur.
+        :type entry: RepairEntry
+        """
+        guild = self.manager.client.get_guild(entry.guild)
+        if guild is None:
+            await self.resolve(entry.guild)
+            return
+        if policy.breaker.is_open(entry.guild):
+            # Kein Versuch, solange der Breaker offen ist, der Fehlschlag zählt daher nicht
+            self._push(RepairEntry(guild=entry.guild, attempts=entry.attempts, due=time.time() + policy.breaker.retry_after(entry.guild), error=entry.error))
+            return
+        if not self.manager.is_ready(entry.guild):
+            self._push(RepairEntry(guild=entry.guild, attempts=entry.attempts, due=time.time() + Repair.NOT_READY_DELAY.value, error=entry.error))
+            return
+        self.stats.attempts += 1
+        try:
+            status = await self.manager.ensure(guild)
+        except Exception as e:
+            logger.exception(f"Failed to repair overview of guild {entry.guild}: {e}")
+            status = False
+        if status:
+            self.stats.repaired += 1
+        if self.entries.get(entry.guild) is entry:
+            # Weder aufgelöst noch erneut vorgemerkt, z.B. weil die Übersicht nicht mehr eingerichtet ist
+            await self.resolve(entry.guild)
+
+    async def run(self) -> None:
+        """
+        Arbeitet die fälligen Reparaturen ab. Die Schleife schläft bis zur nächsten fälligen Reparatur oder bis eine neue vorgemerkt wird.
+        """
+        await self.manager.client.wait_until_ready()
+        await self.load()
+        while not self.manager.client.is_closed():
+            self.wake.clear()
+            if not self.heap:
+                await self.wake.wait()
+                continue
+            due, guild_id = self.heap[0]
+            delay = due - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), timeout=delay)
+                except TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self.heap)
+            entry = self.entries.get(guild_id)
+            if entry is None or entry.due != due:
+                continue
+            try:
+                await self.attempt(entry)
+            except Exception as e:
+                logger.exception(f"Failed to process overview repair of guild {guild_id}: {e}")
+            logger.info(f"Overview repairs: {self.status()}.")
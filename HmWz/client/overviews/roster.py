@@ -0,0 +1,212 @@
+"""
+Dieses Modul enthält den sortierten Roster-Index für die Registrierungslisten.
+Der Index hält die registrierten Mitglieder sortiert nach (nicht permanent, Rollenname, Anzeigename) und wendet Änderungen einzeln an,
+statt die gesamte Liste bei jeder Synchronisation neu zu sortieren. Dabei merkt er sich die erste veränderte Position,
+sodass nur die ab dort betroffenen Seiten neu gerendert werden.
+
+Die Sortierschlüssel werden über :func:`collation_key` gebildet und zwischengespeichert. Umlaute werden nach DIN 5007-2
+(Namenssortierung) behandelt, also "ä" wie "ae", "ö" wie "oe", "ü" wie "ue" und "ß" wie "ss".
+"""
+from __future__ import annotations
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ...emojis import Emojis
+from ...types import RegistrationMember
+
+__all__ = ["RosterIndex", "RosterPage", "collation_key"]
+
+type RosterKey = Tuple[bool, str, str, int, str, str, int]
+"""Typalias für den Sortierschlüssel eines Mitglieds im Roster."""
+
+_UMLAUTS = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+
+# Größer als die Anzahl der Anzeigenamen großer Gilden, sonst verdrängt jeder Abgleich des Index den gesamten Cache
+@lru_cache(maxsize=65536)
+def collation_key(name: str) -> str:
+    """
+    Gibt den Sortierschlüssel für einen Namen zurück. Groß- und Kleinschreibung sowie Akzente werden ignoriert,
+    deutsche Umlaute werden ausgeschrieben.
+
+    :param name: Der Name.
+    :type name: str
+    :return: Der Sortierschlüssel.
+    :rtype: str
+    """
+    folded = name.casefold().translate(_UMLAUTS)
+    return "".join(c for c in unicodedata.normalize("NFKD", folded) if not unicodedata.combining(c))
+
+@dataclass(slots=True)
+class RosterPage:
+    """
+    Repräsentiert eine gerenderte Seite des Rosters.
+
+    :param start: Der Index des ersten Mitglieds auf der Seite.
+    :type start: int
+    :param rows: Die Zeilen der Seite.
+    :type rows: List[str]
+    """
+    start: int
+    rows: List[str] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """Gibt den Text der Seite zurück."""
+        return "\n".join(self.rows) + "\n" if self.rows else ""
+
+class RosterIndex:
+    """
+    Sortierter Index der registrierten Mitglieder einer Gilde.
+    Einfügen, Entfernen und Verschieben eines Mitglieds suchen die Position per Bisektion in O(log n).
+    Das Einfügen und Löschen in der Liste selbst verschiebt die folgenden Einträge und kostet O(n), allerdings als einzelnes `memmove`
+    über Zeiger. Bei einigen tausend Mitgliedern pro Gilde ist das vernachlässigbar gegenüber dem anschließenden Rendern der Seiten,
+    das ohnehin ab der geänderten Position linear ist. Ein balancierter Baum mit Positionsabfrage würde daran nichts ändern.
+    """
+    def __init__(self):
+        self.keys : List[RosterKey] = []
+        self.entries : Dict[int, Tuple[RosterKey, RegistrationMember]] = {}
+        self.pages : List[RosterPage] = []
+        self.dirty_from : Optional[int] = None
+        self.version : int = 0
+
+    @staticmethod
+    def key(member: RegistrationMember) -> RosterKey:
+        """
+        Gibt den Sortierschlüssel eines registrierten Mitglieds zurück.
+        Der Rohname dient als Tiebreaker, damit auch reine Änderungen der Schreibweise erkannt werden.
+
+        :param member: Das registrierte Mitglied.
+        :type member: RegistrationMember
+        :return: Der Sortierschlüssel.
+        :rtype: RosterKey
+        """
+        role = member.role.role
+        name = member.member.display_name
+        return (not member.role.permanent, collation_key(role.name), role.name, role.id, collation_key(name), name, member.member.id)
+
+    @staticmethod
+    def label(member: RegistrationMember) -> str:
+        """Gibt die Überschrift der Rollengruppe eines Mitglieds zurück."""
+        return f"{member.role.role.name} {Emojis.PERMA_REGISTRATION.value if member.role.permanent else Emojis.NORMAL_REGISTRATION.value}"
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, member_id: int) -> bool:
+        return member_id in self.entries
+
+    @property
+    def members(self) -> List[RegistrationMember]:
+        """Gibt die registrierten Mitglieder in sortierter Reihenfolge zurück."""
+        return [self.entries[key[-1]][1] for key in self.keys]
+
+    def _touch(self, position: int) -> None:
+        self.version += 1
+        self.dirty_from = position if self.dirty_from is None else min(self.dirty_from, position)
+
+    def upsert(self, member: RegistrationMember) -> None:
+        """
+        Fügt ein Mitglied ein oder verschiebt es, wenn sich Rolle oder Anzeigename geändert haben.
+
+        :param member: Das registrierte Mitglied.
+        :type member: RegistrationMember
+        """
+        key = self.key(member)
+        current = self.entries.get(member.member.id)
+        if current is not None:
+            if current[0] == key:
+                if current[1] != member:
+                    # Gleiche Position, aber z.B. neuer Zeitstempel: keine Seite betroffen, aber neue Datenversion
+                    self.entries[member.member.id] = (key, member)
+                    self.version += 1
+                return
+            position = bisect_left(self.keys, current[0])
+            del self.keys[position]
+            self._touch(position)
+        self.entries[member.member.id] = (key, member)
+        insort(self.keys, key)
+        self._touch(bisect_left(self.keys, key))
+
+    def remove(self, member_id: int) -> None:
+        """
+        Entfernt ein Mitglied aus dem Index.
+
+        :param member_id: Die ID des Mitglieds.
+        :type member_id: int
+        """
+        current = self.entries.pop(member_id, None)
+        if current is None:
+            return
+        position = bisect_left(self.keys, current[0])
+        del self.keys[position]
+        self._touch(position)
+
+    def update(self, members: Iterable[RegistrationMember]) -> Optional[int]:
+        """
+        Gleicht den Index mit den aktuellen Registrierungen ab. Nur geänderte Mitglieder werden verschoben.
+
+        :param members: Die aktuellen registrierten Mitglieder.
+        :type members: Iterable[RegistrationMember]
+        :return: Die erste veränderte Position oder None, wenn sich nichts geändert hat.
+        :rtype: Optional[int]
+        """
+        seen = set()
+        for member in members:
+            seen.add(member.member.id)
+            self.upsert(member)
+        for member_id in [member_id for member_id in self.entries if member_id not in seen]:
+            self.remove(member_id)
+        return self.dirty_from
+
+    def invalidate(self) -> None:
+        """Markiert alle Seiten als veraltet, z.B. nach einer Änderung der Konfiguration."""
+        self.pages = []
+        self.dirty_from = 0
+        self.version += 1
+
+    def render(self, chunk_size: int, max_rows: int) -> int:
+        """
+        Rendert die Seiten ab der ersten betroffenen Seite neu. Eine Rollenüberschrift wird immer zusammen mit dem folgenden Mitglied umgebrochen.
+
+        :param chunk_size: Die maximale Anzahl an Zeichen pro Seite.
+        :type chunk_size: int
+        :param max_rows: Die maximale Anzahl an Zeilen pro Seite.
+        :type max_rows: int
+        :return: Der Index der ersten neu gerenderten Seite, `len(self.pages)` wenn keine Seite neu gerendert wurde.
+        :rtype: int
+        """
+        if self.dirty_from is None:
+            return len(self.pages)
+        # Die Seite vor der Änderung kann nach dem Entfernen eines Mitglieds weitere Zeilen aufnehmen
+        position = max(0, self.dirty_from - 1)
+        starts = [page.start for page in self.pages]
+        first = max(0, bisect_right(starts, position) - 1)
+        self.dirty_from = None
+
+        start = self.pages[first].start if first < len(self.pages) else 0
+        del self.pages[first:]
+        members = self.members
+        last_label = self.label(members[start - 1]) if start > 0 else ""
+        page = RosterPage(start=start)
+        length = 0
+        for index in range(start, len(members)):
+            member = members[index]
+            rows = []
+            label = self.label(member)
+            if label != last_label:
+                rows.append(f"**{label}**")
+                last_label = label
+            rows.append(f"{index + 1}. {member.member.display_name}")
+            size = sum(len(row) + 1 for row in rows)
+            if page.rows and (length + size > chunk_size or len(page.rows) + len(rows) > max_rows):
+                self.pages.append(page)
+                page = RosterPage(start=index)
+                length = 0
+            page.rows.extend(rows)
+            length += size
+        if page.rows:
+            self.pages.append(page)
+        return first
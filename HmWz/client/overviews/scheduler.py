@@ -0,0 +1,148 @@
+"""
+Dieses Modul enthält den Scheduler für Aktualisierungen der Übersichten.
+Auslöser wie Button-Klicks, Mitglieder- oder Rollenänderungen markieren nur die benötigten Synchronisationsarten einer Gilde als veraltet.
+Nach einem kurzen Entprellfenster führt der Scheduler eine einzige, zusammengeführte Synchronisation mit anschließendem `ensure()` aus.
+Die maximale Wartezeit ab dem ersten Auslöser ist begrenzt, damit ständige Auslöser die Aktualisierung nicht endlos verzögern.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict
+
+from discord import Guild
+
+from ...configuration import Refresh
+
+if TYPE_CHECKING:
+    from . import Manager
+
+__all__ = ["RefreshScheduler", "PendingRefresh", "RefreshStats"]
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class PendingRefresh:
+    """
+    Repräsentiert die gesammelten Synchronisationsarten einer Gilde, die noch nicht ausgeführt wurden.
+
+    :param first: Der Zeitpunkt des ersten Auslösers.
+    :type first: float
+    :param last: Der Zeitpunkt des letzten Auslösers.
+    :type last: float
+    """
+    first: float
+    last: float
+    sync_data: bool = False
+    sync_config: bool = False
+    sync_discord: bool = False
+    triggers: int = 0
+
+@dataclass(slots=True)
+class RefreshStats:
+    """
+    Statistiken des Schedulers.
+
+    :param triggers: Die Anzahl aller Auslöser.
+    :type triggers: int
+    :param runs: Die Anzahl der ausgeführten Aktualisierungen.
+    :type runs: int
+    :param failures: Die Anzahl der fehlgeschlagenen Aktualisierungen.
+    :type failures: int
+    """
+    triggers: int = 0
+    runs: int = 0
+    failures: int = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Gibt die Anzahl der Auslöser zurück, die mit anderen zusammengefasst wurden."""
+        return max(0, self.triggers - self.runs)
+
+    def summary(self) -> str:
+        """Gibt die Statistiken als einzeilige Zusammenfassung zurück."""
+        return f"{self.triggers} triggers, {self.runs} runs, {self.coalesced} coalesced, {self.failures} failures"
+
+class RefreshScheduler:
+    """
+    Entprellt und bündelt Aktualisierungen der Übersichten pro Gilde.
+
+    :param manager: Der Manager der Übersichten.
+    :type manager: Manager
+    :param debounce: Die Zeit in Sekunden ohne neuen Auslöser, nach der die Aktualisierung ausgeführt wird.
+    :type debounce: float
+    :param max_latency: Die maximale Zeit in Sekunden zwischen dem ersten Auslöser und der Aktualisierung.
+    :type max_latency: float
+    """
+    def __init__(self, manager: Manager, debounce: float = Refresh.DEBOUNCE.value, max_latency: float = Refresh.MAX_LATENCY.value):
+        self.manager : Manager = manager
+        self.debounce : float = debounce
+        self.max_latency : float = max_latency
+        self.pending : Dict[int, PendingRefresh] = {}
+        self.tasks : Dict[int, asyncio.Task] = {}
+        self.stats : RefreshStats = RefreshStats()
+
+    def schedule(self, guild: Guild, *, sync_data: bool = False, sync_config: bool = False, sync_discord: bool = False) -> None:
+        """
+        Markiert die angegebenen Synchronisationsarten einer Gilde als veraltet und plant die Aktualisierung.
+
+        :param guild: Die Gilde, deren Übersichten aktualisiert werden sollen.
+        :type guild: discord.Guild
+        :param sync_data: Ob die Daten (Registrierungen) synchronisiert werden sollen.
+        :type sync_data: bool
+        :param sync_config: Ob die Konfiguration synchronisiert werden soll.
+        :type sync_config: bool
+        :param sync_discord: Ob die Discord-Mitglieder mit der Datenbank abgeglichen werden sollen.
+        :type sync_discord: bool
+        """
+        now = asyncio.get_running_loop().time()
+        pending = self.pending.get(guild.id)
+        if pending is None:
+            pending = PendingRefresh(first=now, last=now)
+            self.pending[guild.id] = pending
+        pending.last = now
+        pending.sync_data |= sync_data
+        pending.sync_config |= sync_config
+        pending.sync_discord |= sync_discord
+        pending.triggers += 1
+        self.stats.triggers += 1
+        if guild.id not in self.tasks:
+            self.tasks[guild.id] = asyncio.create_task(self._run(guild))
+
+    def cancel(self, guild: Guild) -> None:
+        """
+        Verwirft geplante Aktualisierungen einer Gilde, z.B. wenn der Bot die Gilde verlässt.
+
+        :param guild: Die Gilde.
+        :type guild: discord.Guild
+        """
+        self.pending.pop(guild.id, None)
+        task = self.tasks.pop(guild.id, None)
+        if task is not None:
+            task.cancel()
+
+    async def _run(self, guild: Guild) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            while guild.id in self.pending:
+                pending = self.pending[guild.id]
+                while True:
+                    due = min(pending.last + self.debounce, pending.first + self.max_latency)
+                    delay = due - loop.time()
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                # Auslöser während der Aktualisierung werden für den nächsten Durchlauf gesammelt
+                self.pending.pop(guild.id, None)
+                self.stats.runs += 1
+                logger.debug(f"{guild.name} ({guild.id}) - Refreshing overviews for {pending.triggers} trigger(s) after {loop.time() - pending.first:.2f}s (data={pending.sync_data}, config={pending.sync_config}, discord={pending.sync_discord}).")
+                try:
+                    await self.manager.sync(guild=guild, sync_data=pending.sync_data, sync_config=pending.sync_config, sync_discord=pending.sync_discord)
+                    await self.manager.ensure(guild=guild)
+                except Exception as e:
+                    self.stats.failures += 1
+                    logger.exception(f"{guild.name} ({guild.id}) - Scheduled overview refresh failed: {e}")
+                logger.debug(f"Overview refresh scheduler: {self.stats.summary()}.")
+        finally:
+            if self.tasks.get(guild.id) is asyncio.current_task():
+                self.tasks.pop(guild.id, None)
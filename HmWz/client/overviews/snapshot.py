@@ -0,0 +1,91 @@
+"""
+Dieses Modul enthält den Snapshot für einen warmen Neustart der Übersichten.
+Beim geordneten Beenden schreibt der Manager einen kompakten Stand aller geladenen Übersichten in eine Datei,
+z.B. die IDs der Nachrichten, die Hashes der Seiten, die Reihenfolge des Rosters und die letzten Fingerabdrücke des Abgleichs.
+Beim nächsten Start wird der Snapshot optimistisch übernommen: Die Nachrichten werden nicht einzeln von Discord geholt,
+sondern erst im Hintergrund geprüft, nachdem die Gilde bereits Klicks annimmt.
+
+Ein Snapshot wird beim Laden verbraucht, damit nach einem Absturz kein veralteter Stand übernommen wird.
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from typing import Any, Dict
+
+from ...configuration import Snapshot
+
+__all__ = ["SnapshotStore"]
+
+logger = logging.getLogger(__name__)
+
+type GuildSnapshot = Dict[str, Dict[str, Any]]
+"""Typalias für den Snapshot einer Gilde: Übersichtstyp -> Zustand und Fingerabdruck."""
+
+class SnapshotStore:
+    """
+    Liest und schreibt den Snapshot der Übersichten.
+
+    :param folder: Der Ordner der Snapshot-Datei.
+    :type folder: str
+    :param filename: Der Name der Snapshot-Datei.
+    :type filename: str
+    :param max_age: Das maximale Alter eines Snapshots in Sekunden, ältere Snapshots werden verworfen.
+    :type max_age: float
+    """
+    VERSION : int = 1
+    """Die Version des Formats, Snapshots anderer Versionen werden verworfen."""
+
+    def __init__(self, folder: str = "data", filename: str = Snapshot.FILENAME.value, max_age: float = Snapshot.MAX_AGE.value):
+        self.file : str = os.path.join(folder, filename)
+        self.max_age : float = max_age
+
+    def save(self, guilds: Dict[int, GuildSnapshot]) -> int:
+        """
+        Schreibt den Snapshot. Die Datei wird zuerst unter einem temporären Namen geschrieben und dann ersetzt,
+        damit ein Abbruch während des Schreibens keinen halben Snapshot hinterlässt.
+
+        :param guilds: Die Snapshots pro Gilden-ID.
+        :type guilds: Dict[int, GuildSnapshot]
+        :return: Die Anzahl der gespeicherten Gilden.
+        :rtype: int
+        """
+        os.makedirs(os.path.dirname(self.file) or ".", exist_ok=True)
+        payload = {"version": self.VERSION, "written": time.time(), "guilds": {str(guild_id): state for guild_id, state in guilds.items()}}
+        temporary = f"{self.file}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(payload, file, separators=(",", ":"))
+        os.replace(temporary, self.file)
+        return len(guilds)
+
+    def load(self) -> Dict[int, GuildSnapshot]:
+        """
+        Liest und verbraucht den Snapshot. Fehlt die Datei, ist sie beschädigt, veraltet oder in einem anderen Format, wird ein leerer Snapshot zurückgegeben.
+
+        :return: Die Snapshots pro Gilden-ID.
+        :rtype: Dict[int, GuildSnapshot]
+        """
+        if not os.path.exists(self.file):
+            return {}
+        try:
+            with open(self.file, "r", encoding="utf-8") as file:
+                payload = json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read overview snapshot {self.file}: {e}")
+            payload = {}
+        finally:
+            try:
+                os.remove(self.file)
+            except OSError:
+                pass
+        if payload.get("version") != self.VERSION:
+            logger.info(f"Ignoring overview snapshot with version {payload.get('version')}.")
+            return {}
+        age = time.time() - float(payload.get("written", 0))
+        if age > self.max_age:
+            logger.info(f"Ignoring overview snapshot written {age:.0f}s ago.")
+            return {}
+        guilds = {int(guild_id): state for guild_id, state in (payload.get("guilds") or {}).items()}
+        logger.info(f"Loaded overview snapshot of {len(guilds)} guild(s) written {age:.0f}s ago.")
+        return guilds
@@ -0,0 +1,167 @@
+"""
+Dieses Modul enthält den Startup-Scheduler für die Übersichten.
+Statt alle Gilden gleichzeitig zu synchronisieren, arbeitet eine begrenzte Anzahl von Workern die Gilden nach Priorität ab,
+damit große Gilden kleine nicht aushungern und das REST-Budget nicht auf einmal verbraucht wird.
+Jede Gilde ist bereit, sobald ihre eigenen Übersichten synchronisiert sind. Klicks in einer noch wartenden Gilde ziehen diese vor.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, Optional
+
+from discord import Guild
+
+from ...configuration import Operations, Startup
+
+if TYPE_CHECKING:
+    from . import Manager
+
+__all__ = ["StartupScheduler", "StartupStats"]
+
+logger = logging.getLogger(__name__)
+
+@dataclass(slots=True)
+class StartupStats:
+    """
+    Fortschritt und Laufzeiten des Startups.
+
+    :param total: Die Anzahl der Gilden.
+    :type total: int
+    :param done: Die Anzahl der bereits initialisierten Gilden.
+    :type done: int
+    :param failed: Die Anzahl der Gilden, deren Initialisierung fehlgeschlagen ist.
+    :type failed: int
+    :param timings: Die Laufzeit der Initialisierung in Sekunden pro Gilden-ID.
+    :type timings: Dict[int, float]
+    """
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    timings: Dict[int, float] = field(default_factory=dict)
+
+    @property
+    def slowest(self) -> Optional[int]:
+        """Gibt die ID der Gilde mit der längsten Initialisierung zurück."""
+        return max(self.timings, key=self.timings.__getitem__) if self.timings else None
+
+class StartupScheduler:
+    """
+    Initialisiert die Übersichten aller Gilden mit begrenzter Parallelität in der Reihenfolge ihrer Priorität.
+
+    :param manager: Der Manager der Übersichten.
+    :type manager: Manager
+    :param concurrency: Die maximale Anzahl gleichzeitig initialisierter Gilden.
+    :type concurrency: int
+    :param progress_interval: Der Abstand in Sekunden zwischen zwei Fortschrittsmeldungen.
+    :type progress_interval: float
+    """
+    def __init__(self, manager: Manager, concurrency: int = Startup.CONCURRENCY.value, progress_interval: float = Startup.PROGRESS_INTERVAL.value):
+        self.manager : Manager = manager
+        self.concurrency : int = max(1, concurrency)
+        self.progress_interval : float = progress_interval
+        self.queue : Deque[Guild] = deque()
+        self.pending : Dict[int, asyncio.Event] = {}
+        self.stats : StartupStats = StartupStats()
+
+    def is_ready(self, guild_id: int) -> bool:
+        """
+        Gibt zurück, ob die Übersichten einer Gilde initialisiert sind oder nicht auf den Startup warten.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn die Gilde bereit ist, sonst False.
+        :rtype: bool
+        """
+        return guild_id not in self.pending
+
+    def promote(self, guild_id: int) -> None:
+        """
+        Zieht eine noch wartende Gilde an den Anfang der Warteschlange, z.B. wenn dort ein Mitglied einen Button klickt.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        for guild in self.queue:
+            if guild.id == guild_id:
+                self.queue.remove(guild)
+                self.queue.appendleft(guild)
+                logger.debug(f"{guild.name} ({guild.id}) - Promoted overview startup after user interaction.")
+                return
+
+    async def wait_ready(self, guild_id: int, timeout: float = Operations.TIMEOUT.value) -> bool:
+        """
+        Wartet, bis die Übersichten einer Gilde initialisiert sind. Die Gilde wird dabei vorgezogen.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :param timeout: Die maximale Wartezeit in Sekunden.
+        :type timeout: float
+        :return: True, wenn die Gilde bereit ist, False bei Zeitüberschreitung.
+        :rtype: bool
+        """
+        event = self.pending.get(guild_id)
+        if event is None:
+            return True
+        self.promote(guild_id)
+        try:
+            async with asyncio.timeout(timeout):
+                await event.wait()
+            return True
+        except TimeoutError:
+            return False
+
+    async def run(self, guilds: Iterable[Guild]) -> StartupStats:
+        """
+        Initialisiert die angegebenen Gilden in der übergebenen Reihenfolge.
+
+        :param guilds: Die Gilden, absteigend nach Priorität sortiert.
+        :type guilds: Iterable[discord.Guild]
+        :return: Der Fortschritt und die Laufzeiten des Startups.
+        :rtype: StartupStats
+        """
+        for guild in guilds:
+            if guild.id in self.pending:
+                continue
+            self.queue.append(guild)
+            self.pending[guild.id] = asyncio.Event()
+        self.stats = StartupStats(total=len(self.queue))
+        started = time.monotonic()
+        progress = asyncio.create_task(self._progress(started))
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(min(self.concurrency, len(self.queue)))))
+        finally:
+            progress.cancel()
+        slowest = self.stats.slowest
+        logger.info(
+            f"Overview startup complete: {self.stats.done}/{self.stats.total} guild(s), {self.stats.failed} failed, "
+            f"{time.monotonic() - started:.1f}s total"
+            + (f", slowest guild {slowest} with {self.stats.timings[slowest]:.1f}s." if slowest is not None else ".")
+        )
+        return self.stats
+
+    async def _worker(self) -> None:
+        while self.queue:
+            guild = self.queue.popleft()
+            started = time.monotonic()
+            try:
+                if not await self.manager.init_guild(guild):
+                    self.stats.failed += 1
+            except Exception as e:
+                self.stats.failed += 1
+                logger.exception(f"{guild.name} ({guild.id}) - Overview startup failed: {e}")
+            finally:
+                elapsed = time.monotonic() - started
+                self.stats.timings[guild.id] = elapsed
+                self.stats.done += 1
+                event = self.pending.pop(guild.id, None)
+                if event is not None:
+                    event.set()
+                logger.debug(f"{guild.name} ({guild.id}) - Overviews ready after {elapsed:.2f}s ({self.stats.done}/{self.stats.total}).")
+
+    async def _progress(self, started: float) -> None:
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            logger.info(f"Overview startup progress: {self.stats.done}/{self.stats.total} guild(s) after {time.monotonic() - started:.0f}s, {len(self.queue)} waiting.")
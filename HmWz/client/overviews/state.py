@@ -12,6 +12,7 @@ class State():
     sync_from_discord: bool = False
     sync_configuration: bool = False
     sync_data: bool = False
+    render: bool = False
 
     class SyncEvent(Enum):
         """Synchronisierungsereignisse für die Overview"""
@@ -19,6 +20,30 @@ class State():
         CHANGED_DISCORD = 0x200
         CHANGED_CONFIGURATION = 0x300
         CHANGED_REGISTRATIONS = 0x400
+        CHANGED_DISPLAY = 0x500
+
+    @property
+    def is_dirty(self) -> bool:
+        """Gibt zurück, ob mindestens ein Synchronisierungsereignis aussteht."""
+        return self.on_startup or self.sync_from_discord or self.sync_configuration or self.sync_data or self.render
+
+    def mark(self, *events: SyncEvent) -> None:
+        """
+        Markiert Synchronisierungsereignisse als eingetreten.
+        :param events: Die eingetretenen Synchronisierungsereignisse.
+        :type events: SyncEvent
+        """
+        for event in events:
+            if event == self.SyncEvent.STARTUP:
+                self.on_startup = True
+            elif event == self.SyncEvent.CHANGED_DISCORD:
+                self.sync_from_discord = True
+            elif event == self.SyncEvent.CHANGED_CONFIGURATION:
+                self.sync_configuration = True
+            elif event == self.SyncEvent.CHANGED_REGISTRATIONS:
+                self.sync_data = True
+            elif event == self.SyncEvent.CHANGED_DISPLAY:
+                self.render = True
     
     def check(self, event: SyncEvent) -> bool:
         """
@@ -41,6 +66,9 @@ class State():
         elif event == self.SyncEvent.CHANGED_REGISTRATIONS and self.sync_data:
             self.reset(self.SyncEvent.CHANGED_REGISTRATIONS)
             return True
+        elif event == self.SyncEvent.CHANGED_DISPLAY and self.render:
+            self.reset(self.SyncEvent.CHANGED_DISPLAY)
+            return True
         else:
             return False  
     
@@ -56,12 +84,15 @@ class State():
              self.sync_from_discord = False
              self.sync_configuration = False
              self.sync_data = False
+             self.render = False
         elif event == self.SyncEvent.CHANGED_DISCORD:
             self.sync_from_discord = False
         elif event == self.SyncEvent.CHANGED_CONFIGURATION:
             self.sync_configuration = False
         elif event == self.SyncEvent.CHANGED_REGISTRATIONS:
             self.sync_data = False
+        elif event == self.SyncEvent.CHANGED_DISPLAY:
+            self.render = False
 
     def clear(self):
         """
@@ -71,3 +102,4 @@ class State():
         self.sync_from_discord = False
         self.sync_configuration = False
         self.sync_data = False
+        self.render = False
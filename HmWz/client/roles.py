@@ -0,0 +1,224 @@
+"""
+Dieses Modul enthält den Koaleszierer für Rollenänderungen von Mitgliedern.
+Rollenänderungen werden pro Mitglied für ein kurzes Zeitfenster gesammelt und anschließend mit einem einzigen `member.edit(roles=...)` angewendet.
+Pro Mitglied läuft dabei immer höchstens eine Bearbeitung gleichzeitig, sodass sich zwei Bearbeitungen nicht gegenseitig überschreiben können.
+
+Jede Bearbeitung wird vorab im Journal vermerkt, damit das daraus folgende `on_member_update` als eigene Änderung erkannt wird,
+ohne das Audit-Log abzufragen.
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from ..retry import RetryPolicy, policy
+from ..types import Guild, Member, Role
+
+__all__ = ["RoleCoalescer", "CoalescerStats"]
+
+logger = logging.getLogger(__name__)
+
+type MemberKey = Tuple[int, int]
+"""Typalias für den Schlüssel eines Mitglieds, bestehend aus Gilden-ID und Mitglieder-ID."""
+
+@dataclass(slots=True)
+class PendingEdit:
+    """Repräsentiert die gesammelten, noch nicht angewendeten Rollenänderungen eines Mitglieds."""
+    add: Dict[int, Role] = field(default_factory=dict)
+    remove: Set[int] = field(default_factory=set)
+    reasons: List[str] = field(default_factory=list)
+    waiters: List[asyncio.Future] = field(default_factory=list)
+    member: Optional[Member] = None
+
+@dataclass(slots=True)
+class CoalescerStats:
+    """
+    Statistiken des Koaleszierers.
+
+    :param requests: Die Anzahl der angeforderten Rollenänderungen.
+    :type requests: int
+    :param edits: Die Anzahl der tatsächlich ausgeführten `member.edit`-Aufrufe.
+    :type edits: int
+    :param skipped: Die Anzahl der Bearbeitungen, die übersprungen wurden, weil sich die Rollen nicht geändert hätten.
+    :type skipped: int
+    :param failed: Die Anzahl der fehlgeschlagenen Bearbeitungen.
+    :type failed: int
+    """
+    requests: int = 0
+    edits: int = 0
+    skipped: int = 0
+    failed: int = 0
+
+    @property
+    def coalesced(self) -> int:
+        """Gibt die Anzahl der Anfragen zurück, die mit anderen zusammengefasst wurden."""
+        return max(0, self.requests - self.edits - self.skipped - self.failed)
+
+class RoleCoalescer:
+    """
+    Sammelt Rollenänderungen pro Mitglied und wendet sie gebündelt an.
+
+    :param window: Das Zeitfenster in Sekunden, in dem Änderungen gesammelt werden.
+    :type window: float
+    :param policy: Die Wiederholungsstrategie für die Discord-Aufrufe.
+    :type policy: RetryPolicy
+    """
+    WINDOW : float = 0.05
+    LEDGER_TTL : float = 30.0
+
+    def __init__(self, window: float = WINDOW, policy: RetryPolicy = policy):
+        self.window : float = window
+        self.policy : RetryPolicy = policy
+        self.pending : Dict[MemberKey, PendingEdit] = {}
+        self.locks : Dict[MemberKey, asyncio.Lock] = {}
+        self.latest : Dict[MemberKey, Member] = {}
+        self.ledger : Dict[MemberKey, Tuple[FrozenSet[int], float]] = {}
+        self.tasks : Set[asyncio.Task] = set()
+        self.stats : CoalescerStats = CoalescerStats()
+
+    async def update(self, member: Member, *, add: Iterable[Role] = (), remove: Iterable[Role] = (), reason: Optional[str] = None) -> bool:
+        """
+        Fordert eine Rollenänderung für ein Mitglied an und wartet, bis sie angewendet wurde.
+        Spätere Anfragen für dieselbe Rolle überschreiben frühere innerhalb desselben Zeitfensters.
+
+        :param member: Das Mitglied, dessen Rollen geändert werden sollen.
+        :type member: discord.Member
+        :param add: Die Rollen, die hinzugefügt werden sollen.
+        :type add: Iterable[discord.Role]
+        :param remove: Die Rollen, die entfernt werden sollen.
+        :type remove: Iterable[discord.Role]
+        :param reason: Der Grund für das Audit-Log.
+        :type reason: Optional[str]
+        :return: True, wenn die Änderung angewendet wurde oder nicht notwendig war, sonst False.
+        :rtype: bool
+        """
+        key = (member.guild.id, member.id)
+        pending = self.pending.get(key)
+        if pending is None:
+            pending = PendingEdit()
+            self.pending[key] = pending
+            # Referenz halten, da die Ereignisschleife nur schwache Referenzen auf Tasks speichert
+            task = asyncio.create_task(self._flush(member.guild, key))
+            self.tasks.add(task)
+            task.add_done_callback(functools.partial(self._finished, key, pending))
+        pending.member = member
+        for role in remove:
+            pending.remove.add(role.id)
+            pending.add.pop(role.id, None)
+        for role in add:
+            pending.add[role.id] = role
+            pending.remove.discard(role.id)
+        if reason and reason not in pending.reasons:
+            pending.reasons.append(reason)
+        self.stats.requests += 1
+        future = asyncio.get_running_loop().create_future()
+        pending.waiters.append(future)
+        return await future
+
+    def _finished(self, key: MemberKey, pending: PendingEdit, task: asyncio.Task) -> None:
+        """
+        Räumt nach dem Ende einer Bearbeitung auf.
+        Wurde die Bearbeitung abgebrochen, bevor sie gestartet ist, erhalten die Wartenden hier die Abbruch-Meldung.
+        """
+        self.tasks.discard(task)
+        if not task.cancelled():
+            return
+        if self.pending.get(key) is pending:
+            del self.pending[key]
+        for waiter in pending.waiters:
+            waiter.cancel()
+        if key not in self.pending:
+            self.locks.pop(key, None)
+            self.latest.pop(key, None)
+
+    async def _flush(self, guild: Guild, key: MemberKey) -> None:
+        """
+        Wendet die gesammelten Änderungen eines Mitglieds nach Ablauf des Zeitfensters an.
+        Anfragen, die während einer laufenden Bearbeitung eintreffen, werden für die nächste Bearbeitung gesammelt.
+        Die Wartenden erhalten immer ein Ergebnis: False bei einem unerwarteten Fehler, eine Abbruch-Meldung, wenn die Bearbeitung abgebrochen wurde.
+        """
+        pending : Optional[PendingEdit] = None
+        result = False
+        try:
+            await asyncio.sleep(self.window)
+            lock = self.locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                pending = self.pending.pop(key)
+                result = await self._apply(guild, key, pending)
+        except asyncio.CancelledError:
+            pending = pending or self.pending.pop(key, None)
+            for waiter in pending.waiters if pending else ():
+                waiter.cancel()
+            raise
+        except Exception as e:
+            self.stats.failed += 1
+            logger.exception(f"{guild.name} ({guild.id}) - Failed to flush role changes of member {key[1]}: {e}")
+            pending = pending or self.pending.pop(key, None)
+        finally:
+            for waiter in pending.waiters if pending else ():
+                if not waiter.done():
+                    waiter.set_result(result)
+            if key not in self.pending:
+                self.locks.pop(key, None)
+                self.latest.pop(key, None)
+
+    async def _apply(self, guild: Guild, key: MemberKey, pending: PendingEdit) -> bool:
+        member = self.latest.get(key) or guild.get_member(key[1]) or pending.member
+        current = member.roles[1:]
+        roles = [r for r in current if r.id not in pending.remove]
+        roles.extend(r for r in pending.add.values() if r not in roles)
+        if {r.id for r in roles} == {r.id for r in current}:
+            self.stats.skipped += 1
+            return True
+        # Vor dem Aufruf vermerken, da das Gateway-Ereignis vor der HTTP-Antwort eintreffen kann
+        self.ledger[key] = (frozenset(r.id for r in roles), time.monotonic() + self.LEDGER_TTL)
+        try:
+            edited = await self.policy.run(lambda: member.edit(roles=roles, reason=", ".join(pending.reasons) or None))
+            self.stats.edits += 1
+            if edited is not None:
+                self.latest[key] = edited
+            return True
+        except Exception as e:
+            self.ledger.pop(key, None)
+            self.stats.failed += 1
+            logger.warning(f"{guild.name} ({guild.id}) - Failed to update roles of member {key[1]}: {e}")
+            return False
+
+    def is_own(self, member: Member) -> bool:
+        """
+        Überprüft, ob die aktuellen Rollen eines Mitglieds das Ergebnis einer eigenen Bearbeitung sind.
+        Ein Treffer wird aus dem Journal entfernt, sodass nur das erste passende Ereignis als eigene Änderung gilt.
+
+        :param member: Das Mitglied nach der Aktualisierung.
+        :type member: discord.Member
+        :return: True, wenn der Bot die Rollen zuletzt selbst so gesetzt hat, sonst False.
+        :rtype: bool
+        """
+        key = (member.guild.id, member.id)
+        entry = self.ledger.get(key)
+        if entry is None:
+            return False
+        roles, expires = entry
+        if time.monotonic() > expires:
+            del self.ledger[key]
+            return False
+        if roles != frozenset(member._roles):
+            return False
+        del self.ledger[key]
+        return True
+
+    def prune_ledger(self) -> int:
+        """
+        Entfernt abgelaufene Einträge aus dem Journal, z.B. wenn das Gateway-Ereignis nie eingetroffen ist.
+
+        :return: Die Anzahl der entfernten Einträge.
+        :rtype: int
+        """
+        now = time.monotonic()
+        expired = [key for key, (_, expires) in self.ledger.items() if now > expires]
+        for key in expired:
+            del self.ledger[key]
+        return len(expired)
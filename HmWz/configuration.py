@@ -11,6 +11,69 @@ class WzRegistration(Enum):
     MAX_REGISTRATION_ROLES = 4
     MIN_REGISTRATION_ROLES = 1
 
+class Retry(Enum):
+    ATTEMPTS = 3
+    BASE_DELAY = 0.5
+    MAX_DELAY = 30.0
+    BUDGET = 20
+    BUDGET_REFILL = 0.2
+    BREAKER_THRESHOLD = 3
+    BREAKER_COOLDOWN = 900
+    BREAKER_MAX_COOLDOWN = 21600
+    BREAKER_PROBE_TIMEOUT = 120
+
+class Jobs(Enum):
+    CONCURRENCY = 4
+    MIN_CONCURRENCY = 1
+    MAX_CONCURRENCY = 10
+    CHECKPOINT = 25
+    PROGRESS_INTERVAL = 5.0
+    SLOW_CALL = 1.5
+    MAX_ATTEMPTS = 6
+    RETRY_DELAY = 60.0
+    MAX_RETRY_DELAY = 3600.0
+
+class Refresh(Enum):
+    DEBOUNCE = 1.5
+    MAX_LATENCY = 5.0
+
+class Operations(Enum):
+    TIMEOUT = 60.0
+    SLOW_WAIT = 1.0
+
+class Overviews(Enum):
+    IDLE_TTL = 1800.0
+    MAX_ACTIVE = 100
+    SWEEP_INTERVAL = 300.0
+
+class Reconcile(Enum):
+    TICK = 60.0
+    INTERVAL = 900.0
+    MIN_INTERVAL = 300.0
+    MAX_INTERVAL = 3600.0
+    ACK_DELAY = 2.0
+
+class Repair(Enum):
+    BASE_DELAY = 60.0
+    MAX_DELAY = 3600.0
+    MAX_ATTEMPTS = 12
+    NOT_READY_DELAY = 30.0
+
+class Snapshot(Enum):
+    FILENAME = "snapshot.json"
+    MAX_AGE = 21600.0
+
+class CommandSync(Enum):
+    CONCURRENCY = 4
+
+class Startup(Enum):
+    CONCURRENCY = 3
+    PROGRESS_INTERVAL = 10.0
+
+class Chunking(Enum):
+    CONCURRENCY = 2
+    TIMEOUT = 300
+
 class Bot(Enum):
     pass
 
@@ -4,6 +4,7 @@ Modul für Events, die in HsBot verwendet werden.
 
 from discord import (
     RawMessageDeleteEvent,
+    RawBulkMessageDeleteEvent,
     RawMessageUpdateEvent,
     RawMemberRemoveEvent,
     RawThreadDeleteEvent,
@@ -14,4 +14,18 @@ from discord import (
     PrivilegedIntentsRequired, 
     DiscordServerError,
     InteractionResponded
-)
\ No newline at end of file
+)
+
+class CircuitOpen(DiscordException):
+    """
+    Wird ausgelöst, wenn der Circuit-Breaker einer Gilde geöffnet ist und Discord-Aufrufe für diese Gilde pausiert sind.
+
+    :param guild_id: Die ID der Gilde, deren Circuit-Breaker geöffnet ist.
+    :type guild_id: int
+    :param retry_after: Die verbleibende Zeit in Sekunden, bis der Circuit-Breaker wieder halb geöffnet wird.
+    :type retry_after: float
+    """
+    def __init__(self, guild_id: int, retry_after: float):
+        self.guild_id = guild_id
+        self.retry_after = retry_after
+        super().__init__(f"Circuit open for guild {guild_id}, retry after {retry_after:.0f}s.")
@@ -18,6 +18,8 @@ CommandLocalizations: Dict[str, Dict[str, str]] = {
         "wz.registration.group.description": "Befehle für die WZ-Registrierung",
         "wz.registration.csv.description": "Gibt die Registrierungen als CSV-Datei aus",
         "wz.registration.reset.description": "Entfernt nicht permanente Registrierungen.",
+        "wz.registration.plan.description": "Zeigt den Abgleich von Datenbank, Rollen und Nachrichten an und führt ihn optional aus",
+        "wz.registration.plan.apply.description": "True, um den Plan auszuführen (optional, Standard: false)",
         # Wz Setup 
         "wz.setup.group.description": "Setup-Befehle für die WZ-Registrierung",
     
@@ -45,6 +47,8 @@ CommandLocalizations: Dict[str, Dict[str, str]] = {
         "wz.registration.group.description": "Commands for WZ registration",
         "wz.registration.csv.description": "Export registrations as CSV",
         "wz.registration.reset.description": "Remove non-permanent registrations.",
+        "wz.registration.plan.description": "Show the reconciliation of database, roles and messages and optionally apply it",
+        "wz.registration.plan.apply.description": "True to apply the plan (optional, default: false)",
         # Wz Setup
         "wz.setup.group.description": "Setup commands for WZ registration",
                 
@@ -93,6 +97,14 @@ RuntimeMessages: Dict[str, Dict[str, str]] = {
         # Wz Registration Reset
         "wz.registration.reset.success": f"{Emojis.SUCCESS.value} Alle nicht permanenten Registrierungen wurden zurückgesetzt.",
         "wz.registration.reset.error": f"{Emojis.ERROR.value} Beim Zurücksetzen der Registrierungen ist ein Fehler aufgetreten.",
+        "wz.registration.reset.progress": f"{Emojis.REREGISTER.value} Rollen werden entfernt: {{done}}/{{total}}",
+        "wz.registration.reset.started": f"{Emojis.REREGISTER.value} Die Rollen werden im Hintergrund entfernt. Das Ergebnis wird in diesem Kanal gemeldet.",
+        "wz.registration.reset.failed": f"{Emojis.ERROR.value} Das Zurücksetzen der Registrierungen ist unvollständig: {{failed}} Rollen konnten nicht entfernt werden. Die Registrierungen bleiben bestehen.",
+        # Wz Registration Plan
+        "wz.registration.plan.dry_run": f"{Emojis.SUCCESS.value} Geplante Änderungen (nicht ausgeführt): {{summary}}\n```\n{{steps}}\n```",
+        "wz.registration.plan.no_changes": f"{Emojis.SUCCESS.value} Datenbank, Rollen und Nachrichten sind bereits abgeglichen.",
+        "wz.registration.plan.applied": f"{Emojis.SUCCESS.value} Der Plan wurde ausgeführt: {{summary}}",
+        "wz.registration.plan.error": f"{Emojis.ERROR.value} Beim Abgleich der Registrierung ist ein Fehler aufgetreten.",
         # Wz Setup Configure
         "wz.setup.configure.success": f"{Emojis.SUCCESS.value} WZ-Registrierung wurde erfolgreich eingerichtet. \nChannel: {{channel_name}}",
         "wz.setup.configure.error": f"{Emojis.ERROR.value} Fehler beim Einrichten der WZ-Registrierung.",
@@ -108,6 +120,9 @@ RuntimeMessages: Dict[str, Dict[str, str]] = {
         "wz.setup.roles.remove.unknown_role": f"{Emojis.WARNING.value} Unbekannte Rolle. Bitte wähle eine Rolle aus der Autovervollständigung aus.",
         "wz.setup.roles.remove.min_roles": f"{Emojis.WARNING.value} Es muss mindestens eine Rolle für die WZ-Registrierung festgelegt sein.",
         "wz.setup.roles.remove.success": f"{Emojis.SUCCESS.value} Rolle {{role_name}} wurde aus der WZ-Registrierung entfernt.",
+        "wz.setup.roles.remove.progress": f"{Emojis.REREGISTER.value} Rolle {{role_name}} wird entfernt: {{done}}/{{total}}",
+        "wz.setup.roles.remove.started": f"{Emojis.REREGISTER.value} Die Rolle {{role_name}} wird im Hintergrund entfernt. Das Ergebnis wird in diesem Kanal gemeldet.",
+        "wz.setup.roles.remove.failed": f"{Emojis.ERROR.value} Die Rolle {{role_name}} konnte {{failed}} Mitgliedern nicht abgenommen werden. Sie bleibt Teil der WZ-Registrierung.",
         "wz.setup.roles.remove.unexpected": f"{Emojis.ERROR.value} Unerwarteter Fehler beim Entfernen der Rolle aus der WZ-Registrierung.",
 
         # Wz Setup Message
@@ -146,6 +161,14 @@ RuntimeMessages: Dict[str, Dict[str, str]] = {
         # Wz Registration Reset
         "wz.registration.reset.success": f"{Emojis.SUCCESS.value} All non-permanent registrations have been reset.",
         "wz.registration.reset.error": f"{Emojis.ERROR.value} An error occurred while resetting the registrations.",
+        "wz.registration.reset.progress": f"{Emojis.REREGISTER.value} Removing roles: {{done}}/{{total}}",
+        "wz.registration.reset.started": f"{Emojis.REREGISTER.value} The roles are being removed in the background. The result will be reported in this channel.",
+        "wz.registration.reset.failed": f"{Emojis.ERROR.value} Resetting the registrations is incomplete: {{failed}} roles could not be removed. The registrations are kept.",
+        # Wz Registration Plan
+        "wz.registration.plan.dry_run": f"{Emojis.SUCCESS.value} Planned changes (not applied): {{summary}}\n```\n{{steps}}\n```",
+        "wz.registration.plan.no_changes": f"{Emojis.SUCCESS.value} Database, roles and messages are already in sync.",
+        "wz.registration.plan.applied": f"{Emojis.SUCCESS.value} The plan has been applied: {{summary}}",
+        "wz.registration.plan.error": f"{Emojis.ERROR.value} An error occurred while reconciling the registration.",
        # Wz Setup Configure
         "wz.setup.configure.success": f"{Emojis.SUCCESS.value} WZ registration has been configured successfully.\nChannel: {{channel_name}}",
         "wz.setup.configure.error": f"{Emojis.ERROR.value} An error occurred while configuring the WZ registration.",
@@ -161,6 +184,9 @@ RuntimeMessages: Dict[str, Dict[str, str]] = {
         "wz.setup.roles.remove.unknown_role": f"{Emojis.WARNING.value} Unknown role. Please choose a role from the autocomplete.",
         "wz.setup.roles.remove.min_roles": f"{Emojis.WARNING.value} At least one role must be set for WZ registration.",
         "wz.setup.roles.remove.success": f"{Emojis.SUCCESS.value} Role {{role_name}} has been removed from the WZ registration.",
+        "wz.setup.roles.remove.progress": f"{Emojis.REREGISTER.value} Removing role {{role_name}}: {{done}}/{{total}}",
+        "wz.setup.roles.remove.started": f"{Emojis.REREGISTER.value} Role {{role_name}} is being removed in the background. The result will be reported in this channel.",
+        "wz.setup.roles.remove.failed": f"{Emojis.ERROR.value} Role {{role_name}} could not be removed from {{failed}} members. It remains part of the WZ registration.",
         "wz.setup.roles.remove.unexpected": f"{Emojis.ERROR.value} An unexpected error occurred while removing the role from the WZ registration.",  
         
         # Wz Setup Message
@@ -194,6 +220,9 @@ def get_user_language(interaction, default: str = "de") -> str:
         locale = str(getattr(interaction, "locale", "") or "")
         if not locale:
             locale = str(getattr(interaction, "guild_locale", "") or "")
+        if not locale:
+            # Für Meldungen ohne Interaktion, z.B. das Ergebnis eines Rollen-Jobs im Kanal, wird die Sprache der Gilde verwendet
+            locale = str(getattr(interaction, "preferred_locale", "") or "")
         language = locale.split("-")[0].lower() if locale else default
         return language if language in {"de", "en"} else default
     except Exception as e:
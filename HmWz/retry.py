@@ -0,0 +1,259 @@
+"""
+Das Modul "retry" enthält die einheitliche Wiederholungsstrategie für Discord-Aufrufe.
+Es bündelt exponentielles Backoff mit Jitter, ein globales Wiederholungsbudget und einen Circuit-Breaker pro Gilde,
+der nach wiederholten Forbidden- oder NotFound-Fehlern im konfigurierten Kanal die Hintergrundarbeit dieser Gilde pausiert.
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+from .configuration import Retry
+from .exception import Forbidden, NotFound, HTTPException, RateLimited, CircuitOpen
+
+__all__ = ["RetryBudget", "CircuitBreaker", "RetryPolicy", "policy"]
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class RetryBudget:
+    """
+    Token-Bucket, der die Anzahl der Wiederholungen über alle Aufrufe hinweg begrenzt.
+    Jede Wiederholung verbraucht ein Token, Tokens werden mit einer festen Rate wieder aufgefüllt.
+
+    :param capacity: Die maximale Anzahl an Tokens im Budget.
+    :type capacity: int
+    :param refill: Die Anzahl an Tokens, die pro Sekunde wieder aufgefüllt werden.
+    :type refill: float
+    """
+    def __init__(self, capacity: int = Retry.BUDGET.value, refill: float = Retry.BUDGET_REFILL.value):
+        self.capacity : int = capacity
+        self.refill : float = refill
+        self.tokens : float = float(capacity)
+        self.updated : float = time.monotonic()
+        self.exhausted : int = 0
+
+    def acquire(self) -> bool:
+        """
+        Versucht, ein Token für eine Wiederholung zu verbrauchen.
+
+        :return: True, wenn eine Wiederholung erlaubt ist, sonst False.
+        :rtype: bool
+        """
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill)
+        self.updated = now
+        if self.tokens < 1:
+            self.exhausted += 1
+            return False
+        self.tokens -= 1
+        return True
+
+@dataclass(slots=True)
+class BreakerState:
+    """Repräsentiert den Zustand des Circuit-Breakers einer Gilde."""
+    failures: int = 0
+    trips: int = 0
+    opened_at: Optional[float] = None
+    probe_at: Optional[float] = None
+
+class CircuitBreaker:
+    """
+    Circuit-Breaker pro Gilde. Nach `threshold` aufeinanderfolgenden Forbidden- oder NotFound-Fehlern wird der Breaker geöffnet
+    und bleibt für eine mit jeder Auslösung wachsende Abkühlzeit offen. Danach lässt `allow()` einen einzelnen Probeaufruf durch (halb offen),
+    alle weiteren Aufrufer gelten bis zu dessen Ergebnis weiterhin als blockiert. Ein Erfolg schließt den Breaker, ein erneuter Fehler öffnet ihn sofort wieder.
+    Meldet der Probeaufruf innerhalb von `probe_timeout` kein Ergebnis, z.B. nach einem Serverfehler, wird ein neuer Probeaufruf erlaubt.
+
+    :param threshold: Die Anzahl aufeinanderfolgender Fehler, nach der der Breaker geöffnet wird.
+    :type threshold: int
+    :param cooldown: Die Abkühlzeit in Sekunden nach der ersten Auslösung.
+    :type cooldown: float
+    :param max_cooldown: Die maximale Abkühlzeit in Sekunden.
+    :type max_cooldown: float
+    :param probe_timeout: Die Zeit in Sekunden, nach der ein Probeaufruf ohne Ergebnis verfällt.
+    :type probe_timeout: float
+    """
+    def __init__(self, threshold: int = Retry.BREAKER_THRESHOLD.value, cooldown: float = Retry.BREAKER_COOLDOWN.value, max_cooldown: float = Retry.BREAKER_MAX_COOLDOWN.value, probe_timeout: float = Retry.BREAKER_PROBE_TIMEOUT.value):
+        self.threshold : int = threshold
+        self.cooldown : float = cooldown
+        self.max_cooldown : float = max_cooldown
+        self.probe_timeout : float = probe_timeout
+        self.states : Dict[int, BreakerState] = {}
+
+    def _cooldown(self, state: BreakerState) -> float:
+        return min(self.max_cooldown, self.cooldown * (2 ** max(0, state.trips - 1)))
+
+    def retry_after(self, guild_id: int) -> float:
+        """
+        Gibt die verbleibende Zeit zurück, bis der Breaker der Gilde wieder einen Probeaufruf erlaubt.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: Die verbleibende Zeit in Sekunden, 0 wenn der Breaker geschlossen oder halb offen ohne laufenden Probeaufruf ist.
+        :rtype: float
+        """
+        state = self.states.get(guild_id)
+        if state is None or state.opened_at is None:
+            return 0.0
+        now = time.monotonic()
+        remaining = state.opened_at + self._cooldown(state) - now
+        if remaining <= 0 and state.probe_at is not None:
+            remaining = state.probe_at + self.probe_timeout - now
+        return max(0.0, remaining)
+
+    def is_open(self, guild_id: int) -> bool:
+        """
+        Überprüft, ob der Breaker der Gilde geöffnet ist, ohne einen Probeaufruf zu beanspruchen.
+        Für Aufrufer, die nur entscheiden, ob sie Arbeit einplanen; der eigentliche Discord-Aufruf muss über `allow()` laufen.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn Aufrufe für die Gilde pausiert sind oder bereits ein Probeaufruf läuft, sonst False.
+        :rtype: bool
+        """
+        return self.retry_after(guild_id) > 0
+
+    def allow(self, guild_id: int) -> bool:
+        """
+        Überprüft, ob ein Aufruf für die Gilde erfolgen darf. Im halb offenen Zustand beansprucht der erste Aufrufer den einzigen Probeaufruf.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :return: True, wenn der Aufruf erfolgen darf, sonst False.
+        :rtype: bool
+        """
+        if self.retry_after(guild_id) > 0:
+            return False
+        state = self.states.get(guild_id)
+        if state is not None and state.opened_at is not None:
+            state.probe_at = time.monotonic()
+            logger.info(f"Circuit half-open for guild {guild_id}, allowing a single probe.")
+        return True
+
+    def record_failure(self, guild_id: int) -> None:
+        """
+        Registriert einen Forbidden- oder NotFound-Fehler für die Gilde und öffnet den Breaker, wenn der Schwellenwert erreicht ist.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        state = self.states.setdefault(guild_id, BreakerState())
+        state.failures += 1
+        if state.opened_at is not None or state.failures >= self.threshold:
+            state.trips += 1
+            state.failures = 0
+            state.opened_at = time.monotonic()
+            state.probe_at = None
+            logger.warning(f"Circuit opened for guild {guild_id} for {self._cooldown(state):.0f}s (trip {state.trips}).")
+
+    def record_success(self, guild_id: int) -> None:
+        """
+        Registriert einen erfolgreichen Aufruf für die Gilde und schließt den Breaker.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        state = self.states.pop(guild_id, None)
+        if state is not None and state.opened_at is not None:
+            logger.info(f"Circuit closed for guild {guild_id}.")
+
+    def reset(self, guild_id: int) -> None:
+        """
+        Setzt den Breaker der Gilde zurück, z.B. nachdem die Konfiguration geändert wurde.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        """
+        self.states.pop(guild_id, None)
+
+class RetryPolicy:
+    """
+    Einheitliche Wiederholungsstrategie für Discord-Aufrufe.
+
+    - RateLimited: Es wird die von Discord vorgegebene Zeit gewartet.
+    - HTTPException mit Status >= 500: Exponentielles Backoff mit vollem Jitter.
+    - Forbidden, NotFound und andere 4xx-Fehler: Keine Wiederholung, bei `guild_id` wird der Circuit-Breaker informiert.
+
+    Jede Wiederholung verbraucht ein Token aus dem gemeinsamen Budget. Ist das Budget erschöpft, wird der letzte Fehler ausgelöst.
+
+    :param attempts: Die maximale Anzahl an Versuchen pro Aufruf.
+    :type attempts: int
+    :param base_delay: Die Basisverzögerung in Sekunden für das Backoff.
+    :type base_delay: float
+    :param max_delay: Die maximale Verzögerung in Sekunden für das Backoff.
+    :type max_delay: float
+    """
+    def __init__(self, attempts: int = Retry.ATTEMPTS.value, base_delay: float = Retry.BASE_DELAY.value, max_delay: float = Retry.MAX_DELAY.value, budget: Optional[RetryBudget] = None, breaker: Optional[CircuitBreaker] = None):
+        self.attempts : int = attempts
+        self.base_delay : float = base_delay
+        self.max_delay : float = max_delay
+        self.budget : RetryBudget = budget or RetryBudget()
+        self.breaker : CircuitBreaker = breaker or CircuitBreaker()
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Berechnet die Verzögerung für einen Versuch mit exponentiellem Backoff und vollem Jitter.
+
+        :param attempt: Der nullbasierte Index des fehlgeschlagenen Versuchs.
+        :type attempt: int
+        :return: Die Verzögerung in Sekunden.
+        :rtype: float
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def check(self, guild_id: int) -> None:
+        """
+        Löst CircuitOpen aus, wenn der Breaker der Gilde geöffnet ist. Im halb offenen Zustand wird dabei der Probeaufruf beansprucht.
+
+        :param guild_id: Die ID der Gilde.
+        :type guild_id: int
+        :raise: CircuitOpen: Wenn der Breaker der Gilde geöffnet ist.
+        """
+        if not self.breaker.allow(guild_id):
+            raise CircuitOpen(guild_id, self.breaker.retry_after(guild_id))
+
+    async def run(self, call: Callable[[], Awaitable[T]], *, guild_id: Optional[int] = None, attempts: Optional[int] = None) -> T:
+        """
+        Führt einen Discord-Aufruf mit der Wiederholungsstrategie aus.
+
+        :param call: Eine Funktion ohne Argumente, die bei jedem Versuch eine neue Coroutine liefert.
+        :type call: Callable[[], Awaitable[T]]
+        :param guild_id: Die ID der Gilde, deren Circuit-Breaker geprüft und aktualisiert werden soll. Ohne ID wird der Breaker nicht verwendet.
+        :type guild_id: Optional[int]
+        :param attempts: Die maximale Anzahl an Versuchen. Standard ist `self.attempts`.
+        :type attempts: Optional[int]
+        :return: Das Ergebnis des Aufrufs.
+        :rtype: T
+        :raise: CircuitOpen: Wenn der Breaker der Gilde geöffnet ist.
+        :raise: HTTPException: Wenn der Aufruf endgültig fehlschlägt.
+        """
+        if guild_id is not None:
+            self.check(guild_id)
+        attempts = attempts or self.attempts
+        for attempt in range(attempts):
+            try:
+                result = await call()
+                if guild_id is not None:
+                    self.breaker.record_success(guild_id)
+                return result
+            except RateLimited as e:
+                if attempt + 1 >= attempts or not self.budget.acquire():
+                    raise
+                delay = e.retry_after
+            except (Forbidden, NotFound):
+                if guild_id is not None:
+                    self.breaker.record_failure(guild_id)
+                raise
+            except HTTPException as e:
+                if e.status < 500 or attempt + 1 >= attempts or not self.budget.acquire():
+                    raise
+                delay = self.backoff(attempt)
+            logger.debug(f"Retrying discord call in {delay:.2f}s (attempt {attempt + 1}/{attempts}).")
+            await asyncio.sleep(delay)
+
+policy : RetryPolicy = RetryPolicy()
+"""Gemeinsame Wiederholungsstrategie für alle Discord-Aufrufe des Bots."""
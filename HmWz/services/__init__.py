@@ -3,6 +3,8 @@ from discord import Guild
 from .database import Database
 from .servers import Servers
 from .wz import Wz
+from .jobs import Jobs
+from .commands import Commands
 
 class Services:
     def __init__(self, *, folder: str = "data", filename: str = "data.db") -> None:
@@ -10,11 +12,14 @@ class Services:
         self.database = Database(folder=folder, filename=filename)
         self.servers = Servers(self.database)
         self.wz = Wz(self.database)
+        self.jobs = Jobs(self.database)
+        self.commands = Commands(self.database)
 
     async def remove_guild_data(self, *, guild: Guild) -> bool:
         try:
             await self.servers.remove(guild=guild)
             await self.wz.remove_guild_data(guild=guild)
+            await self.commands.remove(scope=guild.id)
             return True
         except Exception as e:
             self.logger.exception(f"{guild.name} ({guild.id}) - Failed to remove guild data: {e}")
@@ -24,11 +29,18 @@ class Services:
         queries = []
         queries.append(self.servers.table)
         queries.extend(self.wz.tables)
+        queries.extend(self.jobs.tables)
+        queries.append(self.commands.table)
         self.logger.info("Setting up database tables...") 
         for query in queries:
             try:
                 await self.database.execute(query)
             except Exception as e:
                 self.logger.exception(f"Failed to create table: {e}")
+        try:
+            await self.wz.migrate()
+            await self.jobs.migrate()
+        except Exception as e:
+            self.logger.exception(f"Failed to migrate tables: {e}")
         self.logger.info("Database setup complete.")
         
\ No newline at end of file
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import logging
+from .base import Base
+from .database import Database
+
+from ..types import dataclass, Optional
+
+class Commands(Base):
+    """
+    Service für die Fingerabdrücke der synchronisierten Befehle.
+    Pro Bereich (global oder eine Gilde) wird der Hash der zuletzt an Discord übertragenen Befehle gespeichert,
+    damit unveränderte Bereiche beim Start nicht erneut synchronisiert werden müssen.
+    """
+    GLOBAL : int = 0
+    """Der Bereich der globalen Befehle."""
+
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.logger = logging.getLogger(__name__)
+
+    @dataclass(frozen=True)
+    class TableCols:
+        Scope: str = "Scope"
+        Hash: str = "Hash"
+        Synced: str = "Synced"
+
+    @property
+    def table(self) -> str:
+        """
+        Gibt die SQL-Abfrage zurück, um die Tabelle für die Fingerabdrücke der Befehle zu erstellen.
+
+        :return: SQL-Abfrage zum Erstellen der Tabelle.
+        :rtype: str
+        """
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            {self.TableCols.Scope} INTEGER PRIMARY KEY,
+            {self.TableCols.Hash} TEXT NOT NULL,
+            {self.TableCols.Synced} TEXT DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+        """
+
+    async def get(self, *, scope: int) -> Optional[str]:
+        """
+        Gibt den Fingerabdruck der zuletzt synchronisierten Befehle eines Bereichs zurück.
+
+        :param scope: Die ID der Gilde oder `Commands.GLOBAL`.
+        :type scope: int
+        :return: Der Fingerabdruck oder None, wenn der Bereich noch nicht synchronisiert wurde.
+        :rtype: Optional[str]
+        """
+        try:
+            query = f"SELECT {self.TableCols.Hash} FROM {self.table_name} WHERE {self.TableCols.Scope} = ?"
+            row = await self.database.fetch_one(query, (scope,))
+            return row[self.TableCols.Hash] if row else None
+        except Exception as e:
+            self.logger.exception(f"Failed to get command fingerprint for scope {scope}: {e}")
+            return None
+
+    async def set(self, *, scope: int, hash: str) -> bool:
+        """
+        Speichert den Fingerabdruck der synchronisierten Befehle eines Bereichs.
+
+        :param scope: Die ID der Gilde oder `Commands.GLOBAL`.
+        :type scope: int
+        :param hash: Der Fingerabdruck der Befehle.
+        :type hash: str
+        :return: True, wenn der Fingerabdruck gespeichert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"""
+                INSERT INTO {self.table_name} ({self.TableCols.Scope}, {self.TableCols.Hash}, {self.TableCols.Synced})
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT({self.TableCols.Scope}) DO UPDATE SET {self.TableCols.Hash} = excluded.{self.TableCols.Hash}, {self.TableCols.Synced} = excluded.{self.TableCols.Synced}
+            """
+            return await self.database.execute(query, (scope, hash))
+        except Exception as e:
+            self.logger.exception(f"Failed to store command fingerprint for scope {scope}: {e}")
+            return False
+
+    async def remove(self, *, scope: int) -> bool:
+        """
+        Entfernt den Fingerabdruck eines Bereichs, z.B. wenn der Bot eine Gilde verlässt.
+
+        :param scope: Die ID der Gilde oder `Commands.GLOBAL`.
+        :type scope: int
+        :return: True, wenn die Entfernung erfolgreich war, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"DELETE FROM {self.table_name} WHERE {self.TableCols.Scope} = ?"
+            return await self.database.execute(query, (scope,))
+        except Exception as e:
+            self.logger.exception(f"Failed to remove command fingerprint for scope {scope}: {e}")
+            return False
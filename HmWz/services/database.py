@@ -4,7 +4,9 @@ import os
 import logging
 import aiosqlite
 from contextlib import asynccontextmanager
-from typing import Tuple, Optional
+from typing import Awaitable, Callable, Iterable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
 
 class Database:
     _busy_timeout_ms = 5000
@@ -52,35 +54,125 @@ class Database:
             if database:
                 await database.close()
 
-    async def execute(self, query: str, params: Tuple = ()) -> bool:
+    async def _write(self, operation: Callable[[aiosqlite.Connection], Awaitable[T]]) -> Optional[T]:
         """
-        Führt eine SQL-Abfrage aus, die keine Ergebnisse zurückgibt (z.B. INSERT, UPDATE, DELETE).
-        
-        :param query: Die SQL-Abfrage, die ausgeführt werden soll.
-        :type query: str
-        :param params: Die Parameter für die SQL-Abfrage. Standardmäßig ein leeres Tupel.
-        :type params: Tuple
-        :return: True, wenn die Abfrage erfolgreich ausgeführt wurde, False andernfalls.
-        :rtype: bool
-        :raises Exception: Wenn ein Fehler bei der Ausführung der Abfrage auftritt, wird die Ausnahme protokolliert und erneut ausgelöst.
+        Führt eine schreibende Operation in einer eigenen Transaktion aus und wiederholt sie, wenn die Datenbank gesperrt ist.
+
+        :param operation: Eine Funktion, die mit der Verbindung aufgerufen wird und die Schreiboperation ausführt.
+        :type operation: Callable[[aiosqlite.Connection], Awaitable[T]]
+        :return: Das Ergebnis der Operation oder None, wenn die Operation fehlgeschlagen ist.
+        :rtype: Optional[T]
         """
         async with self._write_lock:
             for attempt in range(self._write_retry_attempts+1):
                 try:
                     async with self.connect() as connection:
-                        await connection.execute(query, params)
+                        result = await operation(connection)
                         await connection.commit()
-                        return True
+                        return result
                 except aiosqlite.OperationalError as e:
                     msg = str(e).lower()
                     is_locked = "database is locked" in msg or "database is busy" in msg
                     if not is_locked or attempt == self._write_retry_attempts:
                         self.logger.exception(f"Database write error: {e}")
-                        return False
+                        return None
                     delay = self._write_retry_delay * (2 ** attempt)
                     self.logger.warning(f"Database is locked, retrying in {delay:.2f} seconds (attempt {attempt+1}/{self._write_retry_attempts})")
                     await asyncio.sleep(delay)
 
+    async def execute(self, query: str, params: Tuple = ()) -> bool:
+        """
+        Führt eine SQL-Abfrage aus, die keine Ergebnisse zurückgibt (z.B. INSERT, UPDATE, DELETE).
+        
+        :param query: Die SQL-Abfrage, die ausgeführt werden soll.
+        :type query: str
+        :param params: Die Parameter für die SQL-Abfrage. Standardmäßig ein leeres Tupel.
+        :type params: Tuple
+        :return: True, wenn die Abfrage erfolgreich ausgeführt wurde, False andernfalls.
+        :rtype: bool
+        :raises Exception: Wenn ein Fehler bei der Ausführung der Abfrage auftritt, wird die Ausnahme protokolliert und erneut ausgelöst.
+        """
+        async def operation(connection: aiosqlite.Connection) -> bool:
+            await connection.execute(query, params)
+            return True
+        return bool(await self._write(operation))
+
+    async def execute_many(self, query: str, params: Iterable[Tuple]) -> bool:
+        """
+        Führt eine SQL-Abfrage für mehrere Parametersätze in einer einzigen Transaktion aus.
+
+        :param query: Die SQL-Abfrage, die ausgeführt werden soll.
+        :type query: str
+        :param params: Die Parametersätze für die SQL-Abfrage.
+        :type params: Iterable[Tuple]
+        :return: True, wenn alle Parametersätze erfolgreich ausgeführt wurden, False andernfalls.
+        :rtype: bool
+        """
+        params = list(params)
+        if not params:
+            return True
+        async def operation(connection: aiosqlite.Connection) -> bool:
+            await connection.executemany(query, params)
+            return True
+        return bool(await self._write(operation))
+
+    async def execute_batch(self, statements: Iterable[Tuple[str, Iterable[Tuple]]]) -> bool:
+        """
+        Führt mehrere SQL-Abfragen mit jeweils mehreren Parametersätzen in einer einzigen Transaktion aus.
+        Abfragen ohne Parametersätze werden übersprungen.
+
+        :param statements: Paare aus SQL-Abfrage und den zugehörigen Parametersätzen.
+        :type statements: Iterable[Tuple[str, Iterable[Tuple]]]
+        :return: True, wenn alle Abfragen erfolgreich ausgeführt wurden, False andernfalls.
+        :rtype: bool
+        """
+        statements = [(query, list(params)) for query, params in statements]
+        statements = [(query, params) for query, params in statements if params]
+        if not statements:
+            return True
+        async def operation(connection: aiosqlite.Connection) -> bool:
+            for query, params in statements:
+                await connection.executemany(query, params)
+            return True
+        return bool(await self._write(operation))
+
+    async def insert(self, query: str, params: Tuple = ()) -> Optional[int]:
+        """
+        Führt eine INSERT-Abfrage aus und gibt die ID der eingefügten Zeile zurück.
+
+        :param query: Die SQL-Abfrage, die ausgeführt werden soll.
+        :type query: str
+        :param params: Die Parameter für die SQL-Abfrage. Standardmäßig ein leeres Tupel.
+        :type params: Tuple
+        :return: Die ID der eingefügten Zeile oder None, wenn die Abfrage fehlgeschlagen ist.
+        :rtype: Optional[int]
+        """
+        async def operation(connection: aiosqlite.Connection) -> Optional[int]:
+            async with connection.execute(query, params) as cursor:
+                return cursor.lastrowid
+        return await self._write(operation)
+
+    async def ensure_column(self, table: str, column: str, definition: str) -> bool:
+        """
+        Fügt einer bestehenden Tabelle eine Spalte hinzu, falls sie noch nicht existiert.
+        Wird für Migrationen verwendet, da `CREATE TABLE IF NOT EXISTS` bestehende Tabellen nicht verändert.
+
+        :param table: Der Name der Tabelle.
+        :type table: str
+        :param column: Der Name der Spalte.
+        :type column: str
+        :param definition: Die SQL-Definition der Spalte, z.B. "TEXT".
+        :type definition: str
+        :return: True, wenn die Spalte hinzugefügt wurde, False, wenn sie bereits existierte.
+        :rtype: bool
+        """
+        columns = await self.fetch_all(f"PRAGMA table_info({table})")
+        if any(col["name"] == column for col in columns):
+            return False
+        await self.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self.logger.info(f"Added column {column} to table {table}.")
+        return True
+
     async def fetch_all(self, query: str, params: Tuple = ()) -> Tuple[aiosqlite.Row, ...]:
         """
         Führt eine SQL-Abfrage aus, die mehrere Ergebnisse zurückgibt (z.B. SELECT) und gibt diese als Tupel von aiosqlite.Row-Objekten zurück.
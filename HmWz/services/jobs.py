@@ -0,0 +1,410 @@
+from __future__ import annotations
+import datetime
+import logging
+from typing import Tuple
+from .base import Base
+from .database import Database
+
+from ..types import dataclass, Optional, Guild, Id
+
+class RoleJobs(Base):
+    """
+    Service für die Verwaltung von Rollen-Jobs in der Datenbank.
+    Ein Rollen-Job beschreibt eine Massenänderung von Rollen (z.B. beim Zurücksetzen der Registrierungen), deren Fortschritt gespeichert wird,
+    damit sie nach einem Neustart fortgesetzt werden kann.
+    """
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.logger = logging.getLogger(__name__)
+
+    @dataclass(frozen=True)
+    class TableCols:
+        Job: str = "Job"
+        Guild: str = "Guild"
+        Action: str = "Action"
+        Reason: str = "Reason"
+        Status: str = "Status"
+        Total: str = "Total"
+        Done: str = "Done"
+        Created: str = "Created"
+        Channel: str = "Channel"
+        Target: str = "Target"
+        Attempts: str = "Attempts"
+
+    @dataclass(frozen=True)
+    class Status:
+        Running: str = "running"
+        Finished: str = "finished"
+        Failed: str = "failed"
+
+    @property
+    def table(self) -> str:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name}(
+            {self.TableCols.Job} INTEGER PRIMARY KEY AUTOINCREMENT,
+            {self.TableCols.Guild} INTEGER,
+            {self.TableCols.Action} TEXT,
+            {self.TableCols.Reason} TEXT,
+            {self.TableCols.Status} TEXT DEFAULT '{self.Status.Running}',
+            {self.TableCols.Total} INTEGER DEFAULT 0,
+            {self.TableCols.Done} INTEGER DEFAULT 0,
+            {self.TableCols.Created} TEXT DEFAULT CURRENT_TIMESTAMP,
+            {self.TableCols.Channel} INTEGER,
+            {self.TableCols.Target} INTEGER,
+            {self.TableCols.Attempts} INTEGER DEFAULT 0
+        )
+        """
+
+    @dataclass(frozen=True)
+    class Data:
+        job: Id
+        guild: Id
+        action: str
+        reason: Optional[str]
+        status: str
+        total: int
+        done: int
+        channel: Optional[Id] = None
+        target: Optional[Id] = None
+        attempts: int = 0
+
+        @property
+        def is_running(self) -> bool:
+            return self.status == RoleJobs.Status.Running
+
+    type Record = Optional[Data]
+    """
+    Repräsentiert einen Rollen-Job.
+
+    :param job: Die ID des Jobs.
+    :type job: int
+    :param guild: Die ID der Gilde, in der der Job ausgeführt wird.
+    :type guild: int
+    :param action: Die Aktion des Jobs, anhand derer der Abschluss-Handler ausgewählt wird.
+    :type action: str
+    :param reason: Der Grund für das Audit-Log.
+    :type reason: Optional[str]
+    :param status: Der Status des Jobs.
+    :type status: str
+    :param total: Die Anzahl der Mitglieder, die der Job bearbeitet.
+    :type total: int
+    :param done: Die Anzahl der bereits bearbeiteten Mitglieder.
+    :type done: int
+    :param channel: Die ID des Kanals, in dem das Ergebnis des Jobs gemeldet wird.
+    :type channel: Optional[int]
+    :param target: Die ID des Objekts, auf das sich der Job bezieht, z.B. die entfernte Registrierungsrolle.
+    :type target: Optional[int]
+    :param attempts: Die Anzahl der Durchläufe, die mit fehlgeschlagenen Schritten beendet wurden.
+    :type attempts: int
+    """
+    type Records = Optional[Tuple[Data, ...]]
+    """Repräsentiert eine Sammlung von Rollen-Jobs. Kann None sein, wenn keine Jobs gefunden wurden."""
+
+    def _record(self, row) -> Data:
+        return self.Data(
+            job=row[self.TableCols.Job],
+            guild=row[self.TableCols.Guild],
+            action=row[self.TableCols.Action],
+            reason=row[self.TableCols.Reason],
+            status=row[self.TableCols.Status],
+            total=row[self.TableCols.Total],
+            done=row[self.TableCols.Done],
+            channel=row[self.TableCols.Channel],
+            target=row[self.TableCols.Target],
+            attempts=row[self.TableCols.Attempts] or 0
+        )
+
+    async def get(self, *, job: Optional[Id] = None, running: Optional[bool] = None) -> Records:
+        """
+        Holt Rollen-Jobs aus der Datenbank, optional gefiltert nach Job-ID oder Status.
+
+        :param job: Optionaler Filter auf eine bestimmte Job-ID.
+        :type job: Optional[int]
+        :param running: Optionaler Filter, um nur laufende (True) oder abgeschlossene (False) Jobs zu holen.
+        :type running: Optional[bool]
+        :return: Die gefundenen Jobs oder None, wenn keine Jobs gefunden wurden.
+        :rtype: Records
+        """
+        try:
+            query = f"SELECT * FROM {self.table_name} WHERE 1 = 1"
+            params = []
+            if job is not None:
+                query += f" AND {self.TableCols.Job} = ?"
+                params.append(job)
+            if running is not None:
+                query += f" AND {self.TableCols.Status} {'=' if running else '!='} ?"
+                params.append(self.Status.Running)
+            rows = await self.database.fetch_all(query, tuple(params))
+            return tuple(self._record(row) for row in rows) if rows else None
+        except Exception as e:
+            self.logger.exception(f"Failed to get role jobs: {e}")
+            return None
+
+    async def add(self, *, guild: Guild, action: str, reason: Optional[str], total: int, channel: Optional[Id] = None, target: Optional[Id] = None) -> Optional[Id]:
+        """
+        Legt einen neuen Rollen-Job an.
+
+        :param guild: Das Guild-Objekt, in dem der Job ausgeführt wird.
+        :type guild: discord.Guild
+        :param action: Die Aktion des Jobs.
+        :type action: str
+        :param reason: Der Grund für das Audit-Log.
+        :type reason: Optional[str]
+        :param total: Die Anzahl der Mitglieder, die der Job bearbeitet.
+        :type total: int
+        :param channel: Die ID des Kanals, in dem das Ergebnis des Jobs gemeldet wird.
+        :type channel: Optional[int]
+        :param target: Die ID des Objekts, auf das sich der Job bezieht.
+        :type target: Optional[int]
+        :return: Die ID des neuen Jobs oder None bei einem Fehler.
+        :rtype: Optional[int]
+        """
+        try:
+            query = f"""INSERT INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Action}, {self.TableCols.Reason}, {self.TableCols.Total}, {self.TableCols.Created}, {self.TableCols.Channel}, {self.TableCols.Target}) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            job = await self.database.insert(query, (guild.id, action, reason, total, timestamp, channel, target))
+            self.logger.info(f"{self.log_prefix(guild)} Added role job {job} ({action}) for {total} members.")
+            return job
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to add role job ({action}): {e}")
+            return None
+
+    async def progress(self, *, job: Id, done: int) -> bool:
+        """
+        Speichert den Fortschritt eines Jobs.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :param done: Die Anzahl der bereits bearbeiteten Mitglieder.
+        :type done: int
+        :return: True, wenn der Fortschritt gespeichert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Done} = ? WHERE {self.TableCols.Job} = ?"
+            return await self.database.execute(query, (done, job))
+        except Exception as e:
+            self.logger.exception(f"Failed to save progress of role job {job}: {e}")
+            return False
+
+    async def finish(self, *, job: Id) -> bool:
+        """
+        Markiert einen Job als abgeschlossen.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :return: True, wenn der Job als abgeschlossen markiert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Status} = ?, {self.TableCols.Done} = {self.TableCols.Total} WHERE {self.TableCols.Job} = ?"
+            return await self.database.execute(query, (self.Status.Finished, job))
+        except Exception as e:
+            self.logger.exception(f"Failed to finish role job {job}: {e}")
+            return False
+
+    async def attempt(self, *, job: Id) -> Optional[int]:
+        """
+        Zählt einen Durchlauf eines Jobs, der mit fehlgeschlagenen Schritten beendet wurde.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :return: Die neue Anzahl der Durchläufe oder None bei einem Fehler.
+        :rtype: Optional[int]
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Attempts} = COALESCE({self.TableCols.Attempts}, 0) + 1 WHERE {self.TableCols.Job} = ?"
+            if not await self.database.execute(query, (job,)):
+                return None
+            row = await self.database.fetch_one(f"SELECT {self.TableCols.Attempts} FROM {self.table_name} WHERE {self.TableCols.Job} = ?", (job,))
+            return row[self.TableCols.Attempts] if row else None
+        except Exception as e:
+            self.logger.exception(f"Failed to count attempt of role job {job}: {e}")
+            return None
+
+    async def fail(self, *, job: Id) -> bool:
+        """
+        Markiert einen Job als endgültig fehlgeschlagen. Der gespeicherte Fortschritt bleibt erhalten.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :return: True, wenn der Job als fehlgeschlagen markiert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Status} = ? WHERE {self.TableCols.Job} = ?"
+            return await self.database.execute(query, (self.Status.Failed, job))
+        except Exception as e:
+            self.logger.exception(f"Failed to mark role job {job} as failed: {e}")
+            return False
+
+    async def migrate(self) -> None:
+        """
+        Ergänzt bestehende Tabellen um die Spalten für den Kanal der Rückmeldung, das Ziel des Jobs und die Anzahl der Durchläufe.
+        """
+        await self.database.ensure_column(self.table_name, self.TableCols.Channel, "INTEGER")
+        await self.database.ensure_column(self.table_name, self.TableCols.Target, "INTEGER")
+        await self.database.ensure_column(self.table_name, self.TableCols.Attempts, "INTEGER DEFAULT 0")
+
+class RoleJobMembers(Base):
+    """
+    Service für die Mitgliederliste eines Rollen-Jobs. Jeder Eintrag beschreibt eine Rolle, die bei einem Mitglied geändert werden soll,
+    und ob dieser Schritt bereits abgeschlossen ist.
+    """
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.logger = logging.getLogger(__name__)
+
+    @dataclass(frozen=True)
+    class TableCols:
+        Job: str = "Job"
+        Member: str = "Member"
+        Role: str = "Role"
+        Done: str = "Done"
+
+    @property
+    def table(self) -> str:
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name}(
+            {self.TableCols.Job} INTEGER,
+            {self.TableCols.Member} INTEGER,
+            {self.TableCols.Role} INTEGER,
+            {self.TableCols.Done} BOOLEAN DEFAULT 0,
+            PRIMARY KEY ({self.TableCols.Job}, {self.TableCols.Member}, {self.TableCols.Role})
+        ) WITHOUT ROWID
+        """
+
+    @dataclass(frozen=True)
+    class Data:
+        job: Id
+        member: Id
+        role: Id
+        done: bool
+
+    type Record = Optional[Data]
+    """
+    Repräsentiert einen Schritt eines Rollen-Jobs.
+
+    :param job: Die ID des Jobs.
+    :type job: int
+    :param member: Die ID des Mitglieds.
+    :type member: int
+    :param role: Die ID der Rolle.
+    :type role: int
+    :param done: Gibt an, ob der Schritt abgeschlossen ist.
+    :type done: bool
+    """
+    type Records = Optional[Tuple[Data, ...]]
+    """Repräsentiert eine Sammlung von Schritten eines Rollen-Jobs. Kann None sein, wenn keine Schritte gefunden wurden."""
+
+    async def get(self, *, job: Id, done: Optional[bool] = None) -> Records:
+        """
+        Holt die Schritte eines Jobs, optional gefiltert nach Status.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :param done: Optionaler Filter, um nur offene (False) oder abgeschlossene (True) Schritte zu holen.
+        :type done: Optional[bool]
+        :return: Die Schritte des Jobs oder None, wenn keine gefunden wurden.
+        :rtype: Records
+        """
+        try:
+            query = f"SELECT * FROM {self.table_name} WHERE {self.TableCols.Job} = ?"
+            params = [job]
+            if done is not None:
+                query += f" AND {self.TableCols.Done} = ?"
+                params.append(int(done))
+            rows = await self.database.fetch_all(query, tuple(params))
+            if not rows:
+                return None
+            return tuple(
+                self.Data(
+                    job=row[self.TableCols.Job],
+                    member=row[self.TableCols.Member],
+                    role=row[self.TableCols.Role],
+                    done=bool(row[self.TableCols.Done])
+                ) for row in rows
+            )
+        except Exception as e:
+            self.logger.exception(f"Failed to get members of role job {job}: {e}")
+            return None
+
+    async def add(self, *, job: Id, entries: Tuple[Tuple[Id, Id], ...]) -> bool:
+        """
+        Fügt die Schritte eines Jobs in einer einzigen Transaktion hinzu.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :param entries: Die Schritte als Tupel aus Mitglieder-ID und Rollen-ID.
+        :type entries: Tuple[Tuple[int, int], ...]
+        :return: True, wenn die Schritte gespeichert wurden, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"INSERT OR IGNORE INTO {self.table_name} ({self.TableCols.Job}, {self.TableCols.Member}, {self.TableCols.Role}) VALUES (?, ?, ?)"
+            return await self.database.execute_many(query, ((job, member, role) for member, role in entries))
+        except Exception as e:
+            self.logger.exception(f"Failed to add members to role job {job}: {e}")
+            return False
+
+    async def complete(self, *, job: Id, entries: Tuple[Tuple[Id, Id], ...]) -> bool:
+        """
+        Markiert Schritte eines Jobs in einer einzigen Transaktion als abgeschlossen.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :param entries: Die Schritte als Tupel aus Mitglieder-ID und Rollen-ID.
+        :type entries: Tuple[Tuple[int, int], ...]
+        :return: True, wenn die Schritte gespeichert wurden, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Done} = 1 WHERE {self.TableCols.Job} = ? AND {self.TableCols.Member} = ? AND {self.TableCols.Role} = ?"
+            return await self.database.execute_many(query, ((job, member, role) for member, role in entries))
+        except Exception as e:
+            self.logger.exception(f"Failed to checkpoint role job {job}: {e}")
+            return False
+
+    async def remove(self, *, job: Id) -> bool:
+        """
+        Entfernt alle Schritte eines Jobs.
+
+        :param job: Die ID des Jobs.
+        :type job: int
+        :return: True, wenn die Schritte entfernt wurden, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"DELETE FROM {self.table_name} WHERE {self.TableCols.Job} = ?"
+            return await self.database.execute(query, (job,))
+        except Exception as e:
+            self.logger.exception(f"Failed to remove members of role job {job}: {e}")
+            return False
+
+class Jobs:
+    """
+    Bündelt die Services für Rollen-Jobs und deren Mitgliederlisten.
+    """
+    def __init__(self, database: Database):
+        self.logger = logging.getLogger(__name__)
+        self.roles = RoleJobs(database)
+        self.members = RoleJobMembers(database)
+
+    async def migrate(self) -> None:
+        """
+        Führt die Migrationen für bestehende Tabellen der Rollen-Jobs aus.
+        """
+        await self.roles.migrate()
+
+    @property
+    def tables(self) -> Tuple[str, ...]:
+        """
+        Gibt die SQL-Abfragen zum Erstellen der Tabellen für Rollen-Jobs zurück.
+
+        :return: Die SQL-Abfragen als Strings.
+        :rtype: Tuple[str, ...]
+        """
+        return (
+            self.roles.table,
+            self.members.table
+        )
@@ -7,6 +7,8 @@ from .roles import WzRoles
 from .registration import WzRegistration
 from .registrations import WzRegistrations
 from .list import WzList
+from .messages import WzMessages
+from .repairs import WzRepairs
 
 type ConfigRecord = WzConfig.Record
 """ 
@@ -95,6 +97,42 @@ type ListRecords = WzList.Records
 Der Datentyp für eine Tuple von ListRecord-Objekten, die die Listeneinträge einer Guild im WZ-Modul repräsentieren.
 """
 
+type MessagesRecord = WzMessages.Record
+"""
+Der Datentyp für eine Nachricht, die der Bot im Registrierungskanal einer Guild gesendet hat.
+
+:param guild: Das Guild-Objekt, in dem die Nachricht gesendet wurde.
+:type guild: discord.Guild
+:param channel: Die ID des Kanals der Nachricht.
+:type channel: int
+:param message: Die ID der Nachricht.
+:type message: int
+:param kind: Die Art der Nachricht.
+:type kind: str
+"""
+type MessagesRecords = WzMessages.Records
+"""
+Der Datentyp für eine Tuple von MessagesRecord-Objekten.
+"""
+
+type RepairsRecord = WzRepairs.Record
+"""
+Der Datentyp für eine ausstehende Reparatur der Registrierungsübersicht einer Guild.
+
+:param guild: Die ID der Guild.
+:type guild: int
+:param attempts: Die Anzahl der bisher fehlgeschlagenen Versuche.
+:type attempts: int
+:param due: Der Zeitpunkt des nächsten Versuchs als Unix-Zeitstempel.
+:type due: float
+:param error: Der Grund des letzten Fehlschlags.
+:type error: Optional[str]
+"""
+type RepairsRecords = WzRepairs.Records
+"""
+Der Datentyp für eine Tuple von RepairsRecord-Objekten.
+"""
+
 class Wz:
     """
     Die Hauptklasse des WZ-Moduls, die alle Funktionen und Datenstrukturen für die Verwaltung von WZ-bezogenen Informationen in einer Discord-Guild bereitstellt. Sie enthält Unterklassen für die Konfiguration, Rollenverwaltung, Registrierungskanal- und -nachrichtenverwaltung sowie die Verwaltung von registrierten Benutzern.
@@ -106,6 +144,8 @@ class Wz:
         self.registration = WzRegistration(database)
         self.registrations = WzRegistrations(database)
         self.list = WzList(database)
+        self.messages = WzMessages(database)
+        self.repairs = WzRepairs(database)
 
     async def remove_guild_data(self, *, guild: Guild) -> bool:
         """
@@ -117,6 +157,8 @@ class Wz:
                 await self.registration.remove(guild=guild),
                 await self.roles.remove(guild=guild),
                 await self.list.remove(guild=guild),
+                await self.messages.remove(guild=guild),
+                await self.repairs.remove(guild=guild),
                 await self.registrations.remove(guild=guild)     
             ]
             if all(results):
@@ -129,6 +171,14 @@ class Wz:
             self.logger.exception(f"{guild.name} ({guild.id}) - Critical failure during WZ data wipe: {e}")
             return False
 
+    async def migrate(self) -> None:
+        """
+        Führt die Migrationen für bestehende WZ-Tabellen aus.
+        """
+        await self.list.migrate()
+        await self.registration.migrate()
+        await self.messages.migrate()
+
     @property
     def tables(self) -> Tuple[str]:
         """
@@ -142,5 +192,7 @@ class Wz:
             self.roles.table,
             self.registration.table,
             self.registrations.table,
-            self.list.table
+            self.list.table,
+            self.messages.table,
+            self.repairs.table
         )
\ No newline at end of file
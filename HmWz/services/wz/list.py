@@ -9,6 +9,7 @@ from ...types import Id, Ids, Guild, Optional, Tuple
 class WzList(Base):
     """
     Die WzList-Klasse verwaltet die Wartelisteninformationen für die WZ-Funktionalität eines Discord-Servers (Guild).
+    Ein Eintrag entspricht einer Listen-Nachricht, die mehrere Embeds enthalten kann. Titel ist der Titel des ersten Embeds, Text die zusammengefügten Beschreibungen.
     """
     def __init__(self, database: Database):
         super().__init__(database)
@@ -21,6 +22,7 @@ class WzList(Base):
         Message: str = "Message"
         Title: str = "Title"
         Text: str = "Text"
+        Hash: str = "Hash"
     
     @property
     def table(self) -> str:
@@ -37,6 +39,7 @@ class WzList(Base):
             {self.TableCols.Message} INTEGER,
             {self.TableCols.Title} TEXT,
             {self.TableCols.Text} TEXT,
+            {self.TableCols.Hash} TEXT,
         FOREIGN KEY ({self.TableCols.Guild} ) REFERENCES Servers(Guild),
         PRIMARY KEY ({self.TableCols.Guild}, {self.TableCols.Message})
         ) WITHOUT ROWID
@@ -49,6 +52,7 @@ class WzList(Base):
         message: Id
         title: Optional[str]
         text: Optional[str]
+        hash: Optional[str] = None
 
     type Record = Optional[Data]
     """
@@ -64,6 +68,8 @@ class WzList(Base):
     :type title: Optional[str]
     :param text: Der Text der Warteliste. Kann None sein, wenn kein Text festgelegt ist.
     :type text: Optional[str]
+    :param hash: Der Inhalts-Hash der zuletzt gesendeten Seite. Kann None sein, wenn die Seite vor Einführung des Hashes gespeichert wurde.
+    :type hash: Optional[str]
     """
     type Records = Optional[Tuple[Data, ...]]
     """
@@ -86,7 +92,8 @@ class WzList(Base):
                 {self.TableCols.Channel}, 
                 {self.TableCols.Message}, 
                 {self.TableCols.Title}, 
-                {self.TableCols.Text} 
+                {self.TableCols.Text}, 
+                {self.TableCols.Hash} 
             FROM 
                 {self.table_name} 
             WHERE 
@@ -111,7 +118,8 @@ class WzList(Base):
                     channel=rec[self.TableCols.Channel],
                     message=rec[self.TableCols.Message],
                     title=rec[self.TableCols.Title],
-                    text=rec[self.TableCols.Text]
+                    text=rec[self.TableCols.Text],
+                    hash=rec[self.TableCols.Hash]
                 )
             out = []
             out : WzList.Records = await asyncio.gather(*(resolve_records(rec) for rec in records))
@@ -120,7 +128,7 @@ class WzList(Base):
             self.logger.exception(f"{self.log_prefix(guild)} Failed to get WZ lists: {e}")
             return None
 
-    async def add(self, *, guild: Guild, channel: Id, message: Id, title: str, text: str) -> bool:
+    async def add(self, *, guild: Guild, channel: Id, message: Id, title: str, text: str, hash: Optional[str] = None) -> bool:
         """
         Fügt einen neuen Eintrag zur WZ-Warteliste für eine bestimmte Gilde hinzu.
         
@@ -134,19 +142,21 @@ class WzList(Base):
         :type title: str
         :param text: Der Text der WZ-Warteliste.
         :type text: str
+        :param hash: Der Inhalts-Hash der Seite.
+        :type hash: Optional[str]
         :return: True, wenn der Eintrag erfolgreich hinzugefügt wurde, False sonst.
         :rtype: bool
         """
         try:
-            query = f"INSERT INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Title}, {self.TableCols.Text}) VALUES (?, ?, ?, ?, ?)"
-            await self.database.execute(query, params=(guild.id, channel, message, title, text))
+            query = f"INSERT INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Title}, {self.TableCols.Text}, {self.TableCols.Hash}) VALUES (?, ?, ?, ?, ?, ?)"
+            await self.database.execute(query, params=(guild.id, channel, message, title, text, hash))
             self.logger.info(f"{self.log_prefix(guild)} Added WZ list entry.")
             return True
         except Exception as e:
             self.logger.exception(f"{self.log_prefix(guild)} Failed to add WZ list: {e}")
             return False
         
-    async def update(self, *, guild: Guild, message: Id, title: str, text: str) -> bool:
+    async def update(self, *, guild: Guild, message: Id, title: str, text: str, hash: Optional[str] = None) -> bool:
         """
         Aktualisiert einen bestehenden Eintrag in der WZ-Warteliste für eine bestimmte Gilde.
         
@@ -158,18 +168,26 @@ class WzList(Base):
         :type title: str
         :param text: Der neue Text der WZ-Warteliste.
         :type text: str
+        :param hash: Der neue Inhalts-Hash der Seite.
+        :type hash: Optional[str]
         :return: True, wenn der Eintrag erfolgreich aktualisiert wurde, False sonst.
         :rtype: bool
         """
         try:
-            query = f"UPDATE {self.table_name} SET {self.TableCols.Title} = ?, {self.TableCols.Text} = ? WHERE {self.TableCols.Guild} = ? AND {self.TableCols.Message} = ?"
-            await self.database.execute(query, params=(title, text, guild.id, message))
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Title} = ?, {self.TableCols.Text} = ?, {self.TableCols.Hash} = ? WHERE {self.TableCols.Guild} = ? AND {self.TableCols.Message} = ?"
+            await self.database.execute(query, params=(title, text, hash, guild.id, message))
             self.logger.info(f"{self.log_prefix(guild)} Updated WZ list entry.")
             return True
         except Exception as e:
             self.logger.exception(f"{self.log_prefix(guild)} Failed to update WZ list: {e}")
             return False
         
+    async def migrate(self) -> None:
+        """
+        Ergänzt bestehende Tabellen um die Hash-Spalte.
+        """
+        await self.database.ensure_column(self.table_name, self.TableCols.Hash, "TEXT")
+
     async def remove(self, *, guild: Guild, message: Optional[Id] = None, messages: Optional[Ids] = None) -> bool:
         """
         Entfernt einen oder mehrere WZ-Listeneinträge für eine bestimmte Gilde.
@@ -0,0 +1,166 @@
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+from ..database import Database
+from ..base import Base
+from ...types import Id, Ids, Guild, Optional, Tuple
+
+class WzMessages(Base):
+    """
+    Die WzMessages-Klasse speichert alle Nachrichten, die der Bot im Registrierungskanal einer Gilde gesendet hat.
+    Damit können eigene Nachrichten gezielt über ihre IDs gelöscht werden, statt den Verlauf des Kanals zu durchsuchen.
+    """
+    REGISTRATION : str = "registration"
+    """Art der Registrierungsnachricht mit den Buttons."""
+    LIST : str = "list"
+    """Art einer Listen-Nachricht."""
+
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.logger = logging.getLogger(__name__)
+
+    @dataclass(frozen=True)
+    class TableCols:
+        Guild: str = "Guild"
+        Channel: str = "Channel"
+        Message: str = "Message"
+        Kind: str = "Kind"
+
+    @property
+    def table(self) -> str:
+        """
+        Gibt die SQL-Definition für die Tabelle zurück, die die Nachrichten des Bots speichert.
+
+        :return: Ein SQL-String, der die Tabelle definiert.
+        :rtype: str
+        """
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            {self.TableCols.Guild} INTEGER,
+            {self.TableCols.Channel} INTEGER,
+            {self.TableCols.Message} INTEGER,
+            {self.TableCols.Kind} TEXT,
+        FOREIGN KEY ({self.TableCols.Guild}) REFERENCES Servers(Guild),
+        PRIMARY KEY ({self.TableCols.Guild}, {self.TableCols.Message})
+        ) WITHOUT ROWID
+        """
+
+    @dataclass(frozen=True)
+    class Data:
+        guild: Guild
+        channel: Id
+        message: Id
+        kind: str
+
+    type Record = Optional[Data]
+    """
+    Der Datentyp für eine Nachricht des Bots.
+
+    :param guild: Das Guild-Objekt, in dem die Nachricht gesendet wurde.
+    :type guild: discord.Guild
+    :param channel: Die ID des Kanals der Nachricht.
+    :type channel: int
+    :param message: Die ID der Nachricht.
+    :type message: int
+    :param kind: Die Art der Nachricht, `WzMessages.REGISTRATION` oder `WzMessages.LIST`.
+    :type kind: str
+    """
+    type Records = Optional[Tuple[Data, ...]]
+    """
+    Der Datentyp für eine Sammlung von Nachrichten des Bots. Es kann ein Tuple von Record-Objekten oder None sein, wenn keine Nachrichten gespeichert sind.
+    """
+
+    async def get(self, *, guild: Guild, channel: Optional[Id] = None) -> Records:
+        """
+        Ruft die gespeicherten Nachrichten des Bots für eine Gilde ab.
+
+        :param guild: Das Guild-Objekt, für das die Nachrichten abgerufen werden sollen.
+        :type guild: discord.Guild
+        :param channel: Optional die ID des Kanals, auf den die Nachrichten beschränkt werden.
+        :type channel: Optional[int]
+        :return: Ein Tuple der gespeicherten Nachrichten oder None, wenn keine vorhanden sind.
+        :rtype: WzMessages.Records
+        """
+        try:
+            query = f"SELECT {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Kind} FROM {self.table_name} WHERE {self.TableCols.Guild} = ?"
+            params = [guild.id]
+            if channel is not None:
+                query += f" AND {self.TableCols.Channel} = ?"
+                params.append(channel)
+            records = await self.database.fetch_all(query, tuple(params))
+            if not records:
+                return None
+            return tuple(
+                self.Data(guild=guild, channel=rec[self.TableCols.Channel], message=rec[self.TableCols.Message], kind=rec[self.TableCols.Kind])
+                for rec in records
+            )
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to get WZ messages: {e}")
+            return None
+
+    async def add(self, *, guild: Guild, channel: Id, message: Id, kind: str) -> bool:
+        """
+        Speichert eine gesendete Nachricht des Bots.
+
+        :param guild: Das Guild-Objekt, in dem die Nachricht gesendet wurde.
+        :type guild: discord.Guild
+        :param channel: Die ID des Kanals der Nachricht.
+        :type channel: int
+        :param message: Die ID der Nachricht.
+        :type message: int
+        :param kind: Die Art der Nachricht.
+        :type kind: str
+        :return: True, wenn die Nachricht gespeichert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"INSERT OR IGNORE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Kind}) VALUES (?, ?, ?, ?)"
+            await self.database.execute(query, (guild.id, channel, message, kind))
+            return True
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to add WZ message: {e}")
+            return False
+
+    async def remove(self, *, guild: Guild, message: Optional[Id] = None, messages: Optional[Ids] = None) -> bool:
+        """
+        Entfernt eine, mehrere oder alle gespeicherten Nachrichten einer Gilde.
+
+        :param guild: Das Guild-Objekt, für das die Nachrichten entfernt werden sollen.
+        :type guild: discord.Guild
+        :param message: Die ID der Nachricht, die entfernt werden soll.
+        :type message: Optional[int]
+        :param messages: Die IDs der Nachrichten, die entfernt werden sollen.
+        :type messages: Optional[Ids]
+        :return: True, wenn die Entfernung erfolgreich war, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"DELETE FROM {self.table_name} WHERE {self.TableCols.Guild} = ?"
+            params = [guild.id]
+            if messages is not None:
+                if not messages:
+                    return True
+                placeholders = ','.join('?' for _ in messages)
+                query += f" AND {self.TableCols.Message} IN ({placeholders})"
+                params.extend(messages)
+            elif message is not None:
+                query += f" AND {self.TableCols.Message} = ?"
+                params.append(message)
+            await self.database.execute(query, tuple(params))
+            return True
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to remove WZ messages: {e}")
+            return False
+
+    async def migrate(self) -> None:
+        """
+        Übernimmt die bereits bekannten Registrierungs- und Listen-Nachrichten, damit sie nach dem Update gezielt gelöscht werden können.
+        """
+        await self.database.execute(
+            f"INSERT OR IGNORE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Kind}) "
+            f"SELECT Guild, Channel, Message, '{self.REGISTRATION}' FROM WzRegistration WHERE Channel IS NOT NULL AND Message IS NOT NULL"
+        )
+        await self.database.execute(
+            f"INSERT OR IGNORE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Channel}, {self.TableCols.Message}, {self.TableCols.Kind}) "
+            f"SELECT Guild, Channel, Message, '{self.LIST}' FROM WzList WHERE Channel IS NOT NULL AND Message IS NOT NULL"
+        )
@@ -4,7 +4,7 @@ import logging
 from typing import Optional
 from discord import Guild
 
-from ...types import  Id
+from ...types import  Id, Ids
 from ..database import Database
 from ..base import Base
 
@@ -29,6 +29,8 @@ class WzRegistration(Base):
         Message: str = "Message"
         Title: str = "Title"
         Description: str = "Description"
+        Cleaned: str = "Cleaned"
+        Hash: str = "Hash"
 
     @property
     def table(self) -> str:
@@ -45,6 +47,8 @@ class WzRegistration(Base):
             {self.TableCols.Message} INTEGER,
             {self.TableCols.Title} TEXT,
             {self.TableCols.Description} TEXT,
+            {self.TableCols.Cleaned} INTEGER,
+            {self.TableCols.Hash} TEXT,
         FOREIGN KEY ({self.TableCols.Guild}) REFERENCES Servers(Guild)
         )WITHOUT ROWID;
         """    
@@ -56,6 +60,8 @@ class WzRegistration(Base):
         message: Optional[Id]
         title: Optional[str]
         description: Optional[str]
+        cleaned: Optional[Id] = None
+        hash: Optional[str] = None
 
         @property
         def has_channel(self) -> bool:
@@ -89,6 +95,10 @@ class WzRegistration(Base):
     :type description: Optional[str]
     :param link: [Deprecated] Ein optionaler Link, der in der Registrierungsmeldung angezeigt werden kann. Kann None sein, wenn kein Link festgelegt ist.
     :type link: Optional[str]
+    :param cleaned: Die ID der neuesten Nachricht, bis zu der der Kanal bereinigt wurde. Kann None sein, wenn der Kanal noch nie bereinigt wurde.
+    :type cleaned: Optional[int]
+    :param hash: Der Inhalts-Hash der zuletzt gesendeten oder bearbeiteten Registrierungsmeldung. Kann None sein, wenn die Meldung noch nicht gespeichert wurde.
+    :type hash: Optional[str]
     """
 
     async def get(self, *, guild: Guild) -> Record:
@@ -107,7 +117,9 @@ class WzRegistration(Base):
                 {self.TableCols.Channel}, 
                 {self.TableCols.Message}, 
                 {self.TableCols.Title}, 
-                {self.TableCols.Description}
+                {self.TableCols.Description},
+                {self.TableCols.Cleaned},
+                {self.TableCols.Hash}
             FROM 
                 {self.table_name} 
             WHERE 
@@ -123,12 +135,43 @@ class WzRegistration(Base):
                 channel=record[self.TableCols.Channel] if record[self.TableCols.Channel] is not None else None,
                 message=record[self.TableCols.Message] if record[self.TableCols.Message] is not None else None,
                 title=record[self.TableCols.Title],
-                description=record[self.TableCols.Description]
+                description=record[self.TableCols.Description],
+                cleaned=record[self.TableCols.Cleaned],
+                hash=record[self.TableCols.Hash]
             )
         except Exception as e:
             self.logger.exception(f"{self.log_prefix(guild)} Failed to get WZ registration: {e}")
             return None
         
+    async def guilds(self) -> Ids:
+        """
+        Gibt die IDs aller Guilds zurück, für die ein Registrierungskanal konfiguriert ist.
+        Die Guilds sind nach der Anzahl ihrer Registrierungen absteigend sortiert, sodass aktive Guilds beim Start zuerst bearbeitet werden.
+
+        :return: Die IDs der konfigurierten Guilds.
+        :rtype: Ids
+        """
+        try:
+            query = f"""
+            SELECT 
+                r.{self.TableCols.Guild} AS {self.TableCols.Guild}
+            FROM 
+                {self.table_name} r
+            LEFT JOIN 
+                WzRegistrations m ON m.Guild = r.{self.TableCols.Guild}
+            WHERE 
+                r.{self.TableCols.Channel} IS NOT NULL
+            GROUP BY 
+                r.{self.TableCols.Guild}
+            ORDER BY 
+                COUNT(m.Guild) DESC
+            """
+            records = await self.database.fetch_all(query)
+            return tuple(record[self.TableCols.Guild] for record in records) if records else tuple()
+        except Exception as e:
+            self.logger.exception(f"Failed to get configured WZ registration guilds: {e}")
+            return tuple()
+
     async def upsert(self, *, guild: Guild, channel_id: Optional[Id] = None, message_id: Optional[Id] = None, title: Optional[str] = None, description: Optional[str] = None) -> bool:
         """
         Upsert-Methode für die Registrierungskanal- und -nachrichteninformationen einer Guild im WZ-Modul. 
@@ -192,7 +235,9 @@ class WzRegistration(Base):
         try:
             query = f"""
             INSERT INTO {self.table_name} (Guild, Channel) VALUES (?, ?)
-            ON CONFLICT(Guild) DO UPDATE SET Channel = excluded.Channel
+            ON CONFLICT(Guild) DO UPDATE SET 
+                Channel = excluded.Channel,
+                {self.TableCols.Cleaned} = CASE WHEN Channel = excluded.Channel THEN {self.TableCols.Cleaned} END
             """
             await self.database.execute(query, (guild.id, channel))
             self.logger.info(f"{self.log_prefix(guild)} Set up WZ registration channel {channel}.")
@@ -304,6 +349,51 @@ class WzRegistration(Base):
             self.logger.exception(f"{self.log_prefix(guild)} Failed to setup WZ registration: {e}")
             return False
   
+    async def set_cleaned(self, *, guild: Guild, message: Id) -> bool:
+        """
+        Speichert die ID der neuesten Nachricht, bis zu der der Registrierungskanal bereinigt wurde.
+        Beim nächsten Bereinigen werden nur neuere Nachrichten geprüft. Ein Wechsel des Kanals setzt den Wert zurück.
+
+        :param guild: Das Guild-Objekt, für das der Wert gespeichert werden soll.
+        :type guild: discord.Guild
+        :param message: Die ID der neuesten geprüften Nachricht.
+        :type message: int
+        :return: Ein boolescher Wert, der angibt, ob das Speichern erfolgreich war.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Cleaned} = ? WHERE {self.TableCols.Guild} = ?"
+            await self.database.execute(query, (message, guild.id))
+            return True
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to set WZ registration clean watermark: {e}")
+            return False
+
+    async def set_hash(self, *, guild: Guild, hash: Optional[str]) -> bool:
+        """
+        Speichert den Inhalts-Hash der Registrierungsmeldung, damit unveränderte Meldungen nach einem Neustart nicht erneut bearbeitet werden.
+
+        :param guild: Das Guild-Objekt, für das der Hash gespeichert werden soll.
+        :type guild: discord.Guild
+        :param hash: Der Inhalts-Hash der Meldung oder None, um ihn zurückzusetzen.
+        :type hash: Optional[str]
+        :return: Ein boolescher Wert, der angibt, ob das Speichern erfolgreich war.
+        :rtype: bool
+        """
+        try:
+            query = f"UPDATE {self.table_name} SET {self.TableCols.Hash} = ? WHERE {self.TableCols.Guild} = ?"
+            return await self.database.execute(query, (hash, guild.id))
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to set WZ registration message hash: {e}")
+            return False
+
+    async def migrate(self) -> None:
+        """
+        Ergänzt bestehende Tabellen um die Spalten für die Bereinigungsmarke und den Inhalts-Hash der Meldung.
+        """
+        await self.database.ensure_column(self.table_name, self.TableCols.Cleaned, "INTEGER")
+        await self.database.ensure_column(self.table_name, self.TableCols.Hash, "TEXT")
+
     async def remove(self, *, guild: Guild) -> bool:
         """
         Entfernt die Registrierungskanal- und -nachrichteninformationen für die angegebene Guild aus der Datenbank.
@@ -7,6 +7,7 @@ from ..database import Database
 from ..base import Base
 from .roles import WzRoles
 
+from typing import Dict
 from ...types import dataclass, Optional, Tuple, Id, Ids, Guild
 
 class WzRegistrations(Base):
@@ -170,7 +171,24 @@ class WzRegistrations(Base):
             self.logger.exception(f"{self.log_prefix(guild)} Failed to get WZ registrations: {e}")
             return None
 
-    async def add(self, *, guild: Guild, member: Id, role: Id) -> bool:
+    async def fingerprint(self, *, guild: Guild) -> Tuple[int, Optional[str]]:
+        """
+        Gibt einen günstigen Fingerabdruck der Registrierungen einer Gilde zurück, ohne die Einträge aufzulösen.
+
+        :param guild: Das Guild-Objekt, für das der Fingerabdruck erstellt werden soll.
+        :type guild: discord.Guild
+        :return: Die Anzahl der Registrierungen und der neueste Zeitstempel.
+        :rtype: Tuple[int, Optional[str]]
+        """
+        try:
+            query = f"SELECT COUNT(*) AS Rows, MAX({self.TableCols.Timestamp}) AS Latest FROM {self.table_name} WHERE {self.TableCols.Guild} = ?"
+            record = await self.database.fetch_one(query, (guild.id,))
+            return (record["Rows"], record["Latest"]) if record else (0, None)
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to get WZ registrations fingerprint: {e}")
+            return (0, None)
+
+    async def add(self, *, guild: Guild, member: Id, role: Id, timestamp: Optional[str] = None) -> bool:
         """
         Fügt eine neue WZ-Registrierung für ein Mitglied mit einer zugehörigen Rolle hinzu oder aktualisiert sie.
 
@@ -180,15 +198,16 @@ class WzRegistrations(Base):
         :type member: int
         :param role: Die ID der Rolle, die mit der Registrierung verknüpft werden soll.
         :type role: int
+        :param timestamp: Optional der Zeitstempel der Registrierung, Standard ist die aktuelle Zeit.
+        :type timestamp: Optional[str]
         :return: True, wenn die Registrierung erfolgreich hinzugefügt oder aktualisiert wurde, False sonst.
         :rtype: bool
         """
         try:
-            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            timestamp = timestamp or datetime.datetime.now(datetime.timezone.utc).isoformat()
             query = f"""INSERT OR REPLACE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Member}, {self.TableCols.Role}, {self.TableCols.Timestamp}) VALUES (?, ?, ?, ?)"""
             params = (guild.id, member, role, timestamp)
-            await self.database.execute(query, params)
-            return True    
+            return await self.database.execute(query, params)
         except Exception as e:
             self.logger.exception(f"{self.log_prefix(guild)} Failed to add WZ registration for member {member}: {e}")
             return False
@@ -235,8 +254,32 @@ class WzRegistrations(Base):
                 placeholders = ','.join('?' for _ in members)
                 query += f" AND {self.TableCols.Member} IN ({placeholders})"
                 params.extend(members)
-            await self.database.execute(query, tuple(params))
-            return True
+            return await self.database.execute(query, tuple(params))
         except Exception as e:
             self.logger.exception(f"{self.log_prefix(guild)} Failed to remove WZ registrations: {e}")
             return False
+
+    async def apply(self, *, guild: Guild, added: Optional[Dict[Id, Id]] = None, removed: Optional[Ids] = None) -> bool:
+        """
+        Fügt mehrere WZ-Registrierungen hinzu und entfernt andere in einer einzigen Transaktion.
+
+        :param guild: Das Guild-Objekt, für das die Registrierungen geändert werden sollen.
+        :type guild: discord.Guild
+        :param added: Die hinzuzufügenden Registrierungen als Zuordnung von Mitglieder-ID zu Rollen-ID.
+        :type added: Optional[Dict[int, int]]
+        :param removed: Die IDs der Mitglieder, deren Registrierungen entfernt werden sollen.
+        :type removed: Optional[Ids]
+        :return: True, wenn alle Änderungen gespeichert wurden, False sonst.
+        :rtype: bool
+        """
+        try:
+            timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
+            insert = f"""INSERT OR REPLACE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Member}, {self.TableCols.Role}, {self.TableCols.Timestamp}) VALUES (?, ?, ?, ?)"""
+            delete = f"DELETE FROM {self.table_name} WHERE {self.TableCols.Guild} = ? AND {self.TableCols.Member} = ?"
+            return await self.database.execute_batch((
+                (insert, [(guild.id, member, role, timestamp) for member, role in (added or {}).items()]),
+                (delete, [(guild.id, member) for member in (removed or ())]),
+            ))
+        except Exception as e:
+            self.logger.exception(f"{self.log_prefix(guild)} Failed to apply WZ registration changes: {e}")
+            return False
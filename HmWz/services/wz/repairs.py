@@ -0,0 +1,123 @@
+from __future__ import annotations
+import logging
+from dataclasses import dataclass
+from ..database import Database
+from ..base import Base
+from ...types import Id, Guild, Optional, Tuple
+
+class WzRepairs(Base):
+    """
+    Die WzRepairs-Klasse speichert die ausstehenden Reparaturen der Registrierungsübersicht einer Gilde,
+    z.B. wenn das Senden der Übersicht fehlgeschlagen ist. Dadurch gehen geplante Wiederholungen bei einem Neustart nicht verloren.
+    """
+    def __init__(self, database: Database):
+        super().__init__(database)
+        self.logger = logging.getLogger(__name__)
+
+    @dataclass(frozen=True)
+    class TableCols:
+        Guild: str = "Guild"
+        Attempts: str = "Attempts"
+        Due: str = "Due"
+        Error: str = "Error"
+
+    @property
+    def table(self) -> str:
+        """
+        Gibt die SQL-Definition für die Tabelle zurück, die die ausstehenden Reparaturen speichert.
+
+        :return: Ein SQL-String, der die Tabelle definiert.
+        :rtype: str
+        """
+        return f"""
+        CREATE TABLE IF NOT EXISTS {self.table_name} (
+            {self.TableCols.Guild} INTEGER PRIMARY KEY,
+            {self.TableCols.Attempts} INTEGER NOT NULL DEFAULT 0,
+            {self.TableCols.Due} REAL NOT NULL,
+            {self.TableCols.Error} TEXT
+        )
+        """
+
+    @dataclass(frozen=True)
+    class Data:
+        guild: Id
+        attempts: int
+        due: float
+        error: Optional[str]
+
+    type Record = Optional[Data]
+    """
+    Der Datentyp für eine ausstehende Reparatur.
+
+    :param guild: Die ID der Gilde.
+    :type guild: int
+    :param attempts: Die Anzahl der bisher fehlgeschlagenen Versuche.
+    :type attempts: int
+    :param due: Der Zeitpunkt des nächsten Versuchs als Unix-Zeitstempel.
+    :type due: float
+    :param error: Der Grund des letzten Fehlschlags.
+    :type error: Optional[str]
+    """
+    type Records = Optional[Tuple[Data, ...]]
+    """
+    Der Datentyp für eine Sammlung ausstehender Reparaturen oder None, wenn keine vorhanden sind.
+    """
+
+    async def get(self) -> Records:
+        """
+        Ruft alle ausstehenden Reparaturen ab, sortiert nach dem Zeitpunkt des nächsten Versuchs.
+
+        :return: Ein Tuple der ausstehenden Reparaturen oder None, wenn keine vorhanden sind.
+        :rtype: WzRepairs.Records
+        """
+        try:
+            query = f"SELECT {self.TableCols.Guild}, {self.TableCols.Attempts}, {self.TableCols.Due}, {self.TableCols.Error} FROM {self.table_name} ORDER BY {self.TableCols.Due}"
+            records = await self.database.fetch_all(query)
+            if not records:
+                return None
+            return tuple(
+                self.Data(guild=rec[self.TableCols.Guild], attempts=rec[self.TableCols.Attempts], due=rec[self.TableCols.Due], error=rec[self.TableCols.Error])
+                for rec in records
+            )
+        except Exception as e:
+            self.logger.exception(f"Failed to get WZ repairs: {e}")
+            return None
+
+    async def put(self, *, guild: Id, attempts: int, due: float, error: Optional[str] = None) -> bool:
+        """
+        Speichert oder ersetzt die ausstehende Reparatur einer Gilde.
+
+        :param guild: Die ID der Gilde.
+        :type guild: int
+        :param attempts: Die Anzahl der bisher fehlgeschlagenen Versuche.
+        :type attempts: int
+        :param due: Der Zeitpunkt des nächsten Versuchs als Unix-Zeitstempel.
+        :type due: float
+        :param error: Der Grund des letzten Fehlschlags.
+        :type error: Optional[str]
+        :return: True, wenn die Reparatur gespeichert wurde, sonst False.
+        :rtype: bool
+        """
+        try:
+            query = f"INSERT OR REPLACE INTO {self.table_name} ({self.TableCols.Guild}, {self.TableCols.Attempts}, {self.TableCols.Due}, {self.TableCols.Error}) VALUES (?, ?, ?, ?)"
+            return await self.database.execute(query, (guild, attempts, due, error))
+        except Exception as e:
+            self.logger.exception(f"Failed to store WZ repair for guild {guild}: {e}")
+            return False
+
+    async def remove(self, *, guild: Guild | Id) -> bool:
+        """
+        Entfernt die ausstehende Reparatur einer Gilde.
+
+        :param guild: Das Guild-Objekt oder die ID der Gilde.
+        :type guild: discord.Guild | int
+        :return: True, wenn die Entfernung erfolgreich war, sonst False.
+        :rtype: bool
+        """
+        guild_id = guild if isinstance(guild, int) else guild.id
+        try:
+            query = f"DELETE FROM {self.table_name} WHERE {self.TableCols.Guild} = ?"
+            return await self.database.execute(query, (guild_id,))
+        except Exception as e:
+            self.logger.exception(f"Failed to remove WZ repair for guild {guild_id}: {e}")
+            return False
@@ -1,7 +1,8 @@
-import asyncio
 import logging
+from datetime import timedelta
 from functools import wraps
-from discord import Guild, TextChannel, Message, Member, Role
+from discord import Guild, TextChannel, Message, Member, Role, Object, utils
+from typing import Dict, List
 from .types import (
     Tuple,
     Optional,
@@ -13,15 +14,14 @@ from .types import (
     DiscordMember, 
     DiscordRole
 )
-from .exception import Forbidden, NotFound, HTTPException, RateLimited
+from .exception import Forbidden, NotFound, HTTPException, CircuitOpen
+from .retry import policy
 """
 Hilfsfunktionen und Typdefinitionen für Discord-Objekte, sowie ein Dekorator für das Protokollieren von Funktionsaufrufen und Ausnahmen. 
 Diese Funktionen erleichtern den Zugriff auf Discord-Kanäle, Nachrichten, Mitglieder und Rollen, indem sie versuchen, die entsprechenden Objekte zu holen und bei Fehlern die IDs zurückgeben. 
 Alle Funktionen sind mit einem Log-Dekorator versehen, um die Aufrufe und Ergebnisse zu protokollieren.
 """
 
-DELAY : float = 0.1
-
 logger = logging.getLogger(__name__)
 
 def log_decorator(func: Callable) -> Callable:
@@ -71,21 +71,17 @@ async def fetch_channel(guild: Guild, channel_id: int, attempts: int = 3) -> Opt
         logger.debug(f"channel {channel_id} for guild {log_guild(guild)} found in cache: {channel}")
         return channel
 
-    for attempt in range(attempts):
-        try:
-            channel = await guild.fetch_channel(channel_id)
-            if isinstance(channel, TextChannel):
-                logger.debug(f"fetched channel {channel_id} for guild {log_guild(guild)}: {channel}")
-                return channel
-        except RateLimited as e:
-            await asyncio.sleep(e.retry_after )
-        except (NotFound, HTTPException) as e:
-            logger.warning(f"channel {channel_id} for guild {log_guild(guild)} unable to find!")
-            return None
-        except Forbidden as e:
-            logger.warning(f"channel {channel_id} for guild {log_guild(guild)} permission denied!")
-            return None
-    await asyncio.sleep(DELAY)
+    try:
+        channel = await policy.run(lambda: guild.fetch_channel(channel_id), guild_id=guild.id, attempts=attempts)
+        if isinstance(channel, TextChannel):
+            logger.debug(f"fetched channel {channel_id} for guild {log_guild(guild)}: {channel}")
+            return channel
+    except CircuitOpen as e:
+        logger.debug(f"channel {channel_id} for guild {log_guild(guild)} skipped: {e}")
+    except Forbidden as e:
+        logger.warning(f"channel {channel_id} for guild {log_guild(guild)} permission denied!")
+    except (NotFound, HTTPException) as e:
+        logger.warning(f"channel {channel_id} for guild {log_guild(guild)} unable to find!")
     return None
     
 async def fetch_message(channel: TextChannel, message_id: int, attempts: int = 3) -> Optional[Message]:
@@ -99,21 +95,16 @@ async def fetch_message(channel: TextChannel, message_id: int, attempts: int = 3
     :rtype: DiscordMessage
     """
 
-    for attempt in range(attempts):
-        try:
-            message = await channel.fetch_message(message_id)
-            if isinstance(message, Message):
-                logger.debug(f"fetched message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)}: {message}")
-                return message
-        except RateLimited as e:
-            await asyncio.sleep(e.retry_after )
-        except (NotFound, HTTPException) as e:
-            logger.warning(f"message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)} unable to find!")
-            return None
-        except Forbidden as e:
-            logger.warning(f"message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)} permission denied!")
-            return None
-    await asyncio.sleep(DELAY)
+    try:
+        message = await policy.run(lambda: channel.fetch_message(message_id), attempts=attempts)
+        if isinstance(message, Message):
+            logger.debug(f"fetched message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)}: {message}")
+            return message
+    except Forbidden as e:
+        logger.warning(f"message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)} permission denied!")
+        policy.breaker.record_failure(channel.guild.id)
+    except (NotFound, HTTPException) as e:
+        logger.warning(f"message {message_id} in channel {channel.id} for guild {log_guild(channel.guild)} unable to find!")
     return None
 
 async def fetch_member(guild: Guild, member_id: int, attempts: int = 3) -> Optional[Member]:
@@ -133,24 +124,103 @@ async def fetch_member(guild: Guild, member_id: int, attempts: int = 3) -> Optio
         logger.debug(f"member {member_id} for guild {log_guild(guild)} found in cache: {member}")
         return member
 
-    for attempt in range(attempts):
-        try:
-            member = await guild.fetch_member(member_id)
-            if isinstance(member, Member):
-                logger.debug(f"fetched member {member_id} for guild {log_guild(guild)}: {member}")
-                return member
-        except RateLimited as e:
-            await asyncio.sleep(e.retry_after )
-        except (NotFound, HTTPException) as e:
-            logger.warning(f"member {member_id} for guild {log_guild(guild)} unable to find!")
-            return None
-        except Forbidden as e:
-            logger.warning(f"member {member_id} for guild {log_guild(guild)} permission denied!")
-            return None
-    await asyncio.sleep(DELAY)
+    try:
+        member = await policy.run(lambda: guild.fetch_member(member_id), attempts=attempts)
+        if isinstance(member, Member):
+            logger.debug(f"fetched member {member_id} for guild {log_guild(guild)}: {member}")
+            return member
+    except Forbidden as e:
+        logger.warning(f"member {member_id} for guild {log_guild(guild)} permission denied!")
+    except (NotFound, HTTPException) as e:
+        logger.warning(f"member {member_id} for guild {log_guild(guild)} unable to find!")
     return None
 
 
+async def fetch_members(guild: Guild, member_ids: Ids, batch_size: int = 100) -> Dict[Id, Member]:
+    """
+    Holt mehrere Discord-Mitglieder anhand ihrer IDs.
+    Mitglieder im Cache werden direkt verwendet, die übrigen werden in Blöcken von bis zu 100 IDs über das Gateway abgefragt und nicht gecacht.
+
+    :param guild: Das Guild-Objekt, in dem die Mitglieder gesucht werden sollen.
+    :type guild: Guild
+    :param member_ids: Die IDs der Mitglieder, die geholt werden sollen.
+    :type member_ids: Ids
+    :param batch_size: Die maximale Anzahl an IDs pro Abfrage.
+    :type batch_size: int
+    :return: Ein Dictionary der gefundenen Mitglieder, Schlüssel ist die Mitglieder-ID.
+    :rtype: Dict[int, Member]
+    """
+    members : Dict[Id, Member] = {}
+    missing = []
+    for member_id in dict.fromkeys(member_ids):
+        member = guild.get_member(member_id)
+        if isinstance(member, Member):
+            members[member_id] = member
+        else:
+            missing.append(member_id)
+
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        try:
+            for member in await guild.query_members(user_ids=batch, limit=len(batch), cache=False):
+                members[member.id] = member
+        except Exception as e:
+            logger.warning(f"members {batch[0]}..{batch[-1]} for guild {log_guild(guild)} query failed, falling back to single fetch: {e}")
+            for member_id in batch:
+                member = await fetch_member(guild, member_id)
+                if member is not None:
+                    members[member_id] = member
+    logger.debug(f"resolved {len(members)}/{len(member_ids)} members for guild {log_guild(guild)}, {len(missing)} not cached")
+    return members
+
+async def delete_messages(channel: TextChannel, message_ids: Ids, batch_size: int = 100) -> List[Id]:
+    """
+    Löscht Nachrichten anhand ihrer IDs, ohne den Verlauf des Kanals zu durchsuchen.
+    Nachrichten, die jünger als 14 Tage sind, werden in Blöcken von bis zu 100 IDs gesammelt gelöscht, ältere einzeln.
+    Bereits gelöschte Nachrichten gelten als gelöscht.
+
+    :raise: Forbidden: Wenn der Bot keine Berechtigung zum Löschen hat.
+
+    :param channel: Der Kanal, in dem die Nachrichten gelöscht werden sollen.
+    :type channel: TextChannel
+    :param message_ids: Die IDs der Nachrichten, die gelöscht werden sollen.
+    :type message_ids: Ids
+    :param batch_size: Die maximale Anzahl an IDs pro Sammellöschung.
+    :type batch_size: int
+    :return: Die IDs der gelöschten oder nicht mehr vorhandenen Nachrichten.
+    :rtype: List[int]
+    """
+    # Discord lehnt Sammellöschungen von Nachrichten ab, die älter als 14 Tage sind, eine Stunde Puffer für Uhrabweichungen
+    cutoff = utils.utcnow() - timedelta(days=14) + timedelta(hours=1)
+    ids = list(dict.fromkeys(message_ids))
+    recent = [message_id for message_id in ids if utils.snowflake_time(message_id) > cutoff]
+    single = [message_id for message_id in ids if utils.snowflake_time(message_id) <= cutoff]
+    deleted : List[Id] = []
+
+    for start in range(0, len(recent), batch_size):
+        batch = recent[start:start + batch_size]
+        try:
+            await policy.run(lambda: channel.delete_messages([Object(id=message_id) for message_id in batch]))
+            deleted.extend(batch)
+        except Forbidden:
+            raise
+        except HTTPException as e:
+            logger.warning(f"bulk delete of {len(batch)} messages in channel {channel.id} failed, falling back to single delete: {e}")
+            single.extend(batch)
+
+    for message_id in single:
+        try:
+            await policy.run(channel.get_partial_message(message_id).delete)
+            deleted.append(message_id)
+        except NotFound:
+            deleted.append(message_id)
+        except Forbidden:
+            raise
+        except (HTTPException, CircuitOpen) as e:
+            logger.warning(f"message {message_id} in channel {channel.id} unable to delete: {e}")
+    logger.debug(f"deleted {len(deleted)}/{len(ids)} messages in channel {channel.id}")
+    return deleted
+
 async def fetch_role(guild: Guild, role_id: int) -> Optional[Role]:
     """
     Versucht, eine Discord-Rolle anhand der übergebenen Rollen-ID zu holen.
@@ -169,12 +239,11 @@ async def fetch_role(guild: Guild, role_id: int) -> Optional[Role]:
         return role
         
     try:
-        role = await guild.fetch_roles()
-        for r in role:
+        roles = await policy.run(guild.fetch_roles)
+        for r in roles:
             if r.id == role_id:
+                logger.debug(f"fetched role {role_id} for guild {log_guild(guild)}: {r}")
                 return r
     except Exception as e:
-        return None
-    finally:
-        logger.debug(f"fetched role {role_id} for guild {log_guild(guild)}: {role}")
-        await asyncio.sleep(DELAY)
\ No newline at end of file
+        logger.warning(f"role {role_id} for guild {log_guild(guild)} unable to fetch: {e}")
+    return None
\ No newline at end of file
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+from discord import Color
+
+from HmWz.client.overviews.registration import RegistrationOverview
+from HmWz.types import RegistrationMember, RegistrationRole
+
+
+SIZES = (10, 100, 1000, 10000)
+ROUNDS = 5
+
+
+def fake_guild(guild_id: int = 1) -> SimpleNamespace:
+    """Return a minimal guild with a bot member, enough for rendering the registration list."""
+    bot = SimpleNamespace(id=0, roles=[SimpleNamespace(position=1, color=Color.blue())])
+    return SimpleNamespace(
+        id=guild_id,
+        name="bench",
+        icon=None,
+        preferred_locale="de",
+        get_member=lambda member_id: bot if member_id == bot.id else None,
+    )
+
+
+ROLES = [
+    RegistrationRole(role=SimpleNamespace(id=100 + i, name=f"Rolle {i}"), permanent=i % 2 == 0)
+    for i in range(4)
+]
+# The roster sorts permanent roles first, then by role name, so this is the last group of the list
+LAST_ROLE = ROLES[3]
+
+
+def fake_member(member_id: int, display_name: str, role: RegistrationRole) -> RegistrationMember:
+    return RegistrationMember(
+        member=SimpleNamespace(id=member_id, name=f"user{member_id}", display_name=display_name),
+        role=role,
+        timestamp="2026-01-01 00:00:00",
+    )
+
+
+def fake_members(count: int) -> list:
+    return [fake_member(i + 1, f"Spieler {i:05d}", ROLES[i % len(ROLES)]) for i in range(count)]
+
+
+def overview(guild: SimpleNamespace) -> RegistrationOverview:
+    client = SimpleNamespace(user=SimpleNamespace(id=0, name="bench", avatar=None))
+    return RegistrationOverview(guild, None, client)
+
+
+async def render(instance: RegistrationOverview, members: list) -> None:
+    instance.data.members = list(members)
+    instance.stats.total = len(members)
+    await instance.create_registrations_list()
+    await instance.create_registrations_embeds()
+
+
+async def timed(func) -> float:
+    best = float("inf")
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        await func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+async def main() -> None:
+    print(f"{'entries':>8} {'full ms':>10} {'append ms':>10} {'cached ms':>10} {'csv ms':>10} {'embeds':>7}")
+    for size in SIZES:
+        guild = fake_guild()
+        members = fake_members(size)
+
+        async def full():
+            await render(overview(guild), members)
+
+        instance = overview(guild)
+        await render(instance, members)
+        # Last role group and a name that sorts after every other member, so only the last page changes
+        extra = [fake_member(size + 1, "Spieler zzzzz", LAST_ROLE)]
+
+        async def append():
+            await render(instance, members + extra)
+            await render(instance, members)
+
+        async def cached():
+            await instance.create_registrations_embeds()
+
+        async def csv():
+            instance.rendered.clear()
+            instance.export_csv()
+
+        full_ms = await timed(full)
+        # Each round appends one member at the end and removes it again
+        append_ms = await timed(append) / 2
+        cached_ms = await timed(cached)
+        csv_ms = await timed(csv)
+        print(f"{size:>8} {full_ms:>10.2f} {append_ms:>10.2f} {cached_ms:>10.3f} {csv_ms:>10.2f} {len(instance.data.embeds):>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -23,7 +23,7 @@ intents.members = True
 intents.message_content = True
 
 if __name__ == "__main__":
-    bot = Client(intents=intents, global_command_sync=False)
+    bot = Client(intents=intents, global_command_sync=False, force_command_sync="--force-command-sync" in sys.argv, selective_chunking=True)
     logger.info("Starting bot...")
     bot.run(TOKEN)
     logger.info("Bot stopped...")
\ No newline at end of file